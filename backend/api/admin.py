@@ -1,20 +1,54 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 from .models import (
+    ArchivedRecord,
     ContactSubmission,
+    Job,
     NewsletterSubscription,
     ProjectInquiry,
     PortfolioProject,
+    StatusChange,
+    StatusTransition,
+    Technology,
     Testimonial,
 )
+from .retention import RETENTION_POLICIES, unpack
+from .search import FullTextSearchMixin
+from .transitions import transition
+
+
+class BulkTransitionMixin:
+    """Admin actions applying a bulk status transition (see api/transitions.py) to the selected rows"""
+    collection = None
+
+    def apply_transition(self, request, queryset, value):
+        ids = list(queryset.values_list('id', flat=True))
+        changed = transition(self.collection, ids, value, request.user.get_username(), StatusTransition.ADMIN)
+        message = f'{len(changed)} row(s) updated.'
+        if len(changed) < len(ids):
+            message += f' {len(ids) - len(changed)} skipped: already there, or the transition is not allowed.'
+        self.message_user(request, message)
 
 
 @admin.register(ContactSubmission)
-class ContactSubmissionAdmin(admin.ModelAdmin):
+class ContactSubmissionAdmin(BulkTransitionMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'submitted_at', 'is_read']
     list_filter = ['is_read', 'submitted_at']
     search_fields = ['name', 'email', 'message']
     readonly_fields = ['submitted_at']
     date_hierarchy = 'submitted_at'
+    actions = ['mark_read', 'mark_unread']
+    collection = 'contact_submissions'
+
+    @admin.action(description='Mark selected contact submissions as read')
+    def mark_read(self, request, queryset):
+        self.apply_transition(request, queryset, True)
+
+    @admin.action(description='Mark selected contact submissions as unread')
+    def mark_unread(self, request, queryset):
+        self.apply_transition(request, queryset, False)
 
 
 @admin.register(NewsletterSubscription)
@@ -26,25 +60,119 @@ class NewsletterSubscriptionAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProjectInquiry)
-class ProjectInquiryAdmin(admin.ModelAdmin):
+class ProjectInquiryAdmin(BulkTransitionMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'project_type', 'status', 'submitted_at']
     list_filter = ['project_type', 'status', 'submitted_at']
     search_fields = ['name', 'email', 'company', 'description']
     readonly_fields = ['submitted_at']
     date_hierarchy = 'submitted_at'
+    actions = ['mark_contacted', 'mark_quoted', 'mark_closed']
+    collection = 'project_inquiries'
+
+    @admin.action(description='Mark selected inquiries as contacted')
+    def mark_contacted(self, request, queryset):
+        self.apply_transition(request, queryset, 'contacted')
+
+    @admin.action(description='Mark selected inquiries as quoted')
+    def mark_quoted(self, request, queryset):
+        self.apply_transition(request, queryset, 'quoted')
+
+    @admin.action(description='Mark selected inquiries as closed')
+    def mark_closed(self, request, queryset):
+        self.apply_transition(request, queryset, 'closed')
 
 
 @admin.register(PortfolioProject)
-class PortfolioProjectAdmin(admin.ModelAdmin):
+class PortfolioProjectAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'category', 'featured', 'created_at']
     list_filter = ['category', 'featured', 'created_at']
     search_fields = ['title', 'description', 'technologies']
     readonly_fields = ['created_at']
 
 
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name', 'slug']
+
+
 @admin.register(Testimonial)
 class TestimonialAdmin(admin.ModelAdmin):
     list_display = ['client_name', 'company', 'rating', 'featured', 'created_at']
     list_filter = ['rating', 'featured', 'created_at']
     search_fields = ['client_name', 'company', 'testimonial']
     readonly_fields = ['created_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['created_at', 'locked_at', 'finished_at', 'last_error']
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.PENDING,
+            attempts=0,
+            run_at=timezone.now(),
+            finished_at=None,
+        )
+        self.message_user(request, f'{updated} job(s) queued for retry.')
+
+
+@admin.register(ArchivedRecord)
+class ArchivedRecordAdmin(admin.ModelAdmin):
+    list_display = ['collection', 'record_id', 'timestamp', 'archived_at']
+    list_filter = ['collection', 'timestamp']
+    search_fields = ['=record_id']
+    exclude = ['data']
+    readonly_fields = ['collection', 'record_id', 'timestamp', 'archived_at', 'archived_fields']
+    date_hierarchy = 'timestamp'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Fields')
+    def archived_fields(self, obj):
+        model = RETENTION_POLICIES[obj.collection][0]
+        instance = unpack(model, obj.data)
+        return '\n'.join(f'{field.name}: {field.value_from_object(instance)}' for field in model._meta.concrete_fields)
+
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ['collection', 'field', 'new_value', 'changed_rows', 'changed_by', 'source', 'changed_at']
+    list_filter = ['collection', 'source', 'new_value', 'changed_at']
+    search_fields = ['changed_by']
+    date_hierarchy = 'changed_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Rows changed')
+    def changed_rows(self, obj):
+        # Thousands of rows per transition, so link to their paginated list rather than inline them.
+        url = reverse('admin:api_statuschange_changelist')
+        return format_html('<a href="{}?transition__id__exact={}">{}</a>', url, obj.pk, obj.count)
+
+
+@admin.register(StatusChange)
+class StatusChangeAdmin(admin.ModelAdmin):
+    list_display = ['record_id', 'old_value', 'transition']
+    list_filter = ['transition__collection', 'transition__new_value']
+    search_fields = ['=record_id']
+    list_select_related = ['transition']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
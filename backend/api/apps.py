@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import apply_sqlite_pragmas
+        from .spool import connect_signals
+
+        connect_signals()
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='api.db.apply_sqlite_pragmas')
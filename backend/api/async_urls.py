@@ -0,0 +1,27 @@
+"""
+URL configuration used when ASYNC_API is enabled.
+
+Mirrors ``api.urls`` but routes every endpoint that has an async-native
+implementation in ``api.async_views`` to it; the rest keep their sync views,
+which Django runs in a thread pool under ASGI.
+"""
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'contact_submit': async_views.contact_submit,
+    'newsletter_subscribe': async_views.newsletter_subscribe,
+    'newsletter_unsubscribe': async_views.newsletter_unsubscribe,
+    'project_inquiry_submit': async_views.project_inquiry_submit,
+    'portfolio_projects': async_views.portfolio_projects,
+    'portfolio_project_detail': async_views.portfolio_project_detail,
+    'testimonials': async_views.testimonials,
+    'stats': async_views.stats,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,341 @@
+"""
+Async-native versions of the public read and submit endpoints.
+
+DRF's ``@api_view`` only supports sync handlers, so these are plain Django
+async views that reuse the DRF serializers for validation, the sync views'
+representation path (``api.fast_serializers``, reading its rows through the
+async ORM) and Django's async ORM for every other query. The catalog
+endpoints go through the same server-side response cache as their sync
+versions (``api.response_cache``). They are served in place of the sync views when
+``ASYNC_API`` is enabled and the project runs under ASGI (see ``start.sh``),
+letting one process hold many in-flight requests instead of one per worker
+thread.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.utils import formatting
+
+from . import dedup, spool
+from .conditional import make_etag
+from .counters import get_site_stats
+from .fast_serializers import aserialize_many, aserialize_one
+from .ratelimit import rate_limited
+from .renderers import FastJSONRenderer
+from .response_cache import cache_response
+from .models import (
+    ContactSubmission,
+    NewsletterSubscription,
+    ProjectInquiry,
+    PortfolioProject,
+    Testimonial,
+    normalize_email,
+)
+from .serializers import (
+    ContactSubmissionCreateSerializer,
+    NewsletterSubscriptionCreateSerializer,
+    ProjectInquiryCreateSerializer,
+    PortfolioProjectSerializer,
+    TestimonialSerializer,
+)
+
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    # Render exactly like the sync views so clients see identical bytes.
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def parse_json(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError as exc:
+        # The same answer as DRF's JSONParser.
+        raise ParseError(f'JSON parse error - {exc}')
+
+
+def public(response):
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.PUBLIC_CACHE_MAX_AGE,
+        s_maxage=settings.PUBLIC_CACHE_S_MAXAGE,
+        stale_while_revalidate=settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE,
+    )
+    return response
+
+
+async def catalog_version(request, model):
+    aggregate = await model.objects.order_by().aaggregate(
+        count=Count('pk'),
+        last_modified=Max('updated_at'),
+    )
+    etag = make_etag(request, model._meta.label_lower, aggregate['count'], aggregate['last_modified'])
+    return etag, aggregate['last_modified']
+
+
+def conditional_response(request, etag, last_modified):
+    """Return a 304/412 response if the client's copy is current, else None"""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=f'"{etag}"', last_modified=timestamp)
+    if response is not None:
+        return public(response)
+    return None
+
+
+def with_validators(response, etag, last_modified):
+    response['ETag'] = f'"{etag}"'
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return public(response)
+
+
+def async_api_view(http_method_names):
+    """
+    Async counterpart of DRF's ``@api_view`` for these plain Django views.
+
+    Django 4.2's ``require_http_methods`` and ``csrf_exempt`` wrap coroutines
+    in sync functions, which would make Django run the view in a thread, so
+    both are done here instead. Like DRF, it answers ``OPTIONS`` with the
+    view's metadata and turns API exceptions (e.g. a ``ParseError`` from
+    ``parse_json``) into JSON errors; GET views also answer ``HEAD``.
+    """
+    allowed = list(http_method_names)
+    if 'GET' in allowed:
+        allowed.append('HEAD')
+    allowed.append('OPTIONS')
+
+    def decorator(view_func):
+        metadata = {
+            'name': formatting.camelcase_to_spaces(view_func.__name__),
+            'description': formatting.dedent(view_func.__doc__ or ''),
+            'renders': [renderer.media_type],
+            'parses': ['application/json'],
+        }
+
+        @wraps(view_func)
+        async def wrapped_view(request, *args, **kwargs):
+            if request.method not in allowed:
+                response = json_response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED
+                )
+            elif request.method == 'OPTIONS':
+                response = json_response(metadata)
+            else:
+                try:
+                    response = await view_func(request, *args, **kwargs)
+                except APIException as exc:
+                    return json_response({'detail': exc.detail}, status=exc.status_code)
+                if request.method == 'HEAD' and not response.streaming:
+                    response['Content-Length'] = str(len(response.content))
+                    response.content = b''
+                return response
+            response['Allow'] = ', '.join(allowed)
+            return response
+        # Like @api_view: the JSON API is not protected by session CSRF.
+        wrapped_view.csrf_exempt = True
+        return wrapped_view
+    return decorator
+
+
+@rate_limited('contact_submit')
+@async_api_view(['POST'])
+async def contact_submit(request):
+    """Submit a contact form"""
+    serializer = ContactSubmissionCreateSerializer(data=parse_json(request))
+    if serializer.is_valid():
+        if spool.enabled():
+            await sync_to_async(spool.spool_unique)('contact', ContactSubmission, serializer.validated_data)
+            return json_response(
+                {'message': 'Thank you for your message! We will get back to you soon.'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        contact = await sync_to_async(dedup.create_unique)(ContactSubmission, serializer.validated_data)
+        if contact is None:
+            return json_response(
+                {'message': 'Thank you for your message! We will get back to you soon.'},
+                status=status.HTTP_200_OK
+            )
+        return json_response(
+            {
+                'message': 'Thank you for your message! We will get back to you soon.',
+                'id': contact.id
+            },
+            status=status.HTTP_201_CREATED
+        )
+    return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@rate_limited('newsletter_subscribe')
+@async_api_view(['POST'])
+async def newsletter_subscribe(request):
+    """Subscribe to newsletter"""
+    serializer = NewsletterSubscriptionCreateSerializer(data=parse_json(request))
+    if serializer.is_valid():
+        email = serializer.validated_data['email']
+        if spool.enabled():
+            await sync_to_async(spool.spool_submission)('newsletter', {'email': email})
+            return json_response(
+                {'message': 'Successfully subscribed to newsletter!'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        subscription, created = await NewsletterSubscription.objects.aget_or_create(
+            email=email,
+            defaults={'is_active': True}
+        )
+        if not created:
+            if not subscription.is_active:
+                subscription.is_active = True
+                await subscription.asave()
+            return json_response(
+                {'message': 'You are already subscribed to our newsletter!'},
+                status=status.HTTP_200_OK
+            )
+        return json_response(
+            {'message': 'Successfully subscribed to newsletter!'},
+            status=status.HTTP_201_CREATED
+        )
+    return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@rate_limited('newsletter_unsubscribe', by_email=False)
+@async_api_view(['POST'])
+async def newsletter_unsubscribe(request):
+    """Unsubscribe from newsletter"""
+    data = parse_json(request)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not email:
+        return json_response(
+            {'error': 'Email is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        subscription = await NewsletterSubscription.objects.aget(email=normalize_email(str(email)))
+        subscription.is_active = False
+        await subscription.asave()
+        return json_response(
+            {'message': 'Successfully unsubscribed from newsletter'},
+            status=status.HTTP_200_OK
+        )
+    except NewsletterSubscription.DoesNotExist:
+        return json_response(
+            {'error': 'Email not found in our subscription list'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+
+@rate_limited('project_inquiry_submit')
+@async_api_view(['POST'])
+async def project_inquiry_submit(request):
+    """Submit a project inquiry/quote request"""
+    serializer = ProjectInquiryCreateSerializer(data=parse_json(request))
+    if serializer.is_valid():
+        if spool.enabled():
+            await sync_to_async(spool.spool_unique)('inquiry', ProjectInquiry, serializer.validated_data)
+            return json_response(
+                {'message': 'Thank you for your inquiry! We will review it and get back to you soon.'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        inquiry = await sync_to_async(dedup.create_unique)(ProjectInquiry, serializer.validated_data)
+        if inquiry is None:
+            return json_response(
+                {'message': 'Thank you for your inquiry! We will review it and get back to you soon.'},
+                status=status.HTTP_200_OK
+            )
+        return json_response(
+            {
+                'message': 'Thank you for your inquiry! We will review it and get back to you soon.',
+                'id': inquiry.id
+            },
+            status=status.HTTP_201_CREATED
+        )
+    return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@async_api_view(['GET'])
+async def portfolio_projects(request):
+    """Get all portfolio projects"""
+    etag, last_modified = await catalog_version(request, PortfolioProject)
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return with_validators(await portfolio_projects_json(request), etag, last_modified)
+
+
+@cache_response(PortfolioProject, vary_on=('featured', 'category', 'technology'))
+async def portfolio_projects_json(request):
+    featured_only = request.GET.get('featured', '').lower() == 'true'
+    category = request.GET.get('category', None)
+    technology = request.GET.get('technology', '').strip().lower()
+
+    projects = PortfolioProject.objects.all()
+
+    if featured_only:
+        projects = projects.filter(featured=True)
+    if category:
+        projects = projects.filter(category=category)
+    if technology:
+        projects = projects.filter(project_technologies__technology__slug=technology)
+
+    return json_response(
+        await aserialize_many(PortfolioProjectSerializer, projects, prefetch=['project_technologies'])
+    )
+
+
+@async_api_view(['GET'])
+async def portfolio_project_detail(request, pk):
+    """Get a specific portfolio project"""
+    try:
+        project = await PortfolioProject.objects.only('updated_at').aget(pk=pk)
+    except PortfolioProject.DoesNotExist:
+        return json_response(
+            {'error': 'Project not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    etag = make_etag(request, PortfolioProject._meta.label_lower, pk, project.updated_at)
+    not_modified = conditional_response(request, etag, project.updated_at)
+    if not_modified is not None:
+        return not_modified
+    data = await aserialize_one(
+        PortfolioProjectSerializer,
+        PortfolioProject.objects.filter(pk=pk),
+        prefetch=['project_technologies'],
+    )
+    return with_validators(json_response(data), etag, project.updated_at)
+
+
+@async_api_view(['GET'])
+async def testimonials(request):
+    """Get all testimonials"""
+    etag, last_modified = await catalog_version(request, Testimonial)
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return with_validators(await testimonials_json(request), etag, last_modified)
+
+
+@cache_response(Testimonial, vary_on=('featured',))
+async def testimonials_json(request):
+    featured_only = request.GET.get('featured', '').lower() == 'true'
+
+    testimonials = Testimonial.objects.all()
+    if featured_only:
+        testimonials = testimonials.filter(featured=True)
+
+    return json_response(await aserialize_many(TestimonialSerializer, testimonials))
+
+
+@async_api_view(['GET'])
+async def stats(request):
+    """Get website statistics"""
+    return json_response(await sync_to_async(get_site_stats)())
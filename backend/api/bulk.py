@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import dedup
+from .counters import invalidate_counters
+from .jobs import enqueue_notifications
+from .rollups import record_created
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def bulk_submit(request, model, serializer_class):
+    """
+    Validate a JSON list of submissions and insert the valid ones with ``bulk_create``.
+
+    Invalid items are reported by index and do not stop the others, and
+    duplicates (see api/dedup.py) are reported as such and skipped. Rows are
+    inserted in chunks of ``BULK_CREATE_BATCH_SIZE``, each in its own
+    transaction, so a database error only fails the items of that chunk.
+    """
+    items = request.data
+    if isinstance(items, dict):
+        items = items.get('items')
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'Expected a non-empty list of submissions'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > settings.BULK_SUBMIT_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {settings.BULK_SUBMIT_MAX_ITEMS} submissions per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = [{'index': index} for index in range(len(items))]
+    serializer = serializer_class(data=items, many=True)
+    if serializer.is_valid():
+        valid_indexes = list(range(len(items)))
+        validated = serializer.validated_data
+    else:
+        valid_indexes = []
+        for index, errors in enumerate(serializer.errors):
+            if errors:
+                results[index]['errors'] = errors
+            else:
+                valid_indexes.append(index)
+        # The list serializer discards everything once one item fails, so
+        # validate the remaining items again on their own.
+        serializer = serializer_class(data=[items[i] for i in valid_indexes], many=True)
+        serializer.is_valid(raise_exception=True)
+        validated = serializer.validated_data
+
+    batch_size = settings.BULK_CREATE_BATCH_SIZE
+    created = duplicates = 0
+    for start, chunk in chunked(validated, batch_size):
+        indexes, pending, entries = [], [], []
+        for index, data in zip(valid_indexes[start:start + len(chunk)], chunk):
+            duplicate, entry = dedup.check_near_duplicate(model, data)
+            if duplicate:
+                results[index]['duplicate'] = True
+                duplicates += 1
+            else:
+                indexes.append(index)
+                pending.append(model(**data))
+                entries.append(entry)
+        if not pending:
+            continue
+        try:
+            with transaction.atomic():
+                kept, repeated = dedup.drop_duplicates(model, pending)
+                objs = model.objects.bulk_create(kept, batch_size=batch_size)
+                enqueue_notifications(model, [obj.pk for obj in objs])
+                record_created(model, objs)
+        except DatabaseError:
+            # Nothing of the chunk was stored, so its retry must not count as a repeat.
+            dedup.forget(model, entries)
+            for index in indexes:
+                results[index]['errors'] = {'non_field_errors': ['Could not be saved, please retry']}
+            continue
+        repeated = set(repeated)
+        for position, index in enumerate(indexes):
+            if position in repeated:
+                results[index]['duplicate'] = True
+        for index, obj in zip([index for position, index in enumerate(indexes) if position not in repeated], objs):
+            results[index]['id'] = obj.pk
+        created += len(objs)
+        duplicates += len(repeated)
+
+    if created:
+        # bulk_create does not send post_save, so drop the cached counters here.
+        invalidate_counters(model)
+
+    failed = len(items) - created - duplicates
+    if not failed:
+        response_status = status.HTTP_201_CREATED
+    elif created:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response(
+        {'created': created, 'duplicates': duplicates, 'failed': failed, 'results': results},
+        status=response_status
+    )
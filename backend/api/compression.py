@@ -0,0 +1,196 @@
+"""
+Brotli and gzip compression for API responses and static files.
+
+``ResponseCompressionMiddleware`` compresses JSON, NDJSON and CSV responses of
+at least ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes with whichever encoding the
+client prefers in ``Accept-Encoding``, Brotli first on a tie (it needs the
+``Brotli`` package; without it only gzip is offered). Levels are tuned for
+speed on the fly (``RESPONSE_BROTLI_QUALITY``, ``RESPONSE_GZIP_LEVEL``);
+``python -m benchmarks.compression`` weighs the CPU they cost against the
+bytes they save. HTML pages, the admin and the browsable API, are left alone,
+which keeps CSRF tokens out of compressed bodies (BREACH).
+
+Responses from the server-side response cache (``api.response_cache``) are
+compressed once per cache entry and encoding: the cache hands the compressed
+copy it stored next to the entry to the middleware as
+``response.compressed_bodies``, or ``response.store_compressed`` (and
+``astore_compressed`` for the middleware's async path) callbacks for the
+middleware to store the one it makes, so a hot payload is never recompressed.
+
+Static files are compressed once, at ``collectstatic``, by
+``CompressedManifestStaticFilesStorage`` at the highest levels
+(``STATIC_BROTLI_QUALITY``, ``STATIC_GZIP_LEVEL``); WhiteNoise then serves the
+``.br``/``.gz`` file matching each request.
+"""
+import gzip
+import zlib
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage as WhiteNoiseStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli is optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = {'application/json', 'application/x-ndjson', 'text/csv'}
+
+# In order of preference when the client accepts several equally.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding):
+    """The encoding to answer an ``Accept-Encoding`` header with, or None for none"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def accepted_encoding(request):
+    if not settings.RESPONSE_COMPRESSION_ENABLED:
+        return None
+    return negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=settings.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def stream_compressor(encoding):
+    """``(compress chunk, finish)`` functions of an incremental compressor"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.RESPONSE_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits 31: a gzip header and trailer around the deflate stream.
+    compressor = zlib.compressobj(settings.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    process, finish = stream_compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    process, finish = stream_compressor(encoding)
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class ResponseCompressionMiddleware:
+    """Compress API responses with Brotli or gzip, reusing the response cache's compressed copies"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.RESPONSE_COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.min_size = settings.RESPONSE_COMPRESSION_MIN_SIZE
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        new_copy = self.compress(request, response)
+        if new_copy is not None:
+            response.store_compressed(*new_copy)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        new_copy = self.compress(request, response)
+        if new_copy is not None:
+            await response.astore_compressed(*new_copy)
+        return response
+
+    def compress(self, request, response):
+        """
+        Compress ``response`` in place if the client accepts it.
+
+        Returns ``(encoding, body)`` when the response cache should store the
+        compressed body it did not have yet, else None.
+        """
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return None
+        if response.get('Content-Type', '').partition(';')[0].strip() not in COMPRESSIBLE_TYPES:
+            return None
+        if not response.streaming and len(response.content) < self.min_size:
+            return None
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request)
+        if encoding is None:
+            return None
+
+        new_copy = None
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            body = getattr(response, 'compressed_bodies', {}).get(encoding)
+            if body is None:
+                body = compress(response.content, encoding)
+                if hasattr(response, 'store_compressed'):
+                    new_copy = (encoding, body)
+            if len(body) >= len(response.content):
+                return new_copy
+            response.content = body
+            response['Content-Length'] = str(len(body))
+
+        # The compressed bytes differ, but they still mean the same representation.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return new_copy
+
+
+class StaticCompressor(Compressor):
+    def compress_gzip(self, data):
+        return gzip.compress(data, compresslevel=settings.STATIC_GZIP_LEVEL, mtime=0)
+
+    def compress_brotli(self, data):
+        return brotli.compress(data, quality=settings.STATIC_BROTLI_QUALITY)
+
+
+class CompressedManifestStaticFilesStorage(WhiteNoiseStorage):
+    """WhiteNoise's fingerprinting, precompressing storage at the ``STATIC_*`` compression levels"""
+
+    def create_compressor(self, **kwargs):
+        return StaticCompressor(**kwargs)
@@ -0,0 +1,96 @@
+"""
+Version stamps for HTTP conditional GET on the public catalog endpoints.
+
+A catalog's version is ``(COUNT(*), MAX(updated_at))``: inserts and edits move
+the newest ``updated_at`` and deletes change the count, so the stamp changes
+whenever the rendered payload could. Both come from one indexed aggregate
+query, which is far cheaper than fetching and serializing the rows.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+
+from .models import PortfolioProject, Testimonial
+
+
+def get_catalog_version(request, model):
+    """Return (row count, newest updated_at) for ``model``, computed once per request"""
+    versions = request.__dict__.setdefault('_catalog_versions', {})
+    if model not in versions:
+        aggregate = model.objects.order_by().aggregate(
+            count=Count('pk'),
+            last_modified=Max('updated_at'),
+        )
+        versions[model] = (aggregate['count'], aggregate['last_modified'])
+    return versions[model]
+
+
+def get_object_version(request, model, pk):
+    """Return the updated_at of a single row, or None if it does not exist"""
+    versions = request.__dict__.setdefault('_object_versions', {})
+    key = (model, pk)
+    if key not in versions:
+        versions[key] = model.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return versions[key]
+
+
+def make_etag(request, *parts):
+    # The browsable API and JSON share a URL, so the representation is part of the tag.
+    parts += (request.META.get('HTTP_ACCEPT', ''),)
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def catalog_etag(model):
+    def etag_func(request, *args, **kwargs):
+        count, last_modified = get_catalog_version(request, model)
+        return make_etag(request, model._meta.label_lower, count, last_modified)
+    return etag_func
+
+
+def catalog_last_modified(model):
+    def last_modified_func(request, *args, **kwargs):
+        return get_catalog_version(request, model)[1]
+    return last_modified_func
+
+
+def object_etag(model):
+    def etag_func(request, pk, *args, **kwargs):
+        last_modified = get_object_version(request, model, pk)
+        if last_modified is None:
+            return None
+        return make_etag(request, model._meta.label_lower, pk, last_modified)
+    return etag_func
+
+
+def object_last_modified(model):
+    def last_modified_func(request, pk, *args, **kwargs):
+        return get_object_version(request, model, pk)
+    return last_modified_func
+
+
+def public_cache_control(view_func):
+    """Mark a response as cacheable by browsers and shared caches such as a CDN"""
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.PUBLIC_CACHE_MAX_AGE,
+                s_maxage=settings.PUBLIC_CACHE_S_MAXAGE,
+                stale_while_revalidate=settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE,
+            )
+        return response
+    return wrapped_view
+
+
+portfolio_etag = catalog_etag(PortfolioProject)
+portfolio_last_modified = catalog_last_modified(PortfolioProject)
+portfolio_project_etag = object_etag(PortfolioProject)
+portfolio_project_last_modified = object_last_modified(PortfolioProject)
+testimonials_etag = catalog_etag(Testimonial)
+testimonials_last_modified = catalog_last_modified(Testimonial)
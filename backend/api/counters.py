@@ -0,0 +1,103 @@
+"""
+Precomputed counters for the stats and dashboard endpoints.
+
+Each set of counters is computed with a single conditional-aggregate query
+and kept in Django's cache framework. Signal handlers in ``api.signals``
+invalidate the cached values whenever a counted model is saved or deleted,
+and the TTL bounds staleness across processes when a per-process cache such
+as locmem is in use.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from .models import (
+    ContactSubmission,
+    NewsletterSubscription,
+    ProjectInquiry,
+    PortfolioProject,
+    Testimonial,
+)
+
+SITE_STATS_KEY = 'api:counters:site_stats'
+DASHBOARD_STATS_KEY = 'api:counters:dashboard_stats'
+
+# key -> [(output name, model, boolean field to count, or None for all rows)]
+COUNTERS = {
+    SITE_STATS_KEY: [
+        ('total_projects', PortfolioProject, None),
+        ('featured_projects', PortfolioProject, 'featured'),
+        ('total_testimonials', Testimonial, None),
+        ('featured_testimonials', Testimonial, 'featured'),
+        ('total_subscriptions', NewsletterSubscription, 'is_active'),
+    ],
+    DASHBOARD_STATS_KEY: [
+        ('total_contacts', ContactSubmission, None),
+        ('total_inquiries', ProjectInquiry, None),
+        ('total_subscriptions', NewsletterSubscription, None),
+        ('active_subscriptions', NewsletterSubscription, 'is_active'),
+    ],
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'COUNTERS_CACHE_ALIAS', 'default')]
+
+
+def compute_counters(spec):
+    """Run every count in ``spec`` as one query: one derived table per model, cross-joined"""
+    qn = connection.ops.quote_name
+    by_model = {}
+    for name, model, flag in spec:
+        by_model.setdefault(model, []).append((name, flag))
+
+    columns = []
+    derived = []
+    for index, (model, counts) in enumerate(by_model.items()):
+        alias = f't{index}'
+        selects = []
+        for name, flag in counts:
+            if flag is None:
+                expression = 'COUNT(*)'
+            else:
+                column = qn(model._meta.get_field(flag).column)
+                expression = f'COUNT(CASE WHEN {column} THEN 1 END)'
+            selects.append(f'{expression} AS {qn(name)}')
+            columns.append((name, f'{alias}.{qn(name)}'))
+        derived.append(f'(SELECT {", ".join(selects)} FROM {qn(model._meta.db_table)}) {alias}')
+
+    sql = 'SELECT {} FROM {}'.format(
+        ', '.join(expression for _, expression in columns),
+        ' CROSS JOIN '.join(derived),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        row = cursor.fetchone()
+    return {name: int(value) for (name, _), value in zip(columns, row)}
+
+
+def get_counters(key):
+    cache = get_cache()
+    data = cache.get(key)
+    if data is None:
+        data = compute_counters(COUNTERS[key])
+        cache.set(key, data, getattr(settings, 'COUNTERS_CACHE_TIMEOUT', 300))
+    return data
+
+
+def get_site_stats():
+    return get_counters(SITE_STATS_KEY)
+
+
+def get_dashboard_stats():
+    return get_counters(DASHBOARD_STATS_KEY)
+
+
+def invalidate_counters(model=None):
+    """Drop cached counters that depend on ``model`` (all of them when ``model`` is None)"""
+    keys = [
+        key for key, spec in COUNTERS.items()
+        if model is None or any(counted is model for _, counted, _ in spec)
+    ]
+    if keys:
+        get_cache().delete_many(keys)
@@ -0,0 +1,17 @@
+"""
+Database tuning applied per connection, selected by ``DATABASE_PROFILE``.
+
+SQLite keeps most of its performance settings per connection, so the PRAGMAs
+in ``SQLITE_PRAGMAS`` are run on every new connection from a
+``connection_created`` receiver (connected in ``ApiConfig.ready()``).
+``api.db.postgresql_pool`` is the pooled PostgreSQL backend.
+"""
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
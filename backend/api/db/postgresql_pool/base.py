@@ -0,0 +1,116 @@
+"""
+PostgreSQL backend that takes connections from an in-process pool.
+
+Django opens one connection per thread and, with ``CONN_MAX_AGE=0`` (always
+the case under ASGI), a new one for every request. With this backend each
+worker process keeps up to ``POOL['MAX_SIZE']`` open connections and lends
+them out as Django asks for one; closing a connection hands it back to the
+pool instead of disconnecting. When every connection is lent out, callers
+wait up to ``POOL['TIMEOUT']`` seconds for one to come back.
+
+Selected by ``DATABASE_PROFILE=pooled`` (see settings.py).
+"""
+import os
+import threading
+import time
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.base import IsolationLevel
+from psycopg2 import extensions
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = []
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Return an idle connection, or None when the caller may open a new one.
+
+        Raises OperationalError if neither happens within the timeout.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                while self.idle:
+                    connection = self.idle.pop()
+                    if not connection.closed:
+                        return connection
+                    self.size -= 1
+                if self.size < self.max_size:
+                    # Reserve the slot; the caller opens the connection outside the lock.
+                    self.size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise base.Database.OperationalError(
+                        f'No pooled database connection became free within {self.timeout}s'
+                    )
+                self.condition.wait(remaining)
+
+    def release(self, connection):
+        with self.condition:
+            if connection.closed:
+                self.size -= 1
+            else:
+                self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection=None):
+        """Give up a reserved slot or a connection that cannot be reused"""
+        if connection is not None and not connection.closed:
+            connection.close()
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pools = {}
+    pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        # Keyed by pid too: connections must not be shared with a forked worker.
+        key = (os.getpid(), self.alias)
+        with self.pools_lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                options = self.settings_dict.get('POOL', {})
+                pool = self.pools[key] = ConnectionPool(
+                    max_size=options.get('MAX_SIZE', 10),
+                    timeout=options.get('TIMEOUT', 30),
+                )
+            return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        connection = pool.acquire()
+        if connection is not None:
+            # What the parent sets while opening a connection; the pooled
+            # connection itself already has the isolation level applied.
+            level = self.settings_dict['OPTIONS'].get('isolation_level')
+            self.isolation_level = IsolationLevel(level) if level is not None else IsolationLevel.READ_COMMITTED
+            return connection
+        try:
+            return super().get_new_connection(conn_params)
+        except BaseException:
+            pool.discard()
+            raise
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        pool = self.pool
+        try:
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except base.Database.Error:
+            pool.discard(connection)
+            return
+        pool.release(connection)
@@ -0,0 +1,281 @@
+"""
+Duplicate and near-duplicate detection for contact submissions and inquiries.
+
+Exact resubmissions (the same email and the same text, up to case and
+whitespace) share a fingerprint. A submission is an exact repeat when a row
+with its fingerprint was stored in the last ``DEDUP_EXACT_WINDOW`` seconds,
+found with one lookup on the (fingerprint, submitted_at) index; older
+originals do not count, so someone writing again weeks later gets through.
+The check and the insert are not atomic across workers: identical copies
+racing each other through different processes can both be stored (long
+texts racing within one process are caught as near-duplicates below).
+
+Near-duplicates, typically bot floods varying a word or a link, are caught
+in memory. Each text of ``DEDUP_MIN_WORDS`` words or more is reduced to a
+MinHash signature of its word 3-grams: 32 values whose share of matches
+between two texts estimates the Jaccard similarity of their 3-gram sets. It
+takes one hash per 3-gram (one-permutation hashing: each hash lands in one
+of 32 bins and only the smallest per bin is kept), so long messages stay
+cheap. The hash is a 64-bit BLAKE2b rather than ``hash()``, whose per-process
+seed would make signatures differ between workers and runs. A text is a near-duplicate when the same sender (by normalized email)
+submitted one within the last ``DEDUP_WINDOW`` seconds that is estimated at
+least ``DEDUP_SIMILARITY`` similar; different people filling in the same
+template are never merged. Signatures are indexed by sender and eight bands
+of four values (LSH): similar texts almost surely share a band, so a lookup
+only compares against the entries of eight dict buckets of bounded size,
+never against the table. Each process builds its index from the rows of the
+last window on first use and then adds what it accepts itself. An accepted
+submission is remembered before it is saved, so copies racing it are caught,
+and forgotten again if saving it fails, so the sender can retry.
+"""
+import hashlib
+import re
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue_notifications
+from .models import ContactSubmission, ProjectInquiry, normalize_email, normalize_text, submission_fingerprint
+
+WORD_RE = re.compile(r'\w+')
+SHINGLE_SIZE = 3
+SIGNATURE_SIZE = 32
+BANDS = 8
+ROWS = SIGNATURE_SIZE // BANDS
+VALUE_MASK = (1 << 32) - 1
+# Mixed into values an empty bin borrows from a neighbour, so borrowed values only match borrowed values.
+BORROW_SALT = 0x9E3779B9
+# Entries kept per band value; older ones drop out of that bucket first.
+BUCKET_SIZE = 64
+PACK = struct.Struct(f'<{SIGNATURE_SIZE}I')
+BAND_BYTES = ROWS * 4
+
+MODELS = (ContactSubmission, ProjectInquiry)
+
+
+def signature(text):
+    """
+    MinHash signature of the word 3-grams of ``text`` as 128 packed bytes, or None if it is too short.
+
+    Bins no 3-gram fell into take the value of the next filled bin
+    (densification), which keeps the estimate unbiased for short texts.
+    """
+    words = WORD_RE.findall(normalize_text(text))
+    if len(words) < settings.DEDUP_MIN_WORDS:
+        return None
+    mins = [None] * SIGNATURE_SIZE
+    for i in range(len(words) - SHINGLE_SIZE + 1):
+        shingle = ' '.join(words[i:i + SHINGLE_SIZE]).encode()
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'little')
+        slot, value = h % SIGNATURE_SIZE, h >> 32
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+    values = list(mins)
+    for slot, value in enumerate(mins):
+        if value is None:
+            distance, borrowed = next(
+                (distance, mins[(slot + distance) % SIGNATURE_SIZE])
+                for distance in range(1, SIGNATURE_SIZE)
+                if mins[(slot + distance) % SIGNATURE_SIZE] is not None
+            )
+            values[slot] = (borrowed + distance * BORROW_SALT) & VALUE_MASK
+    return PACK.pack(*values)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return sum(x == y for x, y in zip(array('I', first), array('I', second))) / SIGNATURE_SIZE
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of recent submissions by sender, banded for constant-time lookups"""
+
+    def __init__(self, window, min_similarity, max_entries):
+        self.window = window
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self.buckets = {}
+        # (timestamp, signature, sender) in insertion order, for expiry.
+        self.entries = deque()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def bands(value, sender):
+        return [(sender, band, value[band * BAND_BYTES:(band + 1) * BAND_BYTES]) for band in range(BANDS)]
+
+    def find(self, value, sender, now):
+        cutoff = now - self.window
+        seen = set()
+        for key in self.bands(value, sender):
+            for entry in self.buckets.get(key, ()):
+                if entry[0] >= cutoff and id(entry) not in seen:
+                    seen.add(id(entry))
+                    if similarity(entry[1], value) >= self.min_similarity:
+                        return entry
+        return None
+
+    def add(self, value, sender, now):
+        entry = (now, value, sender)
+        self.entries.append(entry)
+        for key in self.bands(value, sender):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = deque(maxlen=BUCKET_SIZE)
+            bucket.append(entry)
+        self.expire(now)
+        return entry
+
+    def expire(self, now):
+        cutoff = now - self.window
+        while self.entries and (self.entries[0][0] < cutoff or len(self.entries) > self.max_entries):
+            entry = self.entries.popleft()
+            for key in self.bands(entry[1], entry[2]):
+                bucket = self.buckets.get(key)
+                if bucket and bucket[0] is entry:
+                    bucket.popleft()
+                    if not bucket:
+                        del self.buckets[key]
+
+    def check_and_add(self, value, sender, now):
+        """Return None if ``value`` is a near-duplicate, else remember it and return its entry"""
+        with self.lock:
+            if self.find(value, sender, now) is not None:
+                return None
+            return self.add(value, sender, now)
+
+    def discard(self, entry):
+        """Forget an entry ``check_and_add`` returned, if it has not expired yet"""
+        with self.lock:
+            for queue in [self.entries] + [self.buckets.get(key) for key in self.bands(entry[1], entry[2])]:
+                for position, other in enumerate(queue or ()):
+                    if other is entry:
+                        del queue[position]
+                        break
+            for key in self.bands(entry[1], entry[2]):
+                if key in self.buckets and not self.buckets[key]:
+                    del self.buckets[key]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(model):
+    """This process's index for ``model``, loaded from the rows of the last window on first use"""
+    index = _indexes.get(model)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(model)
+            if index is None:
+                index = NearDuplicateIndex(
+                    settings.DEDUP_WINDOW, settings.DEDUP_SIMILARITY, settings.DEDUP_MAX_ENTRIES,
+                )
+                since = timezone.now() - timedelta(seconds=settings.DEDUP_WINDOW)
+                rows = (
+                    model.objects.filter(submitted_at__gte=since)
+                    .order_by('-submitted_at', '-id')
+                    .values_list('submitted_at', 'email', model.fingerprint_text_field)[:settings.DEDUP_MAX_ENTRIES]
+                )
+                for submitted_at, email, text in reversed(list(rows)):
+                    value = signature(text)
+                    if value is not None:
+                        index.add(value, normalize_email(email), submitted_at.timestamp())
+                _indexes[model] = index
+    return index
+
+
+def check_near_duplicate(model, data):
+    """
+    Whether validated ``data`` nearly repeats a recent submission of the same sender, and its index entry.
+
+    Returns ``(duplicate, entry)``. A submission that is not a near-duplicate
+    is remembered right away, so copies arriving while it is saved are caught
+    too; pass ``entry`` (None when nothing was remembered) to ``forget`` if it
+    is not saved after all.
+    """
+    if not settings.DEDUP_NEAR_DUPLICATES:
+        return False, None
+    value = signature(data.get(model.fingerprint_text_field))
+    if value is None:
+        return False, None
+    entry = get_index(model).check_and_add(value, normalize_email(data.get('email')), time.time())
+    return entry is None, entry
+
+
+def forget(model, entries):
+    """Drop the index entries of submissions that could not be saved, so their retries go through"""
+    index = _indexes.get(model)
+    for entry in entries:
+        if entry is not None and index is not None:
+            index.discard(entry)
+
+
+@contextmanager
+def remembered(model, data):
+    """
+    ``check_near_duplicate`` around saving a submission: yields whether it is a near-duplicate.
+
+    If the block raises, the submission is forgotten again.
+    """
+    duplicate, entry = check_near_duplicate(model, data)
+    try:
+        yield duplicate
+    except BaseException:
+        forget(model, [entry])
+        raise
+
+
+def create_unique(model, data):
+    """
+    Create a submission from validated ``data`` and queue its notifications, in one transaction.
+
+    Returns the new object, or None when it duplicates an earlier one, either
+    nearly (in memory) or exactly (the fingerprint index).
+    """
+    with remembered(model, data) as duplicate:
+        if duplicate:
+            return None
+        fingerprint = submission_fingerprint(data.get('email'), data.get(model.fingerprint_text_field))
+        if recent_fingerprints(model, [fingerprint]):
+            return None
+        with transaction.atomic():
+            obj = model.objects.create(**data)
+            enqueue_notifications(model, [obj.id])
+        return obj
+
+
+def recent_fingerprints(model, fingerprints):
+    """Those of ``fingerprints`` stored in the last ``DEDUP_EXACT_WINDOW`` seconds"""
+    since = timezone.now() - timedelta(seconds=settings.DEDUP_EXACT_WINDOW)
+    return set(
+        model.objects.filter(fingerprint__in=fingerprints, submitted_at__gte=since)
+        .values_list('fingerprint', flat=True)
+    )
+
+
+def drop_duplicates(model, objs):
+    """
+    Split unsaved ``objs`` into those to insert and the positions of the duplicates.
+
+    Exact repeats, of recently stored rows or within ``objs``, are found with
+    one lookup on the fingerprint index. Near-duplicates are not checked here:
+    callers check them as submissions arrive.
+    """
+    fingerprints = [obj.set_fingerprint() for obj in objs]
+    existing = recent_fingerprints(model, fingerprints)
+    kept, duplicates = [], []
+    for position, (obj, fingerprint) in enumerate(zip(objs, fingerprints)):
+        if fingerprint in existing:
+            duplicates.append(position)
+        else:
+            existing.add(fingerprint)
+            kept.append(obj)
+    return kept, duplicates
@@ -0,0 +1,73 @@
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import ContactSubmission, NewsletterSubscription, ProjectInquiry
+from .serializers import (
+    ContactSubmissionSerializer,
+    NewsletterSubscriptionSerializer,
+    ProjectInquirySerializer,
+)
+
+# Rows fetched per round-trip from the server-side cursor, and rows encoded
+# per chunk written to the client.
+EXPORT_CHUNK_SIZE = 2000
+
+# name -> (model, serializer, ordering), in the same order as admin_dashboard.
+EXPORT_COLLECTIONS = {
+    'contact_submissions': (
+        ContactSubmission, ContactSubmissionSerializer, ('-submitted_at', '-id'),
+    ),
+    'project_inquiries': (
+        ProjectInquiry, ProjectInquirySerializer, ('-submitted_at', '-id'),
+    ),
+    'newsletter_subscriptions': (
+        NewsletterSubscription, NewsletterSubscriptionSerializer, ('-subscribed_at', '-id'),
+    ),
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def iter_collection(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield serialized rows of one collection without loading the table into memory"""
+    model, serializer_class, ordering = EXPORT_COLLECTIONS[name]
+    serializer = serializer_class()
+    queryset = model.objects.order_by(*ordering)
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(obj)
+
+
+def stream_ndjson(names, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON object per line: {"type": <collection>, "data": {...}}"""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    buffer = []
+    for name in names:
+        for row in iter_collection(name, chunk_size):
+            buffer.append(encoder.encode({'type': name, 'data': row}))
+            if len(buffer) >= chunk_size:
+                yield '\n'.join(buffer) + '\n'
+                buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def stream_json(names, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield a single JSON object of arrays keyed by collection, one chunk at a time"""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '{'
+    for index, name in enumerate(names):
+        yield ('' if index == 0 else ',') + encoder.encode(name) + ':['
+        buffer = []
+        first = True
+        for row in iter_collection(name, chunk_size):
+            buffer.append(encoder.encode(row))
+            if len(buffer) >= chunk_size:
+                yield ('' if first else ',') + ','.join(buffer)
+                first = False
+                buffer = []
+        if buffer:
+            yield ('' if first else ',') + ','.join(buffer)
+        yield ']'
+    yield '}'
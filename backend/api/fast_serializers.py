@@ -0,0 +1,236 @@
+"""
+Fast serialization for read-only endpoints.
+
+A DRF ``ModelSerializer`` builds a model instance per row and then walks its
+field objects to turn the instance back into primitives. For read-only output
+the same dicts can be produced straight from ``.values()`` rows:
+``compile_serializer`` inspects a serializer once and generates a function
+that maps a row to exactly the representation the serializer would return.
+Method fields are filled from one batched query per page, as
+``prefetch_related`` would, by loaders registered with ``@batch_loader``.
+``aserialize_many`` and ``aserialize_one`` do the same for async views,
+reading every row through the async ORM.
+
+Results are ``NativeList`` / ``NativeDict`` instances, which tell
+``FastJSONRenderer`` that they hold only JSON-native values. Set
+``FAST_SERIALIZATION=False`` to serve every endpoint through DRF instead.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import fields
+from rest_framework.settings import ISO_8601, api_settings
+
+from .models import ProjectTechnology
+from .serializers import PortfolioProjectSerializer
+
+# Fields whose representation of a value loaded from the database is the value itself.
+PASSTHROUGH_FIELDS = (fields.CharField, fields.IntegerField, fields.BooleanField, fields.ChoiceField)
+
+# (serializer class, field name) -> function(ids) returning a queryset of (id, item)
+# rows; the field holds the list of each id's items, in row order.
+BATCH_LOADERS = {}
+
+
+class NativeList(list):
+    """A list holding only str, int, bool, None, list and dict values"""
+
+
+class NativeDict(dict):
+    """A dict holding only str, int, bool, None, list and dict values"""
+
+
+def enabled():
+    return settings.FAST_SERIALIZATION
+
+
+def batch_loader(serializer_class, field_name):
+    """Register the function that fills a method field for a batch of primary keys"""
+    def decorator(func):
+        BATCH_LOADERS[(serializer_class, field_name)] = func
+        return func
+    return decorator
+
+
+@batch_loader(PortfolioProjectSerializer, 'technologies_list')
+def technologies_lists(ids):
+    # Same rows, in the same (project, position) order, as prefetching project_technologies.
+    return ProjectTechnology.objects.filter(project_id__in=ids).values_list('project_id', 'name')
+
+
+def group(pairs):
+    lists = defaultdict(list)
+    for key, item in pairs:
+        lists[key].append(item)
+    return lists
+
+
+def datetime_representation(value, tz):
+    # DateTimeField.to_representation for the default ISO 8601 format, with the
+    # current time zone looked up once per batch instead of once per value.
+    if not value:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    else:
+        value = timezone.make_aware(value, tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def is_passthrough(field):
+    return isinstance(field, PASSTHROUGH_FIELDS)
+
+
+def is_iso_datetime(field):
+    return (
+        isinstance(field, fields.DateTimeField)
+        and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601
+        and settings.USE_TZ
+        and not hasattr(field, 'timezone')
+    )
+
+
+class CompiledSerializer:
+    def __init__(self, serializer_class, only=None):
+        self.serializer_class = serializer_class
+        self.columns = []
+        self.loaders = []
+        namespace = {}
+        items = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (only is not None and name not in only):
+                continue
+            if isinstance(field, fields.SerializerMethodField):
+                key = f'loaded_{len(self.loaders)}'
+                self.loaders.append(BATCH_LOADERS[(serializer_class, name)])
+                items.append(f"{name!r}: {key}.get(row['id']) or []")
+                continue
+            if not field.source or '.' in field.source or field.source == '*':
+                raise ValueError(f'{serializer_class.__name__}.{name} cannot be served from .values() rows')
+            self.columns.append(field.source)
+            value = f'row[{field.source!r}]'
+            if is_passthrough(field):
+                items.append(f'{name!r}: {value}')
+            elif is_iso_datetime(field):
+                items.append(f'{name!r}: datetime_representation({value}, tz)')
+            else:
+                namespace[f'convert_{name}'] = field.to_representation
+                items.append(f'{name!r}: None if {value} is None else convert_{name}({value})')
+        if self.loaders and 'id' not in self.columns:
+            self.columns.append('id')
+
+        # One dict literal per row is several times cheaper than looping over the fields.
+        namespace['datetime_representation'] = datetime_representation
+        arguments = ''.join(f', loaded_{i}' for i in range(len(self.loaders)))
+        source = f'def to_representation(row, tz{arguments}):\n    return {{{", ".join(items)}}}\n'
+        exec(compile(source, f'<{serializer_class.__name__} fast path>', 'exec'), namespace)
+        self.to_representation = namespace['to_representation']
+
+    def serialize(self, rows):
+        ids = [row['id'] for row in rows] if self.loaders else []
+        return self.represent(rows, [group(loader(ids)) if ids else {} for loader in self.loaders])
+
+    async def aserialize(self, rows):
+        ids = [row['id'] for row in rows] if self.loaders else []
+        loaded = []
+        for loader in self.loaders:
+            loaded.append(group([pair async for pair in loader(ids)]) if ids else {})
+        return self.represent(rows, loaded)
+
+    def represent(self, rows, loaded):
+        tz = timezone.get_current_timezone()
+        to_representation = self.to_representation
+        return NativeList([to_representation(row, tz, *loaded) for row in rows])
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(serializer_class, fields=None):
+    """Compile ``serializer_class``, limited to the field names in the ``fields`` tuple if given"""
+    return CompiledSerializer(serializer_class, fields)
+
+
+def values_for(serializer_class, queryset, fields=None, extra=()):
+    """
+    Narrow ``queryset`` to ``.values()`` rows holding just the serializer's columns.
+
+    ``fields`` limits them to those of the named fields; ``extra`` adds columns
+    needed besides the output, such as the ones a paginator orders by.
+    """
+    columns = compile_serializer(serializer_class, fields).columns
+    return queryset.values(*columns, *(column for column in extra if column not in columns))
+
+
+def serialize_rows(serializer_class, rows, fields=None):
+    """Represent ``values_for`` rows exactly like ``serializer_class(many=True).data``"""
+    return compile_serializer(serializer_class, fields).serialize(list(rows))
+
+
+def serialize_queryset(serializer_class, queryset, fields=None):
+    return serialize_rows(serializer_class, values_for(serializer_class, queryset, fields), fields)
+
+
+def project(serializer_class, queryset, fields, extra=()):
+    """Defer every column the named fields do not need (``.only()``), for the DRF path"""
+    if fields is None:
+        return queryset
+    return queryset.only(*compile_serializer(serializer_class, fields).columns, *extra)
+
+
+def serialize_many(serializer_class, queryset, prefetch=(), fields=None):
+    """
+    ``serializer_class(queryset, many=True).data``, through the fast path when it is enabled.
+
+    ``fields`` (a tuple of field names, see ``serializers.projected_fields``)
+    limits both the output and the columns read from the database.
+    """
+    if enabled():
+        return serialize_queryset(serializer_class, queryset, fields)
+    queryset = project(serializer_class, queryset, fields).prefetch_related(*prefetch)
+    if fields is None:
+        return serializer_class(queryset, many=True).data
+    return serializer_class(queryset, many=True, fields=fields).data
+
+
+def serialize_one(serializer_class, queryset, prefetch=()):
+    """Represent the only object in ``queryset``, or return None when it is empty"""
+    return first(serialize_many(serializer_class, queryset, prefetch))
+
+
+async def aserialize_many(serializer_class, queryset, prefetch=()):
+    """``serialize_many`` for async views: rows and batch loads go through the async ORM"""
+    if enabled():
+        compiled = compile_serializer(serializer_class)
+        return await compiled.aserialize([row async for row in values_for(serializer_class, queryset)])
+    # Everything the serializer reads is fetched here, prefetches included, so
+    # representing the objects does not touch the database.
+    objs = [obj async for obj in queryset.prefetch_related(*prefetch)]
+    return serializer_class(objs, many=True).data
+
+
+async def aserialize_one(serializer_class, queryset, prefetch=()):
+    return first(await aserialize_many(serializer_class, queryset, prefetch))
+
+
+def first(data):
+    if not data:
+        return None
+    return NativeDict(data[0]) if isinstance(data, NativeList) else data[0]
+
+
+def serialize_page(paginator, serializer_class, queryset, request, fields=None):
+    """Paginate ``queryset`` and return the paginated response"""
+    # The paginator reads its ordering column and the id from each row to build cursors.
+    extra = (paginator.ordering_field, 'id')
+    if enabled():
+        rows = paginator.paginate_queryset(values_for(serializer_class, queryset, fields, extra), request)
+        return paginator.get_paginated_response(serialize_rows(serializer_class, rows, fields))
+    if fields is None:
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
+    page = paginator.paginate_queryset(project(serializer_class, queryset, fields, extra), request)
+    return paginator.get_paginated_response(serializer_class(page, many=True, fields=fields).data)
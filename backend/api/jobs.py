@@ -0,0 +1,174 @@
+"""
+Database-backed job queue for work that should not run on the request path,
+such as sales notifications for new submissions.
+
+Views enqueue jobs in the same transaction as the row they refer to, so a job
+exists exactly when its submission was committed. ``manage.py run_workers``
+claims and runs them; failures are retried with exponential backoff and jobs
+that keep failing are left in the ``dead`` state for inspection.
+"""
+import json
+import logging
+import traceback
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContactSubmission, Job, ProjectInquiry
+from .serializers import ContactSubmissionSerializer, ProjectInquirySerializer
+
+logger = logging.getLogger(__name__)
+
+# Submission kinds that can be referenced from a notification payload.
+SUBMISSIONS = {
+    'contact': (ContactSubmission, ContactSubmissionSerializer, 'New contact submission'),
+    'inquiry': (ProjectInquiry, ProjectInquirySerializer, 'New project inquiry'),
+}
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def notification_kinds():
+    """Return the notification job kinds that are configured in settings"""
+    kinds = []
+    if settings.NOTIFICATION_EMAILS:
+        kinds.append('email_notification')
+    if settings.NOTIFICATION_WEBHOOK_URL:
+        kinds.append('webhook_notification')
+    return kinds
+
+
+def enqueue_notifications(model, ids):
+    """
+    Queue a notification job per configured channel for each submission id.
+
+    Call this inside the transaction that inserts the submissions.
+    """
+    kinds = notification_kinds()
+    if not kinds or not ids:
+        return []
+    submission_type = next(
+        name for name, (submission_model, _, _) in SUBMISSIONS.items() if submission_model is model
+    )
+    return Job.objects.bulk_create([
+        Job(
+            kind=kind,
+            payload={'submission': submission_type, 'id': pk},
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        for pk in ids
+        for kind in kinds
+    ])
+
+
+def load_submission(payload):
+    model, serializer_class, subject = SUBMISSIONS[payload['submission']]
+    obj = model.objects.get(pk=payload['id'])
+    return serializer_class(obj).data, subject
+
+
+@handler('email_notification')
+def send_email_notification(payload):
+    data, subject = load_submission(payload)
+    body = '\n'.join(f'{key}: {value}' for key, value in data.items())
+    send_mail(
+        f"{subject} from {data['name']}",
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        settings.NOTIFICATION_EMAILS,
+    )
+
+
+@handler('webhook_notification')
+def send_webhook_notification(payload):
+    data, subject = load_submission(payload)
+    request = urllib.request.Request(
+        settings.NOTIFICATION_WEBHOOK_URL,
+        data=json.dumps({
+            'event': f"{payload['submission']}.created",
+            'summary': subject,
+            'data': data,
+        }).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    with urllib.request.urlopen(request, timeout=settings.NOTIFICATION_WEBHOOK_TIMEOUT) as response:
+        response.read()
+
+
+def claim_job():
+    """Take the next due job, or return None when there is nothing to do"""
+    while True:
+        due = Job.objects.filter(status=Job.PENDING, run_at__lte=timezone.now()).order_by('run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                job = due.select_for_update(skip_locked=True).first()
+                if job is None:
+                    return None
+                claimed = mark_running(job)
+        else:
+            # Without row locks (SQLite) the conditional UPDATE alone decides
+            # which worker gets the job; the losers simply look again.
+            job = due.first()
+            if job is None:
+                return None
+            claimed = mark_running(job)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def mark_running(job):
+    return Job.objects.filter(pk=job.pk, status=Job.PENDING).update(
+        status=Job.RUNNING,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome; returns the job's new status"""
+    try:
+        HANDLERS[job.kind](job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.DEAD
+            job.finished_at = timezone.now()
+            logger.error('Job %s failed permanently after %s attempts', job, job.attempts)
+        else:
+            job.status = Job.PENDING
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+            logger.warning('Job %s failed, retrying at %s', job, job.run_at)
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ''
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_at', 'locked_at', 'last_error', 'finished_at'])
+    return job.status
+
+
+def release_stale_jobs():
+    """Put jobs back in the queue whose worker died while running them"""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.PENDING,
+        locked_at=None,
+    )
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.retention import RETENTION_POLICIES, archive, eligible, retention_days
+
+
+class Command(BaseCommand):
+    help = 'Move submissions past their retention period into the compressed archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            action='append',
+            choices=list(RETENTION_POLICIES),
+            help='Only archive this collection (repeatable)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help="Archive eligible rows older than this many days instead of each policy's setting",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help=f'Rows moved per transaction (default: {settings.ARCHIVE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows that would be archived',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        for name in options['collection'] or RETENTION_POLICIES:
+            days = options['days'] if options['days'] is not None else retention_days(name)
+            if days is None:
+                self.stdout.write(f'{name}: retention policy off, skipped')
+                continue
+            if options['dry_run']:
+                self.stdout.write(f'{name}: {eligible(name, days).count()} row(s) older than {days} day(s) to archive')
+                continue
+            archived = archive(name, days, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{name}: archived {archived} row(s) older than {days} day(s)'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import ROLLUPS, backfill, parse_bound
+
+
+class Command(BaseCommand):
+    help = 'Recompute the analytics rollups from the submission tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric',
+            action='append',
+            choices=list(ROLLUPS),
+            help='Only recompute this metric (repeatable)',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only recompute buckets from this date on, rounded down to the start of its month',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since'], 'since') if options['since'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        written = backfill(options['metric'], since)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup row(s)'))
+        self.stdout.write(
+            'Unsubscriptions and resubscriptions are only counted as they happen and were left as they are.'
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.query_audit import AUDITED_QUERIES, audit
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queryset behind every API view and fail on sequential scans of large tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=int,
+            default=1000,
+            help='Tables with more rows than this must not be scanned sequentially (default: 1000)',
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            choices=list(AUDITED_QUERIES),
+            help='Only audit this query (repeatable)',
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print every plan, not only the failing ones',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Auditing query plans on {connection.vendor}')
+        failures = 0
+        for name, plan, problems in audit(options['threshold'], options['query']):
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'FAIL {name}: {"; ".join(problems)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'ok   {name}'))
+            if problems or options['plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'       {line}')
+
+        if failures:
+            raise CommandError(f'{failures} query plan(s) scan tables above {options["threshold"]} rows')
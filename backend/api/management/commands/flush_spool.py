@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from api.spool import get_spool
+
+
+class Command(BaseCommand):
+    help = 'Commit every submission waiting in the buffered-write spool, e.g. after a crash'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SUBMISSION_SPOOL_BATCH_SIZE,
+            help=f'Entries committed per transaction (default: {settings.SUBMISSION_SPOOL_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        spool = get_spool()
+        count, age = spool.backlog()
+        self.stdout.write(f'{count} spooled submission(s) in {spool.path}, oldest {age:.1f}s old')
+        # Wait for a running web process to finish its flush instead of skipping.
+        flushed = spool.flush(options['batch_size'], blocking=True)
+        self.stdout.write(self.style.SUCCESS(f'Committed {flushed} submission(s)'))
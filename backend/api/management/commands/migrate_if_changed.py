@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from api.startup import migrate_if_changed
+
+
+class Command(BaseCommand):
+    help = 'Run migrate only if the migration files changed since this database was last migrated by this command'
+
+    # Checks are for development; this runs on every boot.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to migrate (default: "default")',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Migrate and stamp the database even if the migration files are unchanged',
+        )
+
+    def handle(self, *args, **options):
+        if migrate_if_changed(options['database'], options['force'], options['verbosity']):
+            self.stdout.write(self.style.SUCCESS('Migrated; stamped the database with the current migrations'))
+        else:
+            self.stdout.write('Migration files unchanged since the last migrate, skipped')
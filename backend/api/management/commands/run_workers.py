@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from api.jobs import claim_job, release_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs (submission notifications) from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Number of worker threads (default: 4)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before polling again when the queue is empty (default: 1)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no due jobs are left instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        released = release_stale_jobs()
+        if released:
+            self.stdout.write(f'Requeued {released} stale job(s)')
+
+        threads = options['threads']
+        self.stdout.write(f'Starting {threads} worker thread(s)')
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job-worker') as pool:
+            futures = [
+                pool.submit(self.work, options['poll_interval'], options['once'])
+                for _ in range(threads)
+            ]
+            try:
+                processed = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                self.stop.set()
+                processed = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s)'))
+
+    def work(self, poll_interval, once):
+        processed = 0
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if once:
+                        break
+                    release_stale_jobs()
+                    self.stop.wait(poll_interval)
+                    continue
+                status = run_job(job)
+                processed += 1
+                self.stdout.write(f'{job} -> {status}')
+        finally:
+            connection.close()
+        return processed
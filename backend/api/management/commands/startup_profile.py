@@ -0,0 +1,134 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PHASES = ('interpreter', 'settings', 'apps', 'migrations', 'middleware', 'first_response')
+
+
+def parse_importtime(output):
+    """``(module, self µs, cumulative µs)`` for every line ``python -X importtime`` wrote to ``output``"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The column header
+            continue
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Time a cold start up to the first response in fresh interpreters, phase by phase, '
+        'and report which modules the import time goes to'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/portfolio/',
+            help='Path of the first request (default: /api/portfolio/)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Cold starts per mode; the fastest is reported (default: 5)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Modules listed by import time (default: 20)',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Profile both FAST_STARTUP=False and FAST_STARTUP=True instead of the current setting',
+        )
+        parser.add_argument(
+            '--migrate',
+            action='store_true',
+            help=(
+                'Include the migration step of start.sh: a separate `manage.py migrate` process, '
+                'or migrate_if_changed in-process under FAST_STARTUP. Migrates the configured database'
+            ),
+        )
+
+    def run_probe(self, fast, path, migrate, importtime=False):
+        env = dict(os.environ, FAST_STARTUP=str(fast))
+        migrations = None
+        if migrate and not fast:
+            started = time.perf_counter()
+            self.run([sys.executable, 'manage.py', 'migrate', '--noinput', '-v0'], env)
+            migrations = time.perf_counter() - started
+        # A fresh interpreter per run: nothing imported by this process counts.
+        code = f'from api.startup import probe; probe({path!r}, {migrate and fast})'
+        args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+        started = time.perf_counter()
+        result = self.run(args, env)
+        wall = time.perf_counter() - started
+        report = json.loads(result.stdout)
+        timings = report['timings']
+        timings['interpreter'] = wall - sum(timings.values())
+        if migrations is not None:
+            timings['migrations'] = migrations
+        return timings, report['status'], result.stderr
+
+    @staticmethod
+    def run(args, env):
+        result = subprocess.run(args, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f'{" ".join(args[:3])} failed:\n{result.stderr[-2000:]}')
+        return result
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive')
+        modes = [False, True] if options['compare'] else [settings.FAST_STARTUP]
+        best, imports = {}, {}
+        for fast in modes:
+            runs = [
+                self.run_probe(fast, options['path'], options['migrate'])[:2]
+                for _ in range(options['repeat'])
+            ]
+            best[fast] = min(runs, key=lambda run: sum(run[0].values()))
+            # A separate run: -X importtime slows the imports it measures.
+            imports[fast] = parse_importtime(self.run_probe(fast, options['path'], False, importtime=True)[2])
+
+        names = {False: 'default', True: 'FAST_STARTUP'}
+        self.stdout.write(
+            f'Cold start to the first GET {options["path"]}, fastest of {options["repeat"]} run(s), in ms\n'
+        )
+        self.stdout.write(f'{"phase":16}' + ''.join(f'{names[fast]:>14}' for fast in modes))
+        for phase in PHASES:
+            if any(phase in best[fast][0] for fast in modes):
+                self.stdout.write(f'{phase:16}' + ''.join(
+                    f'{best[fast][0].get(phase, 0) * 1000:14.1f}' for fast in modes
+                ))
+        self.stdout.write(f'{"total":16}' + ''.join(f'{sum(best[fast][0].values()) * 1000:14.1f}' for fast in modes))
+        self.stdout.write(f'{"status":16}' + ''.join(f'{best[fast][1]:>14}' for fast in modes))
+
+        for fast in modes:
+            modules = imports[fast]
+            packages = Counter()
+            for name, own, _ in modules:
+                packages[name.split('.')[0]] += own
+            self.stdout.write(
+                f'\nImports ({names[fast]}): {len(modules)} modules, '
+                f'{sum(own for _, own, _ in modules) / 1000:.1f}ms under -X importtime'
+            )
+            self.stdout.write('  by package (ms):')
+            for package, own in packages.most_common(options['top']):
+                self.stdout.write(f'    {package:40}{own / 1000:9.1f}')
+            self.stdout.write('  slowest modules (ms, own / with their imports):')
+            for name, own, cumulative in sorted(modules, key=lambda module: -module[1])[:options['top']]:
+                self.stdout.write(f'    {name:40}{own / 1000:9.1f}{cumulative / 1000:9.1f}')
@@ -0,0 +1,122 @@
+"""
+In-process request metrics, exposed in the Prometheus text format at
+``/api/metrics/``.
+
+``RequestMetricsMiddleware`` records one observation per request. Metrics
+are kept per worker process, as with any Prometheus client without a
+multiprocess collector, so scrape each worker or aggregate in Prometheus.
+
+The endpoint is for staff users (by session) and for scrapers sending
+``Authorization: Bearer <METRICS_TOKEN>``.
+"""
+import hmac
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+
+# Upper bounds in seconds, as in the Prometheus client's defaults.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, method, status, total, db_time, queries, serializer_time, n_plus_one):
+        key = (view, method)
+        with self.lock:
+            stats = self.views.get(key)
+            if stats is None:
+                stats = self.views[key] = {
+                    'duration': Histogram(DURATION_BUCKETS),
+                    'db_duration': Histogram(DURATION_BUCKETS),
+                    'serializer_duration': Histogram(DURATION_BUCKETS),
+                    'queries': Histogram(QUERY_BUCKETS),
+                    'statuses': {},
+                    'n_plus_one': 0,
+                }
+            stats['duration'].observe(total)
+            stats['db_duration'].observe(db_time)
+            stats['serializer_duration'].observe(serializer_time)
+            stats['queries'].observe(queries)
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+            if n_plus_one:
+                stats['n_plus_one'] += 1
+
+    def render(self):
+        histograms = [
+            ('duration', 'api_request_duration_seconds', 'Total time spent handling the request'),
+            ('db_duration', 'api_request_db_duration_seconds', 'Time spent executing SQL'),
+            ('serializer_duration', 'api_request_serializer_duration_seconds', 'Time spent in DRF serializers'),
+            ('queries', 'api_request_db_queries', 'SQL queries executed per request'),
+        ]
+        with self.lock:
+            items = sorted(self.views.items())
+            lines = []
+            for attr, name, help_text in histograms:
+                lines.append(f'# HELP {name} {help_text}.')
+                lines.append(f'# TYPE {name} histogram')
+                for (view, method), stats in items:
+                    lines.extend(stats[attr].lines(name, f'view="{view}",method="{method}"'))
+            lines.append('# HELP api_requests_total Requests handled, by response status.')
+            lines.append('# TYPE api_requests_total counter')
+            for (view, method), stats in items:
+                for status, count in sorted(stats['statuses'].items()):
+                    lines.append(f'api_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+            lines.append('# HELP api_n_plus_one_requests_total Requests that repeated the same SQL statement.')
+            lines.append('# TYPE api_n_plus_one_requests_total counter')
+            for (view, method), stats in items:
+                lines.append(f'api_n_plus_one_requests_total{{view="{view}",method="{method}"}} {stats["n_plus_one"]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def is_authorized(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode()):
+            return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics(request):
+    """Expose request metrics in the Prometheus text format (staff or METRICS_TOKEN only)"""
+    if not is_authorized(request):
+        response = HttpResponse('Authentication required\n', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+        return response
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
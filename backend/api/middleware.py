@@ -0,0 +1,250 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .fast_serializers import CompiledSerializer
+from .metrics import registry
+
+logger = logging.getLogger('api.metrics')
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'shapes')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook: time every query and count its SQL shape"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            # Django passes the parameterized SQL, so the string is already the query's shape.
+            self.shapes[sql] = self.shapes.get(sql, 0) + 1
+
+    def repeated_queries(self, threshold):
+        return {sql: count for sql, count in self.shapes.items() if count >= threshold}
+
+
+def record_query(execute, sql, params, many, context):
+    """Time a query for the request being measured, if any"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recording(connection, **kwargs):
+    # A wrapper on every connection rather than one per request: under ASGI the
+    # async ORM runs queries on another thread's connection, which sees the
+    # request's metrics through the context variable.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed(func):
+    def wrapper(*args, **kwargs):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+    wrapper.timed = True
+    return wrapper
+
+
+def install_serializer_timing():
+    # Serializer.data and ListSerializer.data are where DRF turns model
+    # instances into primitives; timing them separates serialization cost
+    # from query and rendering cost.
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, 'timed', False):
+            cls.data = property(timed(cls.data.fget))
+    # The fast path's equivalent, for both its sync and async callers. Its batch
+    # loads run before it and count as database time.
+    if not getattr(CompiledSerializer.represent, 'timed', False):
+        CompiledSerializer.represent = timed(CompiledSerializer.represent)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record SQL query count and time, serializer time and total time per request.
+
+    The numbers are sent back in a ``Server-Timing`` header and aggregated
+    per URL name for ``/api/metrics/``. A share of requests,
+    ``REQUEST_METRICS_LOG_SAMPLE_RATE`` (none by default), is also logged as
+    one JSON line on the ``api.metrics`` logger. Requests that run the same
+    SQL statement ``REQUEST_METRICS_N_PLUS_ONE_THRESHOLD`` or more times are
+    flagged as a likely N+1 pattern and always logged.
+
+    Runs natively under ASGI too, so async views are not pushed into a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.threshold = settings.REQUEST_METRICS_N_PLUS_ONE_THRESHOLD
+        self.log_sample_rate = settings.REQUEST_METRICS_LOG_SAMPLE_RATE
+        install_serializer_timing()
+        connection_created.connect(install_query_recording)
+        for connection in connections.all(initialized_only=True):
+            install_query_recording(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - started)
+
+    def record(self, request, response, metrics, total):
+        repeated = metrics.repeated_queries(self.threshold)
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serializer_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        registry.observe(
+            view, request.method, response.status_code, total,
+            metrics.db_time, metrics.queries, metrics.serializer_time, bool(repeated),
+        )
+
+        if not repeated and not (self.log_sample_rate and random.random() < self.log_sample_rate):
+            return response
+        record = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'db_queries': metrics.queries,
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+        }
+        if repeated:
+            record['n_plus_one'] = [
+                {'sql': sql[:200], 'count': count} for sql, count in repeated.items()
+            ]
+            logger.warning(json.dumps(record))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
+        return response
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI.
+
+    WhiteNoise 6 is sync-only, which makes Django run every request through a
+    thread under ASGI. Looking a path up in the index is a dict lookup, so only
+    serving a file (and, with autorefresh, finding it on disk) is left to a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class LazyWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that indexes ``STATIC_ROOT`` on the first static file request.
+
+    WhiteNoise stats every collected file when the middleware is built, i.e.
+    before a worker answers anything; used with ``FAST_STARTUP``, only a
+    request under ``STATIC_URL`` waits for it.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        super().__init__(get_response, settings=settings)
+
+    def add_files(self, root, prefix=None):
+        if self.autorefresh:
+            # Only records the directory.
+            super().add_files(root, prefix)
+        else:
+            self.pending.append((root, prefix))
+
+    def needs_index(self, request):
+        return self.pending and request.path_info.startswith(self.static_prefix)
+
+    def index_pending(self):
+        with self.pending_lock:
+            while self.pending:
+                super().add_files(*self.pending[0])
+                self.pending.pop(0)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.needs_index(request):
+            self.index_pending()
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.needs_index(request):
+            await sync_to_async(self.index_pending)()
+        return await super().__acall__(request)
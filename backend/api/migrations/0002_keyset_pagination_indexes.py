@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['-submitted_at', '-id'], name='contact_submitted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscription',
+            index=models.Index(fields=['-subscribed_at', '-id'], name='newsletter_subscribed_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectinquiry',
+            index=models.Index(fields=['-submitted_at', '-id'], name='inquiry_submitted_id_idx'),
+        ),
+    ]
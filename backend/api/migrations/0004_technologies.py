@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_catalog_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=500)),
+                ('slug', models.CharField(help_text='Lower-cased name, used for lookups', max_length=500, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Technology',
+                'verbose_name_plural': 'Technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=500)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_technologies', to='api.portfolioproject')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_technologies', to='api.technology')),
+            ],
+            options={
+                'verbose_name': 'Project Technology',
+                'verbose_name_plural': 'Project Technologies',
+                'ordering': ['project', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='portfolioproject',
+            name='technology_set',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='api.ProjectTechnology', to='api.technology'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('technology', 'project'), name='unique_project_technology'),
+        ),
+    ]
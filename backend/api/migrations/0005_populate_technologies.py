@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:40
+
+from django.db import migrations
+
+
+def parse_technologies(value):
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def populate_technologies(apps, schema_editor):
+    PortfolioProject = apps.get_model('api', 'PortfolioProject')
+    Technology = apps.get_model('api', 'Technology')
+    ProjectTechnology = apps.get_model('api', 'ProjectTechnology')
+
+    technologies = {}
+    links = []
+    for project in PortfolioProject.objects.only('id', 'technologies').iterator():
+        for position, name in enumerate(parse_technologies(project.technologies)):
+            slug = name.lower()
+            if slug not in technologies:
+                technologies[slug] = Technology.objects.create(name=name, slug=slug)
+            links.append(ProjectTechnology(
+                project_id=project.id,
+                technology=technologies[slug],
+                name=name,
+                position=position,
+            ))
+    ProjectTechnology.objects.bulk_create(links, batch_size=1000)
+
+
+def clear_technologies(apps, schema_editor):
+    apps.get_model('api', 'ProjectTechnology').objects.all().delete()
+    apps.get_model('api', 'Technology').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_technologies'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_technologies, clear_technologies),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-submitted_at', '-id'], name='contact_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-subscribed_at', '-id'], name='newsletter_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioproject',
+            index=models.Index(fields=['-created_at'], name='project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioproject',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['-created_at'], name='project_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioproject',
+            index=models.Index(fields=['category', '-created_at'], name='project_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectinquiry',
+            index=models.Index(fields=['status', '-submitted_at', '-id'], name='inquiry_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectinquiry',
+            index=models.Index(fields=['project_type', '-submitted_at', '-id'], name='inquiry_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(fields=['-created_at'], name='testimonial_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['-created_at'], name='testimonial_featured_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_spool_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('dimension', models.CharField(blank=True, default='', max_length=50)),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('bucket', models.DateTimeField(help_text='Start of the hour, day or month')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Metric Rollup',
+                'verbose_name_plural': 'Metric Rollups',
+                'ordering': ['metric', 'granularity', 'bucket', 'dimension'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='metricrollup',
+            constraint=models.UniqueConstraint(fields=('metric', 'granularity', 'bucket', 'dimension'), name='unique_metric_rollup'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_metric_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectinquiry',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='contactsubmission',
+            constraint=models.UniqueConstraint(fields=('fingerprint',), name='unique_contact_fingerprint'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectinquiry',
+            constraint=models.UniqueConstraint(fields=('fingerprint',), name='unique_inquiry_fingerprint'),
+        ),
+    ]
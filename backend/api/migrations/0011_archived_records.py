@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_submission_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=50)),
+                ('record_id', models.BigIntegerField(help_text="The row's id in its original table")),
+                ('timestamp', models.DateTimeField(help_text="The row's ordering timestamp, e.g. submitted_at")),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.BinaryField(help_text="zlib-compressed JSON of the row's fields")),
+            ],
+            options={
+                'verbose_name': 'Archived Record',
+                'verbose_name_plural': 'Archived Records',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['collection', '-timestamp', '-id'], name='archive_collection_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivedrecord',
+            constraint=models.UniqueConstraint(fields=('collection', 'record_id'), name='unique_archived_record'),
+        ),
+    ]
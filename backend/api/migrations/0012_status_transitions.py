@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_archived_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=50)),
+                ('field', models.CharField(max_length=50)),
+                ('new_value', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Rows changed')),
+                ('changed_by', models.CharField(blank=True, default='', max_length=150)),
+                ('source', models.CharField(choices=[('api', 'API'), ('admin', 'Admin')], default='api', max_length=10)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Status Transition',
+                'verbose_name_plural': 'Status Transitions',
+                'ordering': ['-changed_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_id', models.BigIntegerField()),
+                ('old_value', models.CharField(max_length=50)),
+                ('transition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='api.statustransition')),
+            ],
+            options={
+                'verbose_name': 'Status Change',
+                'verbose_name_plural': 'Status Changes',
+                'indexes': [models.Index(fields=['record_id'], name='status_change_record_idx')],
+            },
+        ),
+    ]
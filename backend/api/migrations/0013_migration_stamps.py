@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_status_transitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MigrationStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('migrations_hash', models.CharField(max_length=64, unique=True)),
+                ('migrated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Migration Stamp',
+                'verbose_name_plural': 'Migration Stamps',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def normalize_subscription_emails(apps, schema_editor):
+    """Lower-case stored addresses, merging subscriptions that only differed in case"""
+    NewsletterSubscription = apps.get_model('api', 'NewsletterSubscription')
+    kept = {}
+    for subscription in NewsletterSubscription.objects.order_by('subscribed_at', 'id').iterator():
+        email = subscription.email.strip().lower()
+        first = kept.get(email)
+        if first is None:
+            kept[email] = subscription
+            continue
+        # The oldest subscription stays, active if any of its copies was.
+        if subscription.is_active and not first.is_active:
+            first.is_active = True
+            first.save(update_fields=['is_active'])
+        subscription.delete()
+    for email, subscription in kept.items():
+        if subscription.email != email:
+            subscription.email = email
+            subscription.save(update_fields=['email'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_migration_stamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_subscription_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+from api.search_operations import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_normalize_subscription_emails'),
+    ]
+
+    operations = [
+        CreateSearchIndex('api_contactsubmission', ['name', 'email', 'message']),
+        CreateSearchIndex('api_projectinquiry', ['name', 'email', 'company', 'description']),
+        CreateSearchIndex('api_portfolioproject', ['title', 'description', 'technologies']),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+from api.search_operations import RestoreSearchIndex
+
+# SQLite drops and adds these constraints by remaking the tables, which drops their search triggers.
+SEARCH_INDEXES = [
+    RestoreSearchIndex('api_contactsubmission', ['name', 'email', 'message']),
+    RestoreSearchIndex('api_projectinquiry', ['name', 'email', 'company', 'description']),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_search_indexes'),
+    ]
+
+    operations = [
+        *SEARCH_INDEXES,
+        migrations.RemoveConstraint(
+            model_name='contactsubmission',
+            name='unique_contact_fingerprint',
+        ),
+        migrations.RemoveConstraint(
+            model_name='projectinquiry',
+            name='unique_inquiry_fingerprint',
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['fingerprint', '-submitted_at'], name='contact_fingerprint_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectinquiry',
+            index=models.Index(fields=['fingerprint', '-submitted_at'], name='inquiry_fingerprint_idx'),
+        ),
+        *SEARCH_INDEXES,
+    ]
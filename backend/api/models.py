@@ -1,9 +1,55 @@
+import hashlib
+
 from django.db import models
 from django.utils import timezone
 
 
-class ContactSubmission(models.Model):
+def normalize_text(text):
+    """Case-fold and collapse whitespace, so trivially different copies of a text compare equal"""
+    return ' '.join((text or '').casefold().split())
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def submission_fingerprint(email, text):
+    """Hash of the normalized email and text of a submission, identical for exact resubmissions"""
+    content = f'{normalize_email(email)}\0{normalize_text(text)}'
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class FingerprintedSubmission(models.Model):
+    """
+    A submission with a content fingerprint, for catching exact repeats (see api/dedup.py).
+
+    ``save()`` recomputes it, so it follows edits; code creating rows with
+    ``bulk_create`` calls ``set_fingerprint()`` itself. Rows from before
+    fingerprints were added keep NULL until they are next saved.
+    """
+    fingerprint_text_field = None
+
+    fingerprint = models.CharField(max_length=32, blank=True, null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def set_fingerprint(self):
+        self.fingerprint = submission_fingerprint(self.email, getattr(self, self.fingerprint_text_field))
+        return self.fingerprint
+
+    def save(self, *args, **kwargs):
+        self.set_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'email', self.fingerprint_text_field} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        super().save(*args, **kwargs)
+
+
+class ContactSubmission(FingerprintedSubmission):
     """Model for contact form submissions"""
+    fingerprint_text_field = 'message'
+
     name = models.CharField(max_length=200)
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
@@ -13,6 +59,15 @@ class ContactSubmission(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at', '-id'], name='contact_submitted_id_idx'),
+            models.Index(
+                fields=['-submitted_at', '-id'],
+                condition=models.Q(is_read=False),
+                name='contact_unread_idx',
+            ),
+            models.Index(fields=['fingerprint', '-submitted_at'], name='contact_fingerprint_idx'),
+        ]
         verbose_name = 'Contact Submission'
         verbose_name_plural = 'Contact Submissions'
 
@@ -28,6 +83,14 @@ class NewsletterSubscription(models.Model):
 
     class Meta:
         ordering = ['-subscribed_at']
+        indexes = [
+            models.Index(fields=['-subscribed_at', '-id'], name='newsletter_subscribed_id_idx'),
+            models.Index(
+                fields=['-subscribed_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='newsletter_active_idx',
+            ),
+        ]
         verbose_name = 'Newsletter Subscription'
         verbose_name_plural = 'Newsletter Subscriptions'
 
@@ -35,8 +98,10 @@ class NewsletterSubscription(models.Model):
         return self.email
 
 
-class ProjectInquiry(models.Model):
+class ProjectInquiry(FingerprintedSubmission):
     """Model for project inquiry/quote requests"""
+    fingerprint_text_field = 'description'
+
     PROJECT_TYPES = [
         ('web', 'Web Development'),
         ('mobile', 'Mobile App Development'),
@@ -67,6 +132,12 @@ class ProjectInquiry(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at', '-id'], name='inquiry_submitted_id_idx'),
+            models.Index(fields=['status', '-submitted_at', '-id'], name='inquiry_status_idx'),
+            models.Index(fields=['project_type', '-submitted_at', '-id'], name='inquiry_type_idx'),
+            models.Index(fields=['fingerprint', '-submitted_at'], name='inquiry_fingerprint_idx'),
+        ]
         verbose_name = 'Project Inquiry'
         verbose_name_plural = 'Project Inquiries'
 
@@ -74,12 +145,44 @@ class ProjectInquiry(models.Model):
         return f"Project Inquiry from {self.name} - {self.project_type}"
 
 
+def parse_technologies(value):
+    """Split a comma-separated technologies string into unique, non-empty names, in order"""
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+class Technology(models.Model):
+    """A technology used by portfolio projects, e.g. React or PostgreSQL"""
+    name = models.CharField(max_length=500)
+    slug = models.CharField(max_length=500, unique=True, help_text="Lower-cased name, used for lookups")
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Technology'
+        verbose_name_plural = 'Technologies'
+
+    def __str__(self):
+        return self.name
+
+
 class PortfolioProject(models.Model):
     """Model for portfolio projects"""
     title = models.CharField(max_length=200)
     description = models.TextField()
     image_url = models.URLField(blank=True, null=True)
     technologies = models.CharField(max_length=500, help_text="Comma-separated list of technologies")
+    technology_set = models.ManyToManyField(
+        Technology,
+        through='ProjectTechnology',
+        related_name='projects',
+        blank=True,
+    )
     project_url = models.URLField(blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
     category = models.CharField(
@@ -93,15 +196,65 @@ class PortfolioProject(models.Model):
     )
     featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='project_created_idx'),
+            # Partial rather than (featured, -created_at): the ORM filters booleans as a bare
+            # "WHERE featured", which SQLite only matches against an index with the same WHERE.
+            models.Index(fields=['-created_at'], condition=models.Q(featured=True), name='project_featured_idx'),
+            models.Index(fields=['category', '-created_at'], name='project_category_idx'),
+        ]
         verbose_name = 'Portfolio Project'
         verbose_name_plural = 'Portfolio Projects'
 
     def __str__(self):
         return self.title
 
+    def sync_technologies(self):
+        """Rebuild the technology relation from the ``technologies`` string"""
+        names = parse_technologies(self.technologies)
+        slugs = [name.lower() for name in names]
+        existing = {t.slug: t for t in Technology.objects.filter(slug__in=slugs)}
+        missing = [
+            Technology(name=name, slug=slug)
+            for name, slug in zip(names, slugs) if slug not in existing
+        ]
+        if missing:
+            Technology.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = {t.slug: t for t in Technology.objects.filter(slug__in=slugs)}
+
+        self.project_technologies.all().delete()
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project=self, technology=existing[slug], name=name, position=position)
+            for position, (name, slug) in enumerate(zip(names, slugs))
+        ])
+
+
+class ProjectTechnology(models.Model):
+    """A technology on a portfolio project, keeping the project's own spelling and order"""
+    project = models.ForeignKey(
+        PortfolioProject, on_delete=models.CASCADE, related_name='project_technologies'
+    )
+    technology = models.ForeignKey(
+        Technology, on_delete=models.CASCADE, related_name='project_technologies'
+    )
+    name = models.CharField(max_length=500)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['project', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['technology', 'project'], name='unique_project_technology'),
+        ]
+        verbose_name = 'Project Technology'
+        verbose_name_plural = 'Project Technologies'
+
+    def __str__(self):
+        return f"{self.project} - {self.name}"
+
 
 class Testimonial(models.Model):
     """Model for client testimonials"""
@@ -116,11 +269,177 @@ class Testimonial(models.Model):
     image_url = models.URLField(blank=True, null=True)
     featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='testimonial_created_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(featured=True), name='testimonial_featured_idx'),
+        ]
         verbose_name = 'Testimonial'
         verbose_name_plural = 'Testimonials'
 
     def __str__(self):
         return f"Testimonial from {self.client_name}"
+
+
+class Job(models.Model):
+    """A unit of background work (e.g. a notification), run by `manage.py run_workers`"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class SpoolCheckpoint(models.Model):
+    """The last submission spool entry committed to this database, per spool file (see api/spool.py)"""
+    spool_id = models.CharField(max_length=64, unique=True)
+    last_entry_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Spool Checkpoint'
+        verbose_name_plural = 'Spool Checkpoints'
+
+    def __str__(self):
+        return f"{self.spool_id} @ {self.last_entry_id}"
+
+
+class MetricRollup(models.Model):
+    """A pre-aggregated count for one metric, dimension and time bucket (see api/rollups.py)"""
+    HOUR = 'hour'
+    DAY = 'day'
+    MONTH = 'month'
+    GRANULARITIES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+        (MONTH, 'Month'),
+    ]
+
+    metric = models.CharField(max_length=50)
+    dimension = models.CharField(max_length=50, blank=True, default='')
+    granularity = models.CharField(max_length=10, choices=GRANULARITIES)
+    bucket = models.DateTimeField(help_text="Start of the hour, day or month")
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['metric', 'granularity', 'bucket', 'dimension']
+        constraints = [
+            # Also the index behind every date range query.
+            models.UniqueConstraint(
+                fields=['metric', 'granularity', 'bucket', 'dimension'], name='unique_metric_rollup'
+            ),
+        ]
+        verbose_name = 'Metric Rollup'
+        verbose_name_plural = 'Metric Rollups'
+
+    def __str__(self):
+        return f"{self.metric}[{self.dimension}] {self.granularity} {self.bucket:%Y-%m-%d %H:%M} = {self.value}"
+
+
+class ArchivedRecord(models.Model):
+    """A row moved out of its table by a retention policy, stored compressed (see api/retention.py)"""
+    collection = models.CharField(max_length=50)
+    record_id = models.BigIntegerField(help_text="The row's id in its original table")
+    timestamp = models.DateTimeField(help_text="The row's ordering timestamp, e.g. submitted_at")
+    archived_at = models.DateTimeField(default=timezone.now)
+    data = models.BinaryField(help_text="zlib-compressed JSON of the row's fields")
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['collection', '-timestamp', '-id'], name='archive_collection_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'record_id'], name='unique_archived_record'),
+        ]
+        verbose_name = 'Archived Record'
+        verbose_name_plural = 'Archived Records'
+
+    def __str__(self):
+        return f"{self.collection} #{self.record_id}"
+
+
+class StatusTransition(models.Model):
+    """One bulk status change: who moved which collection's rows to what, and when (see api/transitions.py)"""
+    API = 'api'
+    ADMIN = 'admin'
+    SOURCES = [
+        (API, 'API'),
+        (ADMIN, 'Admin'),
+    ]
+
+    collection = models.CharField(max_length=50)
+    field = models.CharField(max_length=50)
+    new_value = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0, help_text="Rows changed")
+    changed_by = models.CharField(max_length=150, blank=True, default='')
+    source = models.CharField(max_length=10, choices=SOURCES, default=API)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-changed_at', '-id']
+        verbose_name = 'Status Transition'
+        verbose_name_plural = 'Status Transitions'
+
+    def __str__(self):
+        return f"{self.collection}: {self.count} {self.field} -> {self.new_value}"
+
+
+class StatusChange(models.Model):
+    """A row moved by a status transition, with the value it had before"""
+    transition = models.ForeignKey(StatusTransition, on_delete=models.CASCADE, related_name='changes')
+    record_id = models.BigIntegerField()
+    old_value = models.CharField(max_length=50)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['record_id'], name='status_change_record_idx'),
+        ]
+        verbose_name = 'Status Change'
+        verbose_name_plural = 'Status Changes'
+
+    def __str__(self):
+        return f"#{self.record_id}: {self.old_value} -> {self.transition.new_value}"
+
+
+class MigrationStamp(models.Model):
+    """Hash of the migration files this database was last migrated to (see the migrate_if_changed command)"""
+    migrations_hash = models.CharField(max_length=64, unique=True)
+    migrated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Migration Stamp'
+        verbose_name_plural = 'Migration Stamps'
+
+    def __str__(self):
+        return self.migrations_hash
@@ -0,0 +1,149 @@
+import base64
+import binascii
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .fast_serializers import NativeDict, NativeList
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (timestamp, id), newest first.
+
+    Every page is a single indexed range scan with a LIMIT, so fetching a page
+    costs the same no matter how deep into the table it is. The cursor is an
+    opaque token holding the boundary row's timestamp and id plus the
+    direction to read in.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering_field='submitted_at'):
+        self.ordering_field = ordering_field
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        field = self.ordering_field
+        if self.cursor is None:
+            reverse = False
+        else:
+            position, pk, reverse = self.cursor
+            if reverse:
+                boundary = Q(**{f'{field}__gt': position}) | Q(**{field: position, 'pk__gt': pk})
+            else:
+                boundary = Q(**{f'{field}__lt': position}) | Q(**{field: position, 'pk__lt': pk})
+            queryset = queryset.filter(boundary)
+
+        if reverse:
+            queryset = queryset.order_by(field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{field}', '-pk')
+
+        # Fetch one extra row to learn whether another page exists.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        envelope = NativeDict if isinstance(data, NativeList) else dict
+        return Response(envelope({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Ran off the end of the table; the first page is a safe way back.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            position = parse_datetime(tokens['p'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if position is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position, pk, reverse
+
+    def encode_cursor(self, obj, reverse):
+        # Pages are model instances, or .values() rows on the fast serialization path.
+        if isinstance(obj, dict):
+            position, pk = obj[self.ordering_field], obj['id']
+        else:
+            position, pk = getattr(obj, self.ordering_field), obj.pk
+        tokens = {
+            'p': position.isoformat(),
+            'i': pk,
+        }
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = base64.urlsafe_b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,16 @@
+from rest_framework.parsers import BaseParser
+
+
+class StreamParser(BaseParser):
+    """
+    Accepts any body without reading it: ``request.data`` is the body stream.
+
+    For views that stream the body themselves (``request.stream``). With no
+    parser at all, DRF refuses the body as soon as anything touches
+    ``request.POST``, which ``SessionAuthentication``'s CSRF check does for
+    every signed-in ``POST``.
+    """
+    media_type = '*/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
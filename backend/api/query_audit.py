@@ -0,0 +1,211 @@
+"""
+EXPLAIN the queries behind every API view and flag sequential scans.
+
+``AUDITED_QUERIES`` builds each view's queryset the same way the view does.
+``audit`` asks the database for its plan and reports every table it reads
+without an index. Queries that return a whole table by design (the unpaged
+catalog lists and the admin dashboard) are marked as allowed to scan.
+Used by ``python manage.py explain_queries``.
+"""
+import re
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .fast_serializers import values_for
+from .retention import RETENTION_POLICIES, archived_queryset, eligible
+from .rollups import METRICS
+from .models import (
+    ArchivedRecord,
+    ContactSubmission,
+    Job,
+    MetricRollup,
+    NewsletterSubscription,
+    ProjectInquiry,
+    PortfolioProject,
+    Testimonial,
+)
+from .serializers import (
+    ContactSubmissionSerializer,
+    NewsletterSubscriptionSerializer,
+    ProjectInquirySerializer,
+    PortfolioProjectSerializer,
+    TestimonialSerializer,
+)
+
+PAGE_SIZE = 50
+
+SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?$')
+POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def keyset_page(model, serializer_class, ordering_field, **filters):
+    """The second page of a KeysetPagination list, which adds the cursor boundary"""
+    now = timezone.now()
+    boundary = Q(**{f'{ordering_field}__lt': now}) | Q(**{ordering_field: now, 'pk__lt': 1})
+    queryset = model.objects.filter(boundary, **filters).order_by(f'-{ordering_field}', '-pk')
+    return values_for(serializer_class, queryset)[:PAGE_SIZE + 1]
+
+
+def first_page(model, serializer_class, ordering_field, **filters):
+    queryset = model.objects.filter(**filters).order_by(f'-{ordering_field}', '-pk')
+    return values_for(serializer_class, queryset)[:PAGE_SIZE + 1]
+
+
+# name -> (queryset factory, whether a full scan is expected because the view returns every row)
+AUDITED_QUERIES = {
+    'portfolio_projects': (lambda: values_for(PortfolioProjectSerializer, PortfolioProject.objects.all()), True),
+    'portfolio_projects?featured': (
+        lambda: values_for(PortfolioProjectSerializer, PortfolioProject.objects.filter(featured=True)), False,
+    ),
+    'portfolio_projects?category': (
+        lambda: values_for(PortfolioProjectSerializer, PortfolioProject.objects.filter(category='web')), False,
+    ),
+    'portfolio_projects?technology': (
+        lambda: values_for(
+            PortfolioProjectSerializer,
+            PortfolioProject.objects.filter(project_technologies__technology__slug='django'),
+        ),
+        False,
+    ),
+    'portfolio_project_detail': (
+        lambda: values_for(PortfolioProjectSerializer, PortfolioProject.objects.filter(pk=1)), False,
+    ),
+    'testimonials': (lambda: values_for(TestimonialSerializer, Testimonial.objects.all()), True),
+    'testimonials?featured': (
+        lambda: values_for(TestimonialSerializer, Testimonial.objects.filter(featured=True)), False,
+    ),
+    'contact_list': (lambda: first_page(ContactSubmission, ContactSubmissionSerializer, 'submitted_at'), False),
+    'contact_list?cursor': (
+        lambda: keyset_page(ContactSubmission, ContactSubmissionSerializer, 'submitted_at'), False,
+    ),
+    'contact_list (unread)': (
+        lambda: first_page(ContactSubmission, ContactSubmissionSerializer, 'submitted_at', is_read=False), False,
+    ),
+    'project_inquiry_list': (lambda: first_page(ProjectInquiry, ProjectInquirySerializer, 'submitted_at'), False),
+    'project_inquiry_list?cursor': (
+        lambda: keyset_page(ProjectInquiry, ProjectInquirySerializer, 'submitted_at'), False,
+    ),
+    'project_inquiry_list (status)': (
+        lambda: first_page(ProjectInquiry, ProjectInquirySerializer, 'submitted_at', status='new'), False,
+    ),
+    'project_inquiry_list (project_type)': (
+        lambda: first_page(ProjectInquiry, ProjectInquirySerializer, 'submitted_at', project_type='web'), False,
+    ),
+    'newsletter_list': (
+        lambda: first_page(NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at'), False,
+    ),
+    'newsletter_list?cursor': (
+        lambda: keyset_page(NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at'), False,
+    ),
+    'newsletter_list (active)': (
+        lambda: first_page(
+            NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at', is_active=True,
+        ),
+        False,
+    ),
+    'newsletter_subscribe': (lambda: NewsletterSubscription.objects.filter(email='someone@example.com'), False),
+    'admin_dashboard contacts': (
+        lambda: values_for(ContactSubmissionSerializer, ContactSubmission.objects.order_by('-submitted_at', '-id')), True,
+    ),
+    'admin_dashboard inquiries': (
+        lambda: values_for(ProjectInquirySerializer, ProjectInquiry.objects.order_by('-submitted_at', '-id')), True,
+    ),
+    'admin_dashboard subscriptions': (
+        lambda: values_for(
+            NewsletterSubscriptionSerializer, NewsletterSubscription.objects.order_by('-subscribed_at', '-id'),
+        ),
+        True,
+    ),
+    'admin_dashboard?mode=summary contacts': (
+        lambda: first_page(ContactSubmission, ContactSubmissionSerializer, 'submitted_at')[:5], False,
+    ),
+    'admin_dashboard?mode=summary inquiries': (
+        lambda: first_page(ProjectInquiry, ProjectInquirySerializer, 'submitted_at')[:5], False,
+    ),
+    'admin_dashboard?mode=summary subscriptions': (
+        lambda: first_page(NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at')[:5], False,
+    ),
+    'admin_analytics': (
+        lambda: MetricRollup.objects.filter(
+            metric__in=METRICS, granularity=MetricRollup.DAY, bucket__gte=timezone.now(), bucket__lt=timezone.now(),
+        ).values_list('metric', 'dimension', 'bucket', 'value'),
+        False,
+    ),
+    **{
+        f'archive {name}': (lambda name=name: eligible(name, 365).values('id')[:1000], False)
+        for name in RETENTION_POLICIES
+    },
+    **{
+        f'{name}?archived': (
+            lambda name=name: archived_queryset(name).order_by('-timestamp', '-pk')[:PAGE_SIZE + 1], False,
+        )
+        for name in RETENTION_POLICIES
+    },
+    'admin_record (archived)': (
+        lambda: ArchivedRecord.objects.filter(collection='contact_submissions', record_id=1)[:1], False,
+    ),
+    'run_workers claim': (
+        lambda: Job.objects.filter(status=Job.PENDING, run_at__lte=timezone.now()).order_by('run_at', 'id')[:1],
+        False,
+    ),
+}
+
+
+def table_sizes():
+    return {model._meta.db_table: model.objects.count() for model in apps.get_app_config('api').get_models()}
+
+
+def partial_indexes():
+    """Names of the partial indexes on SQLite, which only hold the rows a query asks for"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def scanned_tables(plan, limited, partial=frozenset()):
+    """
+    Return the tables the plan reads in full.
+
+    On SQLite that is a bare ``SCAN table``, or ``SCAN table USING INDEX`` over
+    a full index when the query has no LIMIT to stop it early: a filter the
+    index cannot seek on is then checked against every row.
+    """
+    if connection.vendor == 'sqlite':
+        # Django formats each EXPLAIN QUERY PLAN row as "id parent notused detail".
+        tables = []
+        for line in plan.splitlines():
+            match = SQLITE_SCAN_RE.match(line.split(' ', 3)[-1])
+            if match is None:
+                continue
+            table, index = match.groups()
+            if index is None or (not limited and index not in partial):
+                tables.append(table)
+        return tables
+    return POSTGRES_SCAN_RE.findall(plan)
+
+
+def audit(threshold, names=None):
+    """
+    EXPLAIN each audited query and yield ``(name, plan, problems)``.
+
+    ``problems`` lists the tables holding more than ``threshold`` rows that are
+    read with a sequential scan, unless the query is expected to read them in full.
+    """
+    sizes = table_sizes()
+    partial = partial_indexes() if connection.vendor == 'sqlite' else frozenset()
+    for name, (factory, full_scan_expected) in AUDITED_QUERIES.items():
+        if names and name not in names:
+            continue
+        queryset = factory()
+        plan = queryset.explain()
+        problems = []
+        if not full_scan_expected:
+            limited = queryset.query.high_mark is not None
+            for table in scanned_tables(plan, limited, partial):
+                rows = sizes.get(table)
+                if rows is not None and rows > threshold:
+                    problems.append(f'sequential scan on {table} ({rows} rows)')
+        yield name, plan, problems
@@ -0,0 +1,235 @@
+"""
+Token bucket rate limiting for the public submit endpoints.
+
+Every client IP and every submitted email address gets a bucket per endpoint
+holding up to N tokens, refilled at N per period (``RATE_LIMIT_IP`` and
+``RATE_LIMIT_EMAIL``, in DRF's ``'N/period'`` notation). A request takes one
+token from each and is refused with ``429 Too Many Requests`` when either is
+empty. The bulk submit endpoints instead take one token per submitted item
+from a per-IP bucket of ``RATE_LIMIT_BULK_IP`` items, so batching does not
+get around the limit. ``newsletter/unsubscribe/`` is limited per IP only: a
+per-email bucket there would let anyone block someone else's unsubscribe.
+
+A bucket is stored as a single float, the time at which it will be full
+again (the GCRA formulation of a token bucket), in a dict per process. Full
+buckets carry no information, so a sweep every ``RATE_LIMIT_EVICT_INTERVAL``
+seconds drops them. The check runs in the ``@rate_limited`` view decorator,
+before DRF parses the request, the serializer validates it or anything
+touches the database; a refusal is a few dict lookups and a prebuilt response.
+
+With ``RATE_LIMIT_BACKEND=cache`` the buckets live in the cache named by
+``RATE_LIMIT_CACHE_ALIAS`` instead (e.g. the database cache table), shared by
+all workers. Each worker still remembers locally until when a key is refused,
+so a client that keeps hammering is turned away without a cache round trip.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from functools import lru_cache, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+REFUSED_BODY = json.dumps({'error': 'Too many requests, please try again later'}).encode()
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """``'10/min'`` -> ``(10, 60)``: bucket size and the seconds it takes to refill it"""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class LocalBuckets:
+    """Buckets of one process: key -> time at which the bucket is full again"""
+
+    def __init__(self, evict_interval, max_keys):
+        self.full_at = {}
+        self.lock = threading.Lock()
+        self.evict_interval = evict_interval
+        self.max_keys = max_keys
+        self.next_eviction = time.time() + evict_interval
+
+    def take(self, key, size, period, now, cost=1):
+        """Take ``cost`` tokens; returns 0 when there were enough, else the seconds until there are"""
+        interval = period / size * cost
+        with self.lock:
+            full_at = max(self.full_at.get(key, now), now) + interval
+            if full_at - now > period:
+                return full_at - now - period
+            self.set(key, full_at, now)
+        return 0
+
+    def set(self, key, full_at, now):
+        # Called with the lock held.
+        self.full_at[key] = full_at
+        if now >= self.next_eviction or len(self.full_at) > self.max_keys:
+            self.evict(now)
+
+    def evict(self, now):
+        self.full_at = {key: full_at for key, full_at in self.full_at.items() if full_at > now}
+        if len(self.full_at) > self.max_keys:
+            # Under a flood of distinct keys, forget them all rather than grow without bound.
+            self.full_at = {}
+        self.next_eviction = now + self.evict_interval
+
+
+class CacheBuckets:
+    """
+    Buckets in a shared cache, fronted by a local record of refused keys.
+
+    The read and write of a bucket are not atomic across workers, so
+    concurrent requests for the same key can occasionally all get through;
+    the limits are approximate, which is fine for abuse throttling.
+    """
+
+    def __init__(self, cache_alias, evict_interval, max_keys):
+        self.cache = caches[cache_alias]
+        # key -> time until which it is refused, without asking the cache.
+        self.refused = LocalBuckets(evict_interval, max_keys)
+
+    def take(self, key, size, period, now, cost=1):
+        refused_until = self.refused.full_at.get(key)
+        if refused_until is not None and refused_until > now:
+            return refused_until - now
+        cache_key = f'api:ratelimit:{key}'
+        full_at = max(self.cache.get(cache_key, now), now) + period / size * cost
+        if full_at - now > period:
+            wait = full_at - now - period
+            with self.refused.lock:
+                self.refused.set(key, now + wait, now)
+            return wait
+        self.cache.set(cache_key, full_at, timeout=math.ceil(full_at - now))
+        return 0
+
+
+_buckets = None
+_buckets_lock = threading.Lock()
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        with _buckets_lock:
+            if _buckets is None:
+                if settings.RATE_LIMIT_BACKEND == 'cache':
+                    _buckets = CacheBuckets(
+                        settings.RATE_LIMIT_CACHE_ALIAS,
+                        settings.RATE_LIMIT_EVICT_INTERVAL,
+                        settings.RATE_LIMIT_MAX_KEYS,
+                    )
+                else:
+                    _buckets = LocalBuckets(settings.RATE_LIMIT_EVICT_INTERVAL, settings.RATE_LIMIT_MAX_KEYS)
+    return _buckets
+
+
+def client_ip(request):
+    # DRF's logic: honours X-Forwarded-For only up to NUM_PROXIES trusted proxies.
+    return BaseThrottle().get_ident(request)
+
+
+def json_body(request):
+    if request.content_type != 'application/json':
+        return None
+    try:
+        return json.loads(request.body)
+    except ValueError:
+        return None
+
+
+def submitted_email(request):
+    """The ``email`` of a JSON body, lower-cased, or None"""
+    data = json_body(request)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def submitted_items(request):
+    """How many submissions a bulk request carries (see api/bulk.py), at least 1"""
+    data = json_body(request)
+    if isinstance(data, dict):
+        data = data.get('items')
+    return max(len(data), 1) if isinstance(data, list) else 1
+
+
+def check_items(request, scope):
+    """``check`` for bulk endpoints: one token per submitted item from the IP's bucket"""
+    rate = parse_rate(settings.RATE_LIMIT_BULK_IP)
+    if not rate:
+        return 0
+    # More items than the bucket holds could never get through: such a request
+    # empties the bucket and is then refused by the view's BULK_SUBMIT_MAX_ITEMS.
+    cost = min(submitted_items(request), rate[0])
+    return get_buckets().take(f'{scope}:ip:{client_ip(request)}', *rate, time.time(), cost)
+
+
+def check(request, scope, by_email=True):
+    """Return 0 if ``request`` may proceed, else the seconds until it may"""
+    buckets = get_buckets()
+    now = time.time()
+    ip_rate = parse_rate(settings.RATE_LIMIT_IP)
+    if ip_rate:
+        wait = buckets.take(f'{scope}:ip:{client_ip(request)}', *ip_rate, now)
+        if wait:
+            return wait
+    email_rate = parse_rate(settings.RATE_LIMIT_EMAIL) if by_email else None
+    if email_rate:
+        email = submitted_email(request)
+        if email:
+            return buckets.take(f'{scope}:email:{email}', *email_rate, now)
+    return 0
+
+
+def refused(wait):
+    response = HttpResponse(REFUSED_BODY, status=429, content_type='application/json')
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def rate_limited(scope, by_email=True, per_item=False):
+    """
+    Refuse requests over the IP or email rate limits of ``scope`` with a 429.
+
+    ``by_email=False`` leaves out the per-email bucket; ``per_item`` charges
+    bulk requests per submitted item instead (see ``check_items``). Works on
+    sync (``@api_view``) and async views; put it outermost so it runs before
+    anything else.
+    """
+    if per_item:
+        check_request = check_items
+    else:
+        def check_request(request, scope):
+            return check(request, scope, by_email)
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapped_view(request, *args, **kwargs):
+                if settings.RATE_LIMIT_ENABLED:
+                    if isinstance(get_buckets(), CacheBuckets):
+                        # Cache backends are sync-only.
+                        wait = await sync_to_async(check_request)(request, scope)
+                    else:
+                        wait = check_request(request, scope)
+                    if wait:
+                        return refused(wait)
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def wrapped_view(request, *args, **kwargs):
+                if settings.RATE_LIMIT_ENABLED:
+                    wait = check_request(request, scope)
+                    if wait:
+                        return refused(wait)
+                return view_func(request, *args, **kwargs)
+        return wrapped_view
+    return decorator
@@ -0,0 +1,37 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+from .fast_serializers import NativeDict, NativeList
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes fast-path data with orjson when it is installed.
+
+    Only ``NativeList`` / ``NativeDict`` data is handed to orjson: it holds
+    nothing but strings, integers, booleans, None, lists and dicts, which
+    orjson writes byte-for-byte like the stdlib encoder in DRF's default
+    compact, non-ASCII-escaping mode. Anything else (floats, datetimes,
+    Decimals, indented output) goes through the stdlib path unchanged.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not isinstance(data, (NativeList, NativeDict))
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            # e.g. integers beyond 64 bits or lone surrogates.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes these to stay a strict JavaScript subset.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,241 @@
+"""
+Server-side cache of rendered JSON for the high-traffic public endpoints.
+
+A cache hit returns the stored bytes directly, skipping the ORM, the
+serializer and the renderer. Entries are invalidated by bumping a per-model
+generation from the ``post_save``/``post_delete`` receivers in ``api.signals``,
+and expire after ``RESPONSE_CACHE_TIMEOUT`` seconds.
+
+Expired or invalidated entries are kept for a further
+``RESPONSE_CACHE_STALE_TIMEOUT`` seconds. When one is found, the first worker
+to take the rebuild lock re-renders it while everyone else keeps serving the
+stale bytes, so a popular key never sends a burst of identical queries to the
+database. A key with no entry at all (a cold cache, an eviction) is rebuilt
+under the same lock: the others wait up to ``RESPONSE_CACHE_MISS_WAIT``
+seconds for the entry it stores, and only render it themselves if it does
+not appear in time or the rebuild fails.
+
+Compressed copies are cached too, one per entry and encoding under the
+entry's key plus the encoding, and fetched in the same round trip as the
+entry; see ``api.compression``.
+
+The async views of ``api.async_views`` are cached the same way, through the
+cache's async API.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .compression import accepted_encoding
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def generation_key(model):
+    return f'api:responses:generation:{model._meta.label_lower}'
+
+
+def invalidate_responses(model):
+    """Mark every cached response built from ``model`` as stale"""
+    get_response_cache().set(generation_key(model), time.time_ns(), None)
+
+
+def build_response(entry, state, key, encoding, compressed=None):
+    """
+    Answer with a cached ``entry``, handing its compressed copy to the compression middleware.
+
+    ``compressed`` is the ``(fresh_until, body)`` stored under the entry's key
+    for ``encoding``; its ``fresh_until`` identifies the entry it was made from.
+    """
+    response = HttpResponse(entry['body'], content_type=entry['content_type'])
+    response['X-Response-Cache'] = state
+    if encoding is None:
+        return response
+    if compressed is not None and compressed[0] == entry['fresh_until']:
+        response.compressed_bodies = {encoding: compressed[1]}
+    else:
+        def store_compressed(encoding, body):
+            # Expires with the entry.
+            timeout = entry['fresh_until'] + settings.RESPONSE_CACHE_STALE_TIMEOUT - time.time()
+            if timeout > 0:
+                get_response_cache().set(f'{key}:{encoding}', (entry['fresh_until'], body), timeout)
+
+        async def astore_compressed(encoding, body):
+            timeout = entry['fresh_until'] + settings.RESPONSE_CACHE_STALE_TIMEOUT - time.time()
+            if timeout > 0:
+                await get_response_cache().aset(f'{key}:{encoding}', (entry['fresh_until'], body), timeout)
+        response.store_compressed = store_compressed
+        response.astore_compressed = astore_compressed
+    return response
+
+
+def response_key(view_func, request, kwargs, vary_on, media_type):
+    variant = repr((
+        sorted(kwargs.items()),
+        # Raw values: a view may compare them case-sensitively (e.g. ?category=).
+        [request.GET.get(name, '') for name in vary_on],
+        media_type,
+    ))
+    # Query values are client-supplied, so hash them into a key every backend accepts.
+    return 'api:responses:{}:{}'.format(
+        view_func.__name__,
+        hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest(),
+    )
+
+
+def new_entry(body, content_type, generation):
+    return {
+        'body': body,
+        'content_type': content_type,
+        'generation': generation,
+        'fresh_until': time.time() + settings.RESPONSE_CACHE_TIMEOUT,
+    }
+
+
+def is_fresh(entry, generation):
+    return entry['generation'] == generation and time.time() < entry['fresh_until']
+
+
+# Seconds between looks for the entry another worker is building.
+MISS_POLL_INTERVAL = 0.02
+
+
+def wait_for_entry(cache, key):
+    """The entry another worker is building under ``key``, or None once it gives up or the wait times out"""
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_MISS_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(MISS_POLL_INTERVAL)
+        cached = cache.get_many([key, f'{key}:lock'])
+        if key in cached or f'{key}:lock' not in cached:
+            return cached.get(key)
+    return None
+
+
+async def await_entry(cache, key):
+    """``wait_for_entry`` without blocking the event loop"""
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_MISS_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(MISS_POLL_INTERVAL)
+        cached = await cache.aget_many([key, f'{key}:lock'])
+        if key in cached or f'{key}:lock' not in cached:
+            return cached.get(key)
+    return None
+
+
+def cache_response(model, vary_on=()):
+    """
+    Cache the rendered JSON of a function-based API view.
+
+    Apply it below ``@api_view`` so the request has already been negotiated.
+    Only the query parameters listed in ``vary_on`` are part of the cache key.
+    Responses rendered by anything other than the JSON renderer (e.g. the
+    browsable API) are passed through untouched. On an async view (which
+    renders its own JSON ``HttpResponse``), the response body is cached.
+    """
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            return cache_async_response(view_func, model, vary_on)
+
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            renderer = getattr(request, 'accepted_renderer', None)
+            if renderer is None or renderer.format != 'json':
+                return view_func(request, *args, **kwargs)
+
+            key = response_key(view_func, request, kwargs, vary_on, request.accepted_media_type)
+            lock_key = f'{key}:lock'
+            gen_key = generation_key(model)
+            encoding = accepted_encoding(request)
+            compressed_key = f'{key}:{encoding}'
+
+            cache = get_response_cache()
+            cached = cache.get_many([key, gen_key, compressed_key] if encoding else [key, gen_key])
+            entry = cached.get(key)
+            generation = cached.get(gen_key, 0)
+
+            if entry is not None and is_fresh(entry, generation):
+                return build_response(entry, 'HIT', key, encoding, cached.get(compressed_key))
+            locked = cache.add(lock_key, True, settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+            if not locked:
+                # Another worker is already rebuilding this entry.
+                if entry is not None:
+                    return build_response(entry, 'STALE', key, encoding, cached.get(compressed_key))
+                entry = wait_for_entry(cache, key)
+                if entry is not None:
+                    return build_response(entry, 'HIT', key, encoding)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+
+                content_type = request.accepted_media_type
+                if renderer.charset:
+                    content_type = f'{content_type}; charset={renderer.charset}'
+                body = renderer.render(
+                    response.data,
+                    request.accepted_media_type,
+                    {'request': request, 'response': response},
+                )
+                entry = new_entry(body, content_type, generation)
+                cache.set(
+                    key,
+                    entry,
+                    settings.RESPONSE_CACHE_TIMEOUT + settings.RESPONSE_CACHE_STALE_TIMEOUT,
+                )
+                return build_response(entry, 'MISS', key, encoding)
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+        return wrapped_view
+    return decorator
+
+
+def cache_async_response(view_func, model, vary_on):
+    """``cache_response`` for an async view, without blocking the event loop on the cache"""
+    @wraps(view_func)
+    async def wrapped_view(request, *args, **kwargs):
+        key = response_key(view_func, request, kwargs, vary_on, 'application/json')
+        lock_key = f'{key}:lock'
+        gen_key = generation_key(model)
+        encoding = accepted_encoding(request)
+        compressed_key = f'{key}:{encoding}'
+
+        cache = get_response_cache()
+        cached = await cache.aget_many([key, gen_key, compressed_key] if encoding else [key, gen_key])
+        entry = cached.get(key)
+        generation = cached.get(gen_key, 0)
+
+        if entry is not None and is_fresh(entry, generation):
+            return build_response(entry, 'HIT', key, encoding, cached.get(compressed_key))
+        locked = await cache.aadd(lock_key, True, settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if entry is not None:
+                return build_response(entry, 'STALE', key, encoding, cached.get(compressed_key))
+            entry = await await_entry(cache, key)
+            if entry is not None:
+                return build_response(entry, 'HIT', key, encoding)
+
+        try:
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            entry = new_entry(response.content, response['Content-Type'], generation)
+            await cache.aset(
+                key,
+                entry,
+                settings.RESPONSE_CACHE_TIMEOUT + settings.RESPONSE_CACHE_STALE_TIMEOUT,
+            )
+            return build_response(entry, 'MISS', key, encoding)
+        finally:
+            if locked:
+                await cache.adelete(lock_key)
+    return wrapped_view
@@ -0,0 +1,158 @@
+"""
+Retention policies: move old submissions out of the live tables into a compressed archive.
+
+Every list, the admin dashboard and the counters read the live tables, which
+otherwise only grow. ``RETENTION_POLICIES`` says which rows of each collection
+may leave them (read contacts, closed inquiries, unsubscribed addresses) and
+after how many days. ``python manage.py archive`` moves those rows into
+``ArchivedRecord``, one zlib-compressed JSON document per row, in transactions
+of ``ARCHIVE_BATCH_SIZE`` rows: each batch is copied and deleted atomically, so
+a row is always in exactly one of the two places and an interrupted run just
+resumes where it stopped.
+
+Archived rows are history, not deletions: they are removed with a plain
+DELETE rather than ``QuerySet.delete()``, whose ``post_delete`` signals would
+take them out of the analytics rollups. They stay readable through
+``archived_queryset`` and ``get_record``, which rebuild model instances so the
+usual serializers render them exactly as before.
+"""
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import invalidate_counters
+from .models import ArchivedRecord, ContactSubmission, NewsletterSubscription, ProjectInquiry
+from .serializers import (
+    ContactSubmissionSerializer,
+    NewsletterSubscriptionSerializer,
+    ProjectInquirySerializer,
+)
+
+# name -> (model, serializer, ordering timestamp, rows that may be archived, setting holding their retention in days)
+RETENTION_POLICIES = {
+    'contact_submissions': (
+        ContactSubmission, ContactSubmissionSerializer, 'submitted_at', Q(is_read=True), 'RETENTION_CONTACT_DAYS',
+    ),
+    'project_inquiries': (
+        ProjectInquiry, ProjectInquirySerializer, 'submitted_at', Q(status='closed'), 'RETENTION_INQUIRY_DAYS',
+    ),
+    'newsletter_subscriptions': (
+        NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at', Q(is_active=False),
+        'RETENTION_NEWSLETTER_DAYS',
+    ),
+}
+
+
+def retention_days(name):
+    """Days after which rows of ``name`` are archived, or None if its policy is off"""
+    days = getattr(settings, RETENTION_POLICIES[name][4])
+    return days if days > 0 else None
+
+
+def eligible(name, days):
+    """Rows of ``name`` older than ``days`` days that its policy lets go, oldest first"""
+    model, _, timestamp_field, condition, _ = RETENTION_POLICIES[name]
+    cutoff = timezone.now() - timedelta(days=days)
+    return model.objects.filter(condition, **{f'{timestamp_field}__lt': cutoff}).order_by(timestamp_field, 'id')
+
+
+def encode_value(value):
+    # Not DjangoJSONEncoder, which cuts datetimes down to milliseconds.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Cannot archive {type(value).__name__} values')
+
+
+def pack(row):
+    return zlib.compress(json.dumps(row, default=encode_value, separators=(',', ':')).encode(), 9)
+
+
+def unpack(model, data):
+    """Rebuild an unsaved instance of ``model`` from an archived row"""
+    values = json.loads(zlib.decompress(data))
+    return model(**{
+        field.attname: field.to_python(values[field.attname])
+        for field in model._meta.concrete_fields
+        if field.attname in values
+    })
+
+
+def delete_rows(model, ids):
+    # Not QuerySet.delete(): see the module docstring.
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {qn(model._meta.db_table)} WHERE {qn(model._meta.pk.column)} IN ({placeholders})',
+            ids,
+        )
+
+
+def archive_batch(name, days, batch_size):
+    """Move the oldest ``batch_size`` eligible rows of ``name`` into the archive; returns how many moved"""
+    model, _, timestamp_field, _, _ = RETENTION_POLICIES[name]
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    with transaction.atomic():
+        # Locked on PostgreSQL, so a row edited meanwhile is archived as it is committed.
+        rows = list(eligible(name, days).select_for_update().values(*attnames)[:batch_size])
+        if not rows:
+            return 0
+        ArchivedRecord.objects.bulk_create([
+            ArchivedRecord(collection=name, record_id=row['id'], timestamp=row[timestamp_field], data=pack(row))
+            for row in rows
+        ])
+        delete_rows(model, [row['id'] for row in rows])
+    return len(rows)
+
+
+def archive(name, days=None, batch_size=None):
+    """
+    Archive every eligible row of ``name``, one batch per transaction.
+
+    ``days`` overrides the policy's retention. Returns the number of rows moved.
+    """
+    days = days if days is not None else retention_days(name)
+    if days is None:
+        return 0
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        count = archive_batch(name, days, batch_size)
+        archived += count
+        if count < batch_size:
+            break
+    if archived:
+        # The rows left without signals, so drop the cached counters here.
+        invalidate_counters(RETENTION_POLICIES[name][0])
+    return archived
+
+
+def archived_queryset(name):
+    return ArchivedRecord.objects.filter(collection=name)
+
+
+def archived_instances(name, records):
+    """Unsaved model instances of archived ``records``, in the same order"""
+    model = RETENTION_POLICIES[name][0]
+    return [unpack(model, record.data) for record in records]
+
+
+def get_record(name, pk):
+    """
+    The row of ``name`` with id ``pk``, from the live table or else the archive.
+
+    Returns ``(instance, archived)``; raises ``model.DoesNotExist`` if it is in neither.
+    """
+    model = RETENTION_POLICIES[name][0]
+    try:
+        return model.objects.get(pk=pk), False
+    except model.DoesNotExist:
+        record = archived_queryset(name).filter(record_id=pk).first()
+        if record is None:
+            raise
+        return unpack(model, record.data), True
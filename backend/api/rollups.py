@@ -0,0 +1,380 @@
+"""
+Hourly, daily and monthly rollups of submissions for the analytics endpoint.
+
+``MetricRollup`` holds one row per metric, dimension and time bucket. The rows
+are kept up to date incrementally: every save or delete of a rolled-up model
+(via the receivers in ``api.signals``) and every bulk insert (which sends no
+signals, so the bulk paths call ``record_created``) adds its difference to the
+affected buckets with one ``INSERT ... ON CONFLICT DO UPDATE`` statement in the
+same transaction as the write itself. ``analytics`` then answers any date range
+from the coarsest granularity that still has ``ANALYTICS_MAX_BUCKETS`` buckets
+or fewer, instead of grouping the raw tables.
+
+``ROLLUPS`` metrics count rows by a timestamp field, optionally split by a
+second field, so ``python manage.py backfill_rollups`` can recompute them from
+the tables. ``TRANSITIONS`` metrics count changes of a field (subscription
+churn) that leave no trace in the tables; they can only be recorded as they
+happen. Writes through ``QuerySet.update()`` bypass both, unless the caller
+passes the rows' previous values to ``record_updated``.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.fields import DateTimeField
+
+from .models import ContactSubmission, MetricRollup, NewsletterSubscription, ProjectInquiry
+
+# metric -> (model, timestamp field, field to split by or None)
+ROLLUPS = {
+    'contacts': (ContactSubmission, 'submitted_at', None),
+    'inquiries_by_type': (ProjectInquiry, 'submitted_at', 'project_type'),
+    'inquiries_by_status': (ProjectInquiry, 'submitted_at', 'status'),
+    'subscriptions': (NewsletterSubscription, 'subscribed_at', None),
+}
+
+# model -> (field, {new value: metric counting changes to it, at the time they are saved})
+TRANSITIONS = {
+    NewsletterSubscription: ('is_active', {False: 'unsubscriptions', True: 'resubscriptions'}),
+}
+
+METRICS = list(ROLLUPS) + [metric for _, metrics in TRANSITIONS.values() for metric in metrics.values()]
+
+# Counts of dimensionless metrics are reported under this name.
+TOTAL = 'count'
+
+TRUNCATE = {
+    MetricRollup.HOUR: TruncHour,
+    MetricRollup.DAY: TruncDay,
+    MetricRollup.MONTH: TruncMonth,
+}
+
+# Finest first: analytics() picks the first one that fits the range.
+GRANULARITIES = [MetricRollup.HOUR, MetricRollup.DAY, MetricRollup.MONTH]
+
+UPSERT_BATCH_SIZE = 100
+
+
+def tracked_fields(model):
+    fields = set()
+    for rolled_up, timestamp, dimension in ROLLUPS.values():
+        if rolled_up is model:
+            fields.update(name for name in (timestamp, dimension) if name)
+    if model in TRANSITIONS:
+        fields.add(TRANSITIONS[model][0])
+    return sorted(fields)
+
+
+TRACKED_FIELDS = {
+    model: tracked_fields(model)
+    for model in {spec[0] for spec in ROLLUPS.values()} | set(TRANSITIONS)
+}
+
+
+def truncate(value, granularity, tz=None):
+    """Return the start of the hour, day or month holding ``value``, in ``tz`` (default: TIME_ZONE)"""
+    value = timezone.localtime(value, tz or timezone.get_default_timezone())
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if granularity != MetricRollup.HOUR:
+        value = value.replace(hour=0)
+    if granularity == MetricRollup.MONTH:
+        value = value.replace(day=1)
+    return value
+
+
+def next_bucket(bucket, granularity, tz=None):
+    tz = tz or timezone.get_default_timezone()
+    if granularity == MetricRollup.HOUR:
+        # Step in UTC: adding to an aware local time is wall-clock arithmetic.
+        return truncate(bucket.astimezone(dt_timezone.utc) + timedelta(hours=1), granularity, tz)
+    day = bucket.date()
+    if granularity == MetricRollup.DAY:
+        day += timedelta(days=1)
+    else:
+        day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return timezone.make_aware(datetime.combine(day, time()), tz)
+
+
+def add_counts(deltas, metric, dimension, when, amount):
+    if when is None:
+        return
+    for granularity in GRANULARITIES:
+        deltas[metric, dimension, granularity, truncate(when, granularity)] += amount
+
+
+def row_counts(deltas, model, state, amount):
+    """Add ``amount`` to every bucket counting a row with field values ``state``"""
+    for metric, (rolled_up, timestamp, dimension) in ROLLUPS.items():
+        if rolled_up is model:
+            value = state[dimension] if dimension else ''
+            add_counts(deltas, metric, '' if value is None else str(value), state[timestamp], amount)
+
+
+def apply(deltas):
+    """Add each ``(metric, dimension, granularity, bucket) -> amount`` to its rollup row"""
+    items = sorted((key, amount) for key, amount in deltas.items() if amount)
+    if not items:
+        return
+    qn = connection.ops.quote_name
+    table = qn(MetricRollup._meta.db_table)
+    columns = ['metric', 'dimension', 'granularity', 'bucket', 'value']
+    key = ', '.join(qn(column) for column in columns[:4])
+    value = qn('value')
+    # Buckets repeat across metrics and dimensions, and looking up connection.ops is not free.
+    adapt = connection.ops.adapt_datetimefield_value
+    adapted = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for (metric, dimension, granularity, bucket), amount in batch:
+                if bucket not in adapted:
+                    adapted[bucket] = adapt(bucket)
+                params += [metric, dimension, granularity, adapted[bucket], amount]
+            # Sorted keys, so concurrent writers lock the rows of one bucket in the same order.
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(qn(column) for column in columns)}) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))} '
+                f'ON CONFLICT ({key}) DO UPDATE SET {value} = {table}.{value} + EXCLUDED.{value}',
+                params,
+            )
+
+
+def snapshot(instance):
+    """The tracked field values of ``instance``, or None when some of them are deferred"""
+    fields = TRACKED_FIELDS.get(type(instance))
+    if not fields or any(name not in instance.__dict__ for name in fields):
+        return None
+    return {name: instance.__dict__[name] for name in fields}
+
+
+def remember_state(instance):
+    instance._rollup_state = snapshot(instance)
+
+
+def load_state(instance):
+    """Make sure the state of a row about to be updated is known, reading it when it was deferred"""
+    if instance._state.adding or getattr(instance, '_rollup_state', None) is not None:
+        return
+    fields = TRACKED_FIELDS[type(instance)]
+    instance._rollup_state = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+def record_save(instance, created, update_fields=None):
+    model = type(instance)
+    old = None if created else getattr(instance, '_rollup_state', None)
+    new = {name: getattr(instance, name) for name in TRACKED_FIELDS[model]}
+    if old is not None and update_fields is not None:
+        # Fields left out of update_fields keep their stored values.
+        new = {name: new[name] if name in update_fields else old[name] for name in new}
+
+    deltas = Counter()
+    if created:
+        row_counts(deltas, model, new, 1)
+    elif old is not None:
+        row_counts(deltas, model, old, -1)
+        row_counts(deltas, model, new, 1)
+        if model in TRANSITIONS:
+            field, metrics = TRANSITIONS[model]
+            if new[field] != old[field] and new[field] in metrics:
+                add_counts(deltas, metrics[new[field]], '', timezone.now(), 1)
+    apply(deltas)
+    instance._rollup_state = new
+
+
+def record_delete(instance):
+    state = getattr(instance, '_rollup_state', None) or snapshot(instance)
+    if state is not None:
+        deltas = Counter()
+        row_counts(deltas, type(instance), state, -1)
+        apply(deltas)
+
+
+def record_created(model, objs):
+    """Count rows inserted without signals, e.g. by ``bulk_create``"""
+    deltas = Counter()
+    for obj in objs:
+        row_counts(deltas, model, {name: getattr(obj, name) for name in TRACKED_FIELDS[model]}, 1)
+    apply(deltas)
+
+
+def record_updated(model, states, changes):
+    """
+    Move the counts of rows updated without signals, e.g. by an ``UPDATE`` statement.
+
+    ``states`` are each row's tracked field values before the update and
+    ``changes`` the values it set. Built for thousands of rows at a time: only
+    metrics split by a changed field can move, and each row is truncated to
+    its hour once.
+    """
+    deltas = Counter()
+    days = {}
+    for metric, (rolled_up, timestamp, dimension) in ROLLUPS.items():
+        if rolled_up is not model or dimension not in changes:
+            continue
+        by_hour = Counter()
+        for state in states:
+            if state[timestamp] is not None:
+                by_hour[state[dimension], truncate(state[timestamp], MetricRollup.HOUR)] += 1
+        new = '' if changes[dimension] is None else str(changes[dimension])
+        for (old, hour), count in by_hour.items():
+            old = '' if old is None else str(old)
+            if hour not in days:
+                # Hour buckets are already in local time, so their day is a plain replace.
+                days[hour] = hour.replace(hour=0)
+            day = days[hour]
+            for dimension_value, amount in ((old, -count), (new, count)):
+                deltas[metric, dimension_value, MetricRollup.HOUR, hour] += amount
+                deltas[metric, dimension_value, MetricRollup.DAY, day] += amount
+                deltas[metric, dimension_value, MetricRollup.MONTH, day.replace(day=1)] += amount
+    apply(deltas)
+
+
+def record_transitions(model, value, count):
+    """Count ``count`` rows whose transition field was set to ``value`` without signals"""
+    metric = TRANSITIONS[model][1].get(value)
+    if metric and count:
+        deltas = Counter()
+        add_counts(deltas, metric, '', timezone.now(), count)
+        apply(deltas)
+
+
+def backfill(metrics=None, since=None):
+    """
+    Recompute the rollups of ``ROLLUPS`` metrics from the tables, from ``since`` on.
+
+    ``since`` is rounded down to the start of its month, since the month bucket
+    holding it is rebuilt whole. Returns the number of rollup rows written.
+    """
+    tz = timezone.get_default_timezone()
+    since = truncate(since, MetricRollup.MONTH, tz) if since else None
+    written = 0
+    with transaction.atomic():
+        for metric in metrics or ROLLUPS:
+            model, timestamp, dimension = ROLLUPS[metric]
+            stale = MetricRollup.objects.filter(metric=metric)
+            rows = model.objects.all()
+            if since:
+                stale = stale.filter(bucket__gte=since)
+                rows = rows.filter(**{f'{timestamp}__gte': since})
+            stale.delete()
+            group_by = [dimension] if dimension else []
+            for granularity, trunc in TRUNCATE.items():
+                counts = (
+                    rows.annotate(rollup_bucket=trunc(timestamp, tzinfo=tz))
+                    .values('rollup_bucket', *group_by)
+                    .annotate(rollup_value=Count('pk'))
+                    .order_by()
+                )
+                objs = [
+                    MetricRollup(
+                        metric=metric,
+                        dimension=str(row[dimension]) if dimension and row[dimension] is not None else '',
+                        granularity=granularity,
+                        bucket=row['rollup_bucket'],
+                        value=row['rollup_value'],
+                    )
+                    for row in counts.iterator()
+                ]
+                MetricRollup.objects.bulk_create(objs, batch_size=500)
+                written += len(objs)
+    return written
+
+
+def parse_bound(value, name, end=False):
+    """
+    Parse an ISO date or datetime query parameter into an aware datetime.
+
+    A date means midnight at the start of that day in TIME_ZONE, or at its end
+    for ``end``, so ``?start=2024-01-01&end=2024-01-31`` covers all of January.
+    """
+    try:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.combine(day + timedelta(days=1) if end else day, time())
+        else:
+            parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_default_timezone())
+    return parsed
+
+
+def choose_granularity(start, end):
+    for granularity in GRANULARITIES:
+        if bucket_count(start, end, granularity) <= settings.ANALYTICS_MAX_BUCKETS:
+            return granularity
+    raise ValueError(f'The range spans more than {settings.ANALYTICS_MAX_BUCKETS} months')
+
+
+def buckets(start, end, granularity):
+    bucket = truncate(start, granularity)
+    while bucket < end:
+        yield bucket
+        bucket = next_bucket(bucket, granularity)
+
+
+def bucket_count(start, end, granularity):
+    # Estimated without walking the buckets, so huge hourly ranges stay cheap to reject.
+    seconds = {MetricRollup.HOUR: 3600, MetricRollup.DAY: 86400, MetricRollup.MONTH: 28 * 86400}
+    return int((end - start).total_seconds() // seconds[granularity]) + 1
+
+
+def analytics(start, end, granularity=None, metrics=None):
+    """
+    Totals and a time series per metric for ``start <= bucket < end``.
+
+    Buckets are aligned to the granularity, so ``start`` is effectively rounded
+    down to the start of its bucket. Every bucket is listed, with the count of
+    each dimension that has one (missing dimensions are zero).
+    """
+    if end <= start:
+        raise ValueError('end must be after start')
+    metrics = metrics or METRICS
+    unknown = [metric for metric in metrics if metric not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    if granularity is None:
+        granularity = choose_granularity(start, end)
+    elif granularity not in TRUNCATE:
+        raise ValueError(f"Unknown granularity '{granularity}'")
+    elif bucket_count(start, end, granularity) > settings.ANALYTICS_MAX_BUCKETS:
+        raise ValueError(f'The range spans more than {settings.ANALYTICS_MAX_BUCKETS} {granularity} buckets')
+
+    all_buckets = list(buckets(start, end, granularity))
+    series = {metric: {bucket: {} for bucket in all_buckets} for metric in metrics}
+    totals = {metric: {} for metric in metrics}
+    rows = MetricRollup.objects.filter(
+        metric__in=metrics,
+        granularity=granularity,
+        bucket__gte=all_buckets[0],
+        bucket__lt=end,
+    ).values_list('metric', 'dimension', 'bucket', 'value')
+    for metric, dimension, bucket, value in rows:
+        dimension = dimension or TOTAL
+        if bucket in series[metric] and value:
+            series[metric][bucket][dimension] = value
+            totals[metric][dimension] = totals[metric].get(dimension, 0) + value
+
+    # Formatted like every other timestamp in the API.
+    iso = DateTimeField().to_representation
+    return {
+        'start': iso(all_buckets[0]),
+        'end': iso(end),
+        'granularity': granularity,
+        'metrics': {
+            metric: {
+                'totals': totals[metric],
+                'series': [{'bucket': iso(bucket), **counts} for bucket, counts in series[metric].items()],
+            }
+            for metric in metrics
+        },
+    }
@@ -0,0 +1,120 @@
+"""
+Full-text search over submissions and portfolio projects.
+
+On PostgreSQL each searchable table gets a GIN index over a ``tsvector``
+expression, queried with ``websearch_to_tsquery`` and ranked by ``ts_rank``.
+On SQLite each table gets an FTS5 virtual table using the base table as
+external content, kept in sync by triggers and ranked by ``bm25``. Because
+the index is maintained by the database itself, bulk inserts and queryset
+updates stay searchable too. Other databases fall back to unranked
+``icontains`` filters.
+
+The indexes themselves are created by migrations (see
+``api.search_operations.CreateSearchIndex``).
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from . import search_operations
+from .models import ContactSubmission, ProjectInquiry, PortfolioProject
+from .serializers import (
+    ContactSubmissionSerializer,
+    ProjectInquirySerializer,
+    PortfolioProjectSerializer,
+)
+
+# model -> indexed fields, in the order they are stored in the index.
+SEARCH_FIELDS = {
+    ContactSubmission: ['name', 'email', 'message'],
+    ProjectInquiry: ['name', 'email', 'company', 'description'],
+    PortfolioProject: ['title', 'description', 'technologies'],
+}
+
+# name -> (model, serializer, related lookups to prefetch), as exposed by /api/search/.
+SEARCH_COLLECTIONS = {
+    'contact_submissions': (ContactSubmission, ContactSubmissionSerializer, ()),
+    'project_inquiries': (ProjectInquiry, ProjectInquirySerializer, ()),
+    'portfolio_projects': (PortfolioProject, PortfolioProjectSerializer, ('project_technologies',)),
+}
+# What anonymous callers may search; submissions hold names, emails and phone numbers, so only staff see them.
+PUBLIC_SEARCH_COLLECTIONS = ('portfolio_projects',)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def columns(model):
+    return [model._meta.get_field(name).column for name in SEARCH_FIELDS[model]]
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def tsvector_sql(model, qn):
+    return search_operations.tsvector_sql(columns(model), qn)
+
+
+def fts5_query(term):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    tokens = TOKEN_RE.findall(term)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search_ids(model, term, limit):
+    """Return the ids of the best ``limit`` matches for ``term``, best first"""
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        vector = tsvector_sql(model, qn)
+        sql = (
+            f"SELECT id FROM {qn(table)}, websearch_to_tsquery('{settings.SEARCH_CONFIG}', %s) query "
+            f'WHERE {vector} @@ query ORDER BY ts_rank({vector}, query) DESC, id DESC LIMIT %s'
+        )
+        params = [term, limit]
+    elif connection.vendor == 'sqlite':
+        query = fts5_query(term)
+        if query is None:
+            return []
+        fts = fts_table(model)
+        sql = (
+            f'SELECT rowid FROM {qn(fts)} WHERE {qn(fts)} MATCH %s '
+            f'ORDER BY bm25({qn(fts)}), rowid DESC LIMIT %s'
+        )
+        params = [query, limit]
+    else:
+        condition = Q()
+        for field in SEARCH_FIELDS[model]:
+            condition |= Q(**{f'{field}__icontains': term})
+        return list(model.objects.filter(condition).values_list('pk', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(model, term, limit, prefetch=()):
+    """Return the best ``limit`` matching objects for ``term``, best first"""
+    ids = search_ids(model, term, limit)
+    objects = model.objects.prefetch_related(*prefetch).in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+class FullTextSearchMixin:
+    """
+    ModelAdmin mixin that answers the admin search box from the full-text
+    index instead of ``icontains`` scans over ``search_fields``.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        ids = search_ids(self.model, search_term, settings.SEARCH_ADMIN_MAX_RESULTS)
+        return queryset.filter(pk__in=ids), False
@@ -0,0 +1,116 @@
+"""
+Migration operations that create the full-text index of one table.
+
+Kept apart from ``api.search`` so migrations import no models: each
+migration passes the table and column names as they were at that point.
+On SQLite, altering a table usually remakes it, which drops its triggers;
+a later migration that does that to a searchable table restores them with
+``RestoreSearchIndex``.
+"""
+from django.conf import settings
+from django.db import router
+from django.db.migrations.operations.base import Operation
+
+
+def tsvector_sql(columns, qn):
+    document = " || ' ' || ".join(f"coalesce({qn(column)}, '')" for column in columns)
+    return f"to_tsvector('{settings.SEARCH_CONFIG}', {document})"
+
+
+def postgresql_index_sql(table, columns, qn):
+    return [
+        f'CREATE INDEX IF NOT EXISTS {qn(table + "_search_idx")} '
+        f'ON {qn(table)} USING GIN (({tsvector_sql(columns, qn)}))'
+    ]
+
+
+def sqlite_index_sql(table, columns, qn):
+    """FTS5 external-content table over ``table`` plus the triggers that keep it in sync"""
+    fts = f'{table}_fts'
+    col_list = ', '.join(qn(c) for c in columns)
+    new_values = ', '.join(f'new.{qn(c)}' for c in columns)
+    old_values = ', '.join(f'old.{qn(c)}' for c in columns)
+    delete_old = f"INSERT INTO {qn(fts)}({qn(fts)}, rowid, {col_list}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f'INSERT INTO {qn(fts)}(rowid, {col_list}) VALUES (new.id, {new_values});'
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {qn(fts)} USING fts5('
+        f"{col_list}, content={qn(table)}, content_rowid='id', tokenize='porter unicode61')",
+        *(f'DROP TRIGGER IF EXISTS {qn(fts + suffix)}' for suffix in ('_ai', '_ad', '_au')),
+        f'CREATE TRIGGER {qn(fts + "_ai")} AFTER INSERT ON {qn(table)} BEGIN {insert_new} END',
+        f'CREATE TRIGGER {qn(fts + "_ad")} AFTER DELETE ON {qn(table)} BEGIN {delete_old} END',
+        # Only writes to indexed columns touch the index; is_read/status updates stay cheap.
+        f'CREATE TRIGGER {qn(fts + "_au")} AFTER UPDATE OF {col_list} ON {qn(table)} '
+        f'BEGIN {delete_old} {insert_new} END',
+        # Index whatever the table already holds (or held before it was remade).
+        f"INSERT INTO {qn(fts)}({qn(fts)}) VALUES ('rebuild')",
+    ]
+
+
+class CreateSearchIndex(Operation):
+    """
+    Create (or recreate) the full-text index over ``columns`` of ``table``:
+    a GIN index on PostgreSQL, an FTS5 table with triggers on SQLite, and
+    nothing elsewhere. Rerunning it is safe.
+    """
+
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = list(columns)
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {'table': self.table, 'columns': self.columns}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not router.allow_migrate(schema_editor.connection.alias, app_label):
+            return
+        qn = schema_editor.quote_name
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            statements = postgresql_index_sql(self.table, self.columns, qn)
+        elif vendor == 'sqlite':
+            statements = sqlite_index_sql(self.table, self.columns, qn)
+        else:
+            statements = []
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not router.allow_migrate(schema_editor.connection.alias, app_label):
+            return
+        qn = schema_editor.quote_name
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {qn(self.table + "_search_idx")}', params=None)
+        elif vendor == 'sqlite':
+            fts = f'{self.table}_fts'
+            for suffix in ('_ai', '_ad', '_au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {qn(fts + suffix)}', params=None)
+            schema_editor.execute(f'DROP TABLE IF EXISTS {qn(fts)}', params=None)
+
+    def describe(self):
+        return f'Create full-text index on {self.table}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.table}_search_index'
+
+
+class RestoreSearchIndex(CreateSearchIndex):
+    """
+    Recreate the index of a table that other operations of the same migration
+    remake on SQLite. It recreates in both directions, so list it first and
+    last: the last copy restores the index when the migration is applied, the
+    first when it is reversed.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'Restore full-text index on {self.table}'
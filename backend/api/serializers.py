@@ -5,10 +5,39 @@ from .models import (
     ProjectInquiry,
     PortfolioProject,
     Testimonial,
+    normalize_email,
 )
 
 
-class ContactSubmissionSerializer(serializers.ModelSerializer):
+class ProjectedFieldsMixin:
+    """Accept ``fields=(...)`` to output only those fields, for ``?fields=`` projections"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def projected_fields(serializer_class, value):
+    """
+    Parse a comma-separated ``?fields=`` value into a tuple of field names.
+
+    Returns None when ``value`` is empty (every field) and raises ValueError
+    for names the serializer does not have. The tuple follows the
+    serializer's field order, so equal projections share a compiled serializer.
+    """
+    names = {name.strip() for name in (value or '').split(',') if name.strip()}
+    if not names:
+        return None
+    available = list(serializer_class().fields)
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return tuple(name for name in available if name in names)
+
+
+class ContactSubmissionSerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactSubmission
         fields = ['id', 'name', 'email', 'phone', 'message', 'submitted_at']
@@ -21,7 +50,7 @@ class ContactSubmissionCreateSerializer(serializers.ModelSerializer):
         fields = ['name', 'email', 'phone', 'message']
 
 
-class NewsletterSubscriptionSerializer(serializers.ModelSerializer):
+class NewsletterSubscriptionSerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = NewsletterSubscription
         fields = ['id', 'email', 'subscribed_at', 'is_active']
@@ -31,8 +60,12 @@ class NewsletterSubscriptionSerializer(serializers.ModelSerializer):
 class NewsletterSubscriptionCreateSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
+    def validate_email(self, value):
+        # Stored the way the bulk import stores it, so both find the same subscriber.
+        return normalize_email(value)
+
 
-class ProjectInquirySerializer(serializers.ModelSerializer):
+class ProjectInquirySerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ProjectInquiry
         fields = [
@@ -65,9 +98,8 @@ class PortfolioProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
     def get_technologies_list(self, obj):
-        if obj.technologies:
-            return [tech.strip() for tech in obj.technologies.split(',')]
-        return []
+        # Views prefetch ``project_technologies`` so this does not query per row.
+        return [link.name for link in obj.project_technologies.all()]
 
 
 class TestimonialSerializer(serializers.ModelSerializer):
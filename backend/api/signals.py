@@ -0,0 +1,74 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import rollups
+from .counters import invalidate_counters
+from .response_cache import invalidate_responses
+from .models import (
+    ContactSubmission,
+    NewsletterSubscription,
+    ProjectInquiry,
+    PortfolioProject,
+    Testimonial,
+)
+
+COUNTED_MODELS = (
+    ContactSubmission,
+    NewsletterSubscription,
+    ProjectInquiry,
+    PortfolioProject,
+    Testimonial,
+)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_counters_on_write(sender, **kwargs):
+    """Drop cached stats when a counted model changes"""
+    if sender in COUNTED_MODELS:
+        invalidate_counters(sender)
+
+
+@receiver(post_save, sender=PortfolioProject)
+@receiver(post_delete, sender=PortfolioProject)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def invalidate_responses_on_write(sender, **kwargs):
+    """Mark cached portfolio/testimonial responses stale when the catalog changes"""
+    invalidate_responses(sender)
+
+
+@receiver(post_save, sender=PortfolioProject)
+def sync_project_technologies(sender, instance, update_fields=None, **kwargs):
+    """Keep the normalized technology relation in step with the technologies string"""
+    if update_fields is None or 'technologies' in update_fields:
+        instance.sync_technologies()
+
+
+def remember_rollup_state(sender, instance, **kwargs):
+    """Keep the values the analytics rollups count a row by, to diff them on save"""
+    rollups.remember_state(instance)
+
+
+# post_init runs for every instance of every model, so only listen for the rolled-up ones.
+for model in rollups.TRACKED_FIELDS:
+    post_init.connect(remember_rollup_state, sender=model)
+
+
+@receiver(pre_save)
+def load_rollup_state(sender, instance, **kwargs):
+    if sender in rollups.TRACKED_FIELDS:
+        rollups.load_state(instance)
+
+
+@receiver(post_save)
+def update_rollups_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Move the row's counts in the analytics rollups to its new values"""
+    if sender in rollups.TRACKED_FIELDS:
+        rollups.record_save(instance, created, update_fields)
+
+
+@receiver(post_delete)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    if sender in rollups.TRACKED_FIELDS:
+        rollups.record_delete(instance)
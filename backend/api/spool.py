@@ -0,0 +1,266 @@
+"""
+Buffered write mode for form submissions (``SUBMISSION_SPOOL_ENABLED``).
+
+During traffic spikes every submission committing its own transaction
+serializes on SQLite's write lock and ties up connections on small
+PostgreSQL plans. In buffered mode the submit views validate as usual, append
+the validated data to a local spool and answer ``202 Accepted`` straight away.
+A flusher thread in each web process then commits spooled entries to the
+database in batches, at most ``SUBMISSION_SPOOL_MAX_DELAY`` seconds after they
+were accepted.
+
+The spool is a separate SQLite file in WAL mode with ``synchronous=FULL``, so
+an acknowledged entry survives a crash of the process or the machine. The
+last entry committed to the database is recorded in ``SpoolCheckpoint`` in the
+same transaction as the rows themselves, so after a crash the flusher resumes
+(replays) from exactly there: nothing is lost and nothing is written twice.
+Only one process flushes a spool at a time, serialized by a lock file; run
+``python manage.py flush_spool`` to drain it without a web process.
+"""
+import fcntl
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+
+from .counters import invalidate_counters
+from .dedup import drop_duplicates, remembered
+from .jobs import enqueue_notifications
+from .models import ContactSubmission, NewsletterSubscription, ProjectInquiry, SpoolCheckpoint
+from .newsletter_import import upsert_chunk
+from .rollups import record_created
+
+logger = logging.getLogger('api.spool')
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    # AUTOINCREMENT so ids of flushed and deleted entries are never handed out again.
+    'CREATE TABLE IF NOT EXISTS entries ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, data TEXT NOT NULL, accepted_at REAL NOT NULL)',
+]
+
+
+def write_contacts(entries):
+    return write_submissions(ContactSubmission, entries)
+
+
+def write_inquiries(entries):
+    return write_submissions(ProjectInquiry, entries)
+
+
+def write_submissions(model, entries):
+    # Exact repeats are dropped here, as the submit views would have.
+    objs, _ = drop_duplicates(model, [
+        model(submitted_at=datetime.fromtimestamp(accepted_at, dt_timezone.utc), **data)
+        for data, accepted_at in entries
+    ])
+    objs = model.objects.bulk_create(objs)
+    enqueue_notifications(model, [obj.pk for obj in objs])
+    record_created(model, objs)
+    return model
+
+
+def write_subscriptions(entries):
+    # An address can be spooled twice in one batch; the upsert may only touch it once.
+    emails = list(dict.fromkeys(data['email'] for data, _ in entries))
+    upsert_chunk(emails, {'inserted': 0, 'reactivated': 0, 'skipped': 0})
+    return NewsletterSubscription
+
+
+# kind -> function committing a list of (validated data, accepted_at) and returning the model written
+WRITERS = {
+    'contact': write_contacts,
+    'inquiry': write_inquiries,
+    'newsletter': write_subscriptions,
+}
+
+
+class Spool:
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+        self._spool_id = None
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self.local.conn = conn
+        return conn
+
+    @property
+    def spool_id(self):
+        """A random id created with the spool file, naming its checkpoint in the database"""
+        if self._spool_id is None:
+            conn = self.connection()
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('spool_id', ?)", [uuid.uuid4().hex])
+            self._spool_id = conn.execute("SELECT value FROM meta WHERE key = 'spool_id'").fetchone()[0]
+        return self._spool_id
+
+    def append(self, kind, data):
+        """Durably record one validated submission; returns once it is on disk"""
+        self.connection().execute(
+            'INSERT INTO entries (kind, data, accepted_at) VALUES (?, ?, ?)',
+            [kind, json.dumps(data), time.time()],
+        )
+
+    def read(self, after, limit):
+        rows = self.connection().execute(
+            'SELECT id, kind, data, accepted_at FROM entries WHERE id > ? ORDER BY id LIMIT ?',
+            [after, limit],
+        )
+        return [(entry_id, kind, json.loads(data), accepted_at) for entry_id, kind, data, accepted_at in rows]
+
+    def discard(self, upto):
+        self.connection().execute('DELETE FROM entries WHERE id <= ?', [upto])
+
+    def backlog(self):
+        """Return the number of spooled entries and the age in seconds of the oldest one"""
+        count, oldest = self.connection().execute('SELECT COUNT(*), MIN(accepted_at) FROM entries').fetchone()
+        return count, (time.time() - oldest) if oldest else 0.0
+
+    def flush_lock(self, blocking=False):
+        """Take the lock that makes this process the spool's only flusher; None if it is taken"""
+        lock = open(f'{self.path}.lock', 'a')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock.close()
+            return None
+        return lock
+
+    def flush_batch(self, batch_size):
+        """Commit the next batch of entries after the checkpoint; returns how many were committed"""
+        spool_id = self.spool_id
+        touched = set()
+        with transaction.atomic():
+            checkpoint, _ = SpoolCheckpoint.objects.select_for_update().get_or_create(spool_id=spool_id)
+            entries = self.read(checkpoint.last_entry_id, batch_size)
+            if not entries:
+                # Drop entries committed just before a crash that skipped the delete below.
+                self.discard(checkpoint.last_entry_id)
+                return 0
+            by_kind = {}
+            for _, kind, data, accepted_at in entries:
+                by_kind.setdefault(kind, []).append((data, accepted_at))
+            for kind, items in by_kind.items():
+                touched.add(WRITERS[kind](items))
+            checkpoint.last_entry_id = entries[-1][0]
+            checkpoint.save(update_fields=['last_entry_id', 'updated_at'])
+
+        # Already committed, so a crash before this delete is harmless: the
+        # checkpoint skips these entries on the next flush.
+        self.discard(checkpoint.last_entry_id)
+        for model in touched:
+            # bulk_create does not send post_save, so drop the cached counters here.
+            invalidate_counters(model)
+        return len(entries)
+
+    def flush(self, batch_size=None, blocking=False):
+        """Commit every spooled entry, unless another process is already flushing"""
+        batch_size = batch_size or settings.SUBMISSION_SPOOL_BATCH_SIZE
+        lock = self.flush_lock(blocking)
+        if lock is None:
+            return 0
+        try:
+            flushed = 0
+            while True:
+                count = self.flush_batch(batch_size)
+                flushed += count
+                if count < batch_size:
+                    return flushed
+        finally:
+            lock.close()
+
+
+class Flusher(threading.Thread):
+    """Flush the spool whenever a batch fills up or the maximum delay runs out"""
+
+    def __init__(self, spool):
+        super().__init__(name='spool-flusher', daemon=True)
+        self.spool = spool
+        self.wakeup = threading.Event()
+        self.pending = 0
+
+    def notify(self):
+        self.pending += 1
+        if self.pending >= settings.SUBMISSION_SPOOL_BATCH_SIZE:
+            self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(settings.SUBMISSION_SPOOL_MAX_DELAY)
+            self.wakeup.clear()
+            self.pending = 0
+            try:
+                flushed = self.spool.flush()
+                if flushed:
+                    logger.debug('Flushed %d spooled submission(s)', flushed)
+            except Exception:
+                # Entries stay in the spool and are retried on the next tick.
+                logger.exception('Flushing the submission spool failed')
+            finally:
+                close_old_connections()
+
+
+_lock = threading.Lock()
+_spool = None
+_flusher = None
+
+
+def get_spool():
+    global _spool
+    with _lock:
+        if _spool is None:
+            _spool = Spool(settings.SUBMISSION_SPOOL_PATH)
+        return _spool
+
+
+def start_flusher(**kwargs):
+    """Start this process's flusher thread, which also replays entries left by a crash"""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return _flusher
+    spool = get_spool()
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = Flusher(spool)
+            _flusher.start()
+    return _flusher
+
+
+def spool_submission(kind, data):
+    """Append validated submission data to the spool and make sure it will be flushed"""
+    get_spool().append(kind, data)
+    start_flusher().notify()
+
+
+def spool_unique(kind, model, data):
+    """Spool a contact submission or inquiry unless it nearly repeats a recent one (see api/dedup.py)"""
+    with remembered(model, data) as duplicate:
+        if not duplicate:
+            spool_submission(kind, data)
+
+
+def enabled():
+    return settings.SUBMISSION_SPOOL_ENABLED
+
+
+def connect_signals():
+    # Start flushing as soon as a worker serves its first request, so entries
+    # spooled before a crash are replayed without waiting for new submissions.
+    # Starting in AppConfig.ready() would also run it in management commands
+    # and in gunicorn's master before it forks.
+    if enabled():
+        request_started.connect(start_flusher, dispatch_uid='api.spool.start_flusher')
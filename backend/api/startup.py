@@ -0,0 +1,151 @@
+"""
+Cold start helpers: skipping unchanged migrations and measuring the startup path.
+
+``start.sh`` used to run ``migrate`` on every boot: one more interpreter that
+imports Django, loads every migration module and builds the migration graph
+only to find nothing to do. ``migrations_hash`` digests the migration files of
+the installed apps instead, read as bytes rather than imported, and
+``migrate_if_changed`` runs ``migrate`` only when that hash differs from the
+one stamped in the database by the last run: a single indexed lookup. The
+stamp lives in the database it describes, so a new or restored database is
+always migrated.
+
+``probe`` is what ``python manage.py startup_profile`` runs in a fresh
+interpreter: it goes through the phases a gunicorn worker goes through up to
+its first response and reports how long each took. Nothing from Django is
+imported at module level, so everything Django loads is measured.
+"""
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+
+
+def migration_files():
+    """``(app label, path)`` of every migration file of the installed apps, in a stable order"""
+    from django.apps import apps
+    from django.db.migrations.loader import MigrationLoader
+
+    files = []
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for directory in spec.submodule_search_locations:
+            files.extend(
+                (app_config.label, os.path.join(directory, name))
+                for name in sorted(os.listdir(directory))
+                if name.endswith('.py')
+            )
+    return files
+
+
+def migrations_hash():
+    digest = hashlib.sha256()
+    for label, path in migration_files():
+        digest.update(f'{label}/{os.path.basename(path)}\0'.encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def is_migrated(value, using='default'):
+    """Whether database ``using`` was last migrated to the migration files hashing to ``value``"""
+    from django.db import DatabaseError
+    from .models import MigrationStamp
+
+    try:
+        return MigrationStamp.objects.using(using).filter(migrations_hash=value).exists()
+    except DatabaseError:
+        # Not migrated at all, or not since the stamp table was added.
+        return False
+
+
+def migrate_if_changed(using='default', force=False, verbosity=1):
+    """Run ``migrate`` unless the database is stamped with the current migrations; returns whether it ran"""
+    from django.core.management import call_command
+    from django.db import transaction
+    from .models import MigrationStamp
+
+    value = migrations_hash()
+    if not force and is_migrated(value, using):
+        return False
+    call_command('migrate', database=using, interactive=False, verbosity=verbosity)
+    with transaction.atomic(using=using):
+        MigrationStamp.objects.using(using).exclude(migrations_hash=value).delete()
+        MigrationStamp.objects.using(using).get_or_create(migrations_hash=value)
+    return True
+
+
+def request_host(allowed_hosts):
+    for host in allowed_hosts:
+        if '*' not in host:
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def probe(path, migrate=False):
+    """
+    Start the app as a worker would, answer one ``GET path`` and print the timings as JSON.
+
+    Phases: importing the settings, ``django.setup()`` (every app, its models
+    and ``ready()``), ``migrate_if_changed`` when ``migrate`` is set, building
+    the middleware chain, and the first response (URLconf, view and queries).
+    """
+    timings = {}
+    last = time.perf_counter()
+
+    def lap(phase):
+        nonlocal last
+        now = time.perf_counter()
+        timings[phase] = now - last
+        last = now
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'devsolutions.settings')
+    import django
+    from django.conf import settings
+
+    settings.INSTALLED_APPS
+    lap('settings')
+    django.setup(set_prefix=False)
+    lap('apps')
+    if migrate:
+        migrate_if_changed(verbosity=0)
+        lap('migrations')
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    lap('middleware')
+    host = request_host(settings.ALLOWED_HOSTS)
+    statuses = []
+    response = handler({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    lap('first_response')
+    json.dump({'timings': timings, 'status': statuses[0]}, sys.stdout)
@@ -0,0 +1,94 @@
+import gzip
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import include, path
+
+from api.middleware import install_query_recording
+from api.models import PortfolioProject
+
+urlpatterns = [
+    path('api/', include('api.async_urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, RATE_LIMIT_ENABLED=False)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        # The async ORM runs on this thread, whose connection the test database opened
+        # before any middleware existed; a server's connections open after it.
+        install_query_recording(connection)
+        for number in range(3):
+            PortfolioProject.objects.create(
+                title=f'Project {number}', description='A project ' * 50,
+                technologies='Django, React', category='web',
+            )
+
+    @override_settings(DEBUG=True)
+    def test_middleware_chain_stays_async(self):
+        # With DEBUG on, Django logs every sync-only middleware it has to run in a thread.
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler().load_middleware(is_async=True)
+
+    def test_catalog_matches_the_sync_view(self):
+        client = AsyncClient()
+        response = async_to_sync(client.get)('/api/portfolio/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Response-Cache'], 'MISS')
+        # Queries run on the async ORM's thread still count.
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+        self.assertEqual(async_to_sync(client.get)('/api/portfolio/')['X-Response-Cache'], 'HIT')
+
+        with self.settings(ROOT_URLCONF='devsolutions.urls'):
+            sync_response = self.client.get('/api/portfolio/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, sync_response.content)
+
+    async def test_head_and_options(self):
+        client = AsyncClient()
+        length = len((await client.get('/api/portfolio/')).content)
+        response = await client.head('/api/portfolio/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Length'], str(length))
+
+        response = await client.options('/api/portfolio/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Allow'], 'GET, HEAD, OPTIONS')
+        self.assertEqual(response.json()['name'], 'Portfolio Projects')
+        self.assertEqual(response.json()['description'], 'Get all portfolio projects')
+
+        response = await client.options('/api/contact/submit/')
+        self.assertEqual(response['Allow'], 'POST, OPTIONS')
+        response = await client.post('/api/portfolio/')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD, OPTIONS')
+
+    async def test_invalid_json_is_a_parse_error(self):
+        response = await AsyncClient().post('/api/contact/submit/', 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error - '))
+
+    @override_settings(RESPONSE_COMPRESSION_MIN_SIZE=200)
+    async def test_compression_reuses_the_cached_copy(self):
+        client = AsyncClient()
+        plain = (await client.get('/api/portfolio/')).content
+        for state in ('HIT', 'HIT'):
+            response = await client.get('/api/portfolio/', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response['X-Response-Cache'], state)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), plain)
+        cached = [key for key in caches['responses']._cache if key.endswith(':gzip')]
+        self.assertEqual(len(cached), 1)
+
+
+class SyncHeadTests(TestCase):
+    def test_catalog_views_answer_head(self):
+        for url in ('/api/portfolio/', '/api/testimonials/', '/api/stats/'):
+            with self.subTest(url=url):
+                response = self.client.head(url, HTTP_ACCEPT='application/json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, b'')
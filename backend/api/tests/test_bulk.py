@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import dedup
+from api.models import ContactSubmission, Job
+
+
+def contact(number, email=None):
+    return {
+        'name': f'Sender {number}',
+        'email': email or f'sender{number}@example.com',
+        'message': f'Message number {number} about building a new website for our shop with online booking and payments',
+    }
+
+
+@override_settings(
+    BULK_CREATE_BATCH_SIZE=2,
+    RATE_LIMIT_ENABLED=False,
+    NOTIFICATION_EMAILS=['sales@example.com'],
+    NOTIFICATION_WEBHOOK_URL='',
+)
+class BulkSubmitTests(TestCase):
+    url = '/api/contact/bulk/'
+
+    def setUp(self):
+        dedup._indexes.clear()
+        self.client = APIClient()
+
+    def test_creates_every_valid_item(self):
+        response = self.client.post(self.url, [contact(1), contact(2), contact(3)], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(ContactSubmission.objects.count(), 3)
+        self.assertEqual(Job.objects.count(), 3)
+
+    def test_invalid_items_are_reported_by_index(self):
+        response = self.client.post(self.url, [contact(1), {'name': 'No email'}, contact(3)], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+        results = response.data['results']
+        self.assertIn('email', results[1]['errors'])
+        self.assertIn('id', results[0])
+        self.assertIn('id', results[2])
+
+    def test_database_error_fails_only_its_chunk(self):
+        items = [contact(1), contact(2), contact(3), contact(4)]
+        with mock.patch('api.bulk.record_created', side_effect=[DatabaseError('disk full'), None]):
+            response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 2))
+        results = response.data['results']
+        for result in results[:2]:
+            self.assertIn('non_field_errors', result['errors'])
+            self.assertNotIn('id', result)
+        for result in results[2:]:
+            self.assertIn('id', result)
+        self.assertEqual(
+            sorted(ContactSubmission.objects.values_list('email', flat=True)),
+            ['sender3@example.com', 'sender4@example.com'],
+        )
+        # Nothing of the failed chunk was kept, its notifications included.
+        self.assertEqual(Job.objects.count(), 2)
+
+        # Retrying the failed items stores them rather than reporting duplicates.
+        response = self.client.post(self.url, items[:2], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (2, 0))
+        self.assertEqual(ContactSubmission.objects.count(), 4)
+
+    def test_all_chunks_failing_is_a_bad_request(self):
+        with mock.patch('api.bulk.record_created', side_effect=DatabaseError('disk full')):
+            response = self.client.post(self.url, [contact(1), contact(2)], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertFalse(ContactSubmission.objects.exists())
+
+    def test_repeats_are_reported_as_duplicates(self):
+        self.client.post(self.url, [contact(1)], format='json')
+        response = self.client.post(self.url, [contact(1), contact(1), contact(2)], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (1, 2))
+        self.assertTrue(response.data['results'][0]['duplicate'])
+        self.assertEqual(ContactSubmission.objects.count(), 2)
@@ -0,0 +1,98 @@
+import gzip
+import json
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import compression
+from api.compression import ResponseCompressionMiddleware, negotiate
+from api.models import ContactSubmission, PortfolioProject
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_preferences(self):
+        if compression.brotli is not None:
+            self.assertEqual(negotiate('gzip, deflate, br'), 'br')
+            self.assertEqual(negotiate('br;q=0.5, gzip'), 'gzip')
+            self.assertEqual(negotiate('*'), 'br')
+        self.assertEqual(negotiate('gzip;q=0.8, br;q=0'), 'gzip')
+        self.assertEqual(negotiate('deflate'), None)
+        self.assertEqual(negotiate('gzip;q=0, *;q=0'), None)
+        self.assertEqual(negotiate(''), None)
+
+    def test_only_large_api_payloads_are_compressed(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        cases = [
+            (HttpResponse('x' * 2000, content_type='text/html'), False),
+            (HttpResponse('{}', content_type='application/json'), False),
+            # Incompressible: the original is smaller.
+            (HttpResponse(os.urandom(2000), content_type='application/json'), False),
+            (HttpResponse(json.dumps(['x'] * 1000), content_type='application/json; charset=utf-8'), True),
+        ]
+        for response, compressed in cases:
+            with self.subTest(content_type=response['Content-Type'], size=len(response.content)):
+                response = ResponseCompressionMiddleware(lambda request: response)(request)
+                self.assertEqual(response.get('Content-Encoding') == 'gzip', compressed)
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, RESPONSE_COMPRESSION_MIN_SIZE=200)
+class ResponseCompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            PortfolioProject.objects.create(
+                title=f'Project {number}', description='A project ' * 50, technologies='Django', category='web',
+            )
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+
+    def get(self, url, encoding, **headers):
+        return self.client.get(url, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING=encoding, **headers)
+
+    def test_gzip_round_trip_with_weak_etag(self):
+        plain = self.get('/api/portfolio/', 'identity')
+        response = self.get('/api/portfolio/', 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+
+        revalidated = self.get('/api/portfolio/', 'gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_brotli_round_trip(self):
+        if compression.brotli is None:
+            self.skipTest('Brotli is not installed')
+        plain = self.get('/api/portfolio/', 'identity')
+        response = self.get('/api/portfolio/', 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+    def test_cached_responses_are_compressed_once(self):
+        self.get('/api/portfolio/', 'gzip')
+        with mock.patch('api.compression.compress', side_effect=AssertionError('compressed again')):
+            response = self.get('/api/portfolio/', 'gzip')
+        self.assertEqual(response['X-Response-Cache'], 'HIT')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streamed_exports_are_compressed_incrementally(self):
+        for number in range(20):
+            ContactSubmission.objects.create(name=f'Sender {number}', email=f's{number}@example.com', message='Hi')
+        self.client.force_authenticate(User.objects.create_user('staff', is_staff=True))
+        plain = b''.join(self.get('/api/admin/export/', 'identity').streaming_content)
+        response = self.get('/api/admin/export/', 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    @override_settings(RESPONSE_COMPRESSION_ENABLED=False)
+    def test_disabled(self):
+        self.assertFalse(self.get('/api/portfolio/', 'gzip').has_header('Content-Encoding'))
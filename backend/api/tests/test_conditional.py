@@ -0,0 +1,60 @@
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
+
+from api.conditional import portfolio_etag
+from api.models import PortfolioProject, Testimonial
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.project = PortfolioProject.objects.create(
+            title='Shop', description='An online shop', technologies='Django', category='web',
+        )
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get('/api/portfolio/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_etag_changes_on_edit_and_delete(self):
+        first = self.client.get('/api/portfolio/')['ETag']
+        self.project.title = 'Online shop'
+        self.project.save()
+        response = self.client.get('/api/portfolio/', HTTP_IF_NONE_MATCH=first)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title'], 'Online shop')
+
+        second = response['ETag']
+        self.project.delete()
+        response = self.client.get('/api/portfolio/', HTTP_IF_NONE_MATCH=second)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_if_modified_since(self):
+        # An empty catalog has no modification time to compare against.
+        self.assertFalse(self.client.get('/api/testimonials/').has_header('Last-Modified'))
+        Testimonial.objects.create(client_name='Grace', testimonial='Great work', rating=5)
+        self.assertTrue(self.client.get('/api/testimonials/').has_header('Last-Modified'))
+
+        last_modified = self.client.get('/api/portfolio/')['Last-Modified']
+        response = self.client.get('/api/portfolio/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail(self):
+        url = f'/api/portfolio/{self.project.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/portfolio/999999/').status_code, 404)
+
+    def test_etag_depends_on_the_representation(self):
+        factory = RequestFactory()
+        json_etag = portfolio_etag(factory.get('/api/portfolio/', HTTP_ACCEPT='application/json'))
+        html_etag = portfolio_etag(factory.get('/api/portfolio/', HTTP_ACCEPT='text/html'))
+        self.assertNotEqual(json_etag, html_etag)
@@ -0,0 +1,56 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.counters import get_dashboard_stats, get_site_stats
+from api.models import ContactSubmission, PortfolioProject, Testimonial
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='')
+class CounterTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.project = PortfolioProject.objects.create(
+            title='Shop', description='An online shop', technologies='Django', category='web', featured=True,
+        )
+
+    def test_counts_are_computed_in_one_query_and_then_cached(self):
+        with self.assertNumQueries(1):
+            stats = get_site_stats()
+        self.assertEqual(stats['total_projects'], 1)
+        self.assertEqual(stats['featured_projects'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_site_stats(), stats)
+
+    def test_save_and_delete_invalidate_the_counters(self):
+        get_site_stats()
+        Testimonial.objects.create(client_name='Grace', testimonial='Great work', rating=5, featured=True)
+        self.assertEqual(get_site_stats()['featured_testimonials'], 1)
+        self.project.featured = False
+        self.project.save()
+        self.assertEqual(get_site_stats()['featured_projects'], 0)
+        self.project.delete()
+        self.assertEqual(get_site_stats()['total_projects'], 0)
+
+    def test_writes_only_drop_the_counters_that_count_them(self):
+        get_site_stats()
+        get_dashboard_stats()
+        ContactSubmission.objects.create(name='Ada', email='ada@example.com', message='Hi', fingerprint='ada')
+        with self.assertNumQueries(0):
+            get_site_stats()
+        self.assertEqual(get_dashboard_stats()['total_contacts'], 1)
+
+    def test_bulk_submits_invalidate_the_counters(self):
+        get_dashboard_stats()
+        client = APIClient()
+        response = client.post('/api/contact/bulk/', [
+            {'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hello'},
+            {'name': 'Grace', 'email': 'grace@example.com', 'message': 'Hello'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(get_dashboard_stats()['total_contacts'], 2)
+
+    def test_stats_endpoint(self):
+        response = APIClient().get('/api/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_projects'], 1)
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import dedup
+from api.models import ContactSubmission, submission_fingerprint
+
+MESSAGE = (
+    'We are looking for a team to rebuild our online store with a faster checkout, '
+    'better search and a mobile friendly design before the holiday season starts'
+)
+
+
+def submission(email='ada@example.com', message=MESSAGE):
+    return {'name': 'Ada', 'email': email, 'message': message}
+
+
+@override_settings(DEDUP_NEAR_DUPLICATES=True, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='')
+class NearDuplicateTests(TestCase):
+    def setUp(self):
+        dedup._indexes.clear()
+
+    def test_near_duplicate_from_the_same_sender_is_dropped(self):
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission()))
+        reworded = MESSAGE.replace('holiday season', 'summer sale')
+        self.assertIsNone(dedup.create_unique(ContactSubmission, submission(email=' ADA@example.com', message=reworded)))
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+
+    def test_same_text_from_different_senders_is_kept(self):
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission('ada@example.com')))
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission('grace@example.com')))
+        self.assertEqual(ContactSubmission.objects.count(), 2)
+
+    def test_retry_after_a_failed_save_is_stored(self):
+        with mock.patch('api.dedup.enqueue_notifications', side_effect=DatabaseError('disk full')):
+            with self.assertRaises(DatabaseError):
+                dedup.create_unique(ContactSubmission, submission())
+        self.assertFalse(ContactSubmission.objects.exists())
+
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission()))
+        self.assertIsNone(dedup.create_unique(ContactSubmission, submission()))
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+
+    def test_index_is_loaded_from_recent_rows(self):
+        dedup.create_unique(ContactSubmission, submission())
+        dedup._indexes.clear()
+        self.assertIsNone(dedup.create_unique(ContactSubmission, submission(message=MESSAGE + ' thanks')))
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission(email='grace@example.com')))
+
+    def test_signatures_do_not_depend_on_the_hash_seed(self):
+        script = f'from api.dedup import signature; print(signature({MESSAGE!r}).hex())'
+        outputs = {
+            subprocess.run(
+                [sys.executable, 'manage.py', 'shell', '-c', script],
+                cwd=settings.BASE_DIR, env={**os.environ, 'PYTHONHASHSEED': seed},
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+            for seed in ('1', '2')
+        }
+        self.assertEqual(outputs, {dedup.signature(MESSAGE).hex()})
+
+
+@override_settings(
+    DEDUP_NEAR_DUPLICATES=False, DEDUP_EXACT_WINDOW=3600, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='',
+)
+class ExactDuplicateTests(TestCase):
+    def test_exact_repeats_are_dropped_within_the_window(self):
+        first = dedup.create_unique(ContactSubmission, submission())
+        self.assertIsNone(dedup.create_unique(ContactSubmission, submission(email='ADA@example.com ')))
+
+        ContactSubmission.objects.filter(pk=first.pk).update(submitted_at=timezone.now() - timedelta(hours=2))
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission()))
+        self.assertEqual(ContactSubmission.objects.count(), 2)
+
+    def test_bulk_drops_recent_repeats_and_repeats_within_the_batch(self):
+        old = ContactSubmission.objects.create(
+            submitted_at=timezone.now() - timedelta(hours=2), **submission(email='old@example.com'),
+        )
+        ContactSubmission.objects.create(**submission())
+        objs = [ContactSubmission(**submission()), ContactSubmission(**submission(email=old.email))] * 2
+        kept, duplicates = dedup.drop_duplicates(ContactSubmission, objs)
+        self.assertEqual([obj.email for obj in kept], [old.email])
+        self.assertEqual(duplicates, [0, 2, 3])
+
+    def test_fingerprint_follows_edits(self):
+        obj = ContactSubmission.objects.create(**submission())
+        obj.message = 'Actually, we only need a landing page'
+        obj.save(update_fields=['message'])
+        obj.refresh_from_db()
+        self.assertEqual(obj.fingerprint, submission_fingerprint(obj.email, obj.message))
+        # The old text is no longer a repeat; the new one is.
+        self.assertIsNotNone(dedup.create_unique(ContactSubmission, submission()))
+        self.assertIsNone(dedup.create_unique(ContactSubmission, submission(message=obj.message)))
@@ -0,0 +1,63 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.exports import stream_json, stream_ndjson
+from api.models import ContactSubmission, NewsletterSubscription
+
+
+class ExportTests(TestCase):
+    url = '/api/admin/export/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            ContactSubmission.objects.create(
+                name=f'Sender {number}', email=f'sender{number}@example.com',
+                message=f'Message {number}', fingerprint=f'fingerprint-{number}',
+            )
+        NewsletterSubscription.objects.create(email='reader@example.com')
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_has_one_row_per_line(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(
+            [line['type'] for line in lines],
+            ['contact_submissions'] * 5 + ['newsletter_subscriptions'],
+        )
+        self.assertEqual(lines[0]['data']['email'], 'sender4@example.com')
+
+    def test_json_document_is_valid(self):
+        response = self.client.get(f'{self.url}?output=json&collections=contact_submissions,project_inquiries')
+        document = json.loads(self.content(response))
+        self.assertEqual(list(document), ['contact_submissions', 'project_inquiries'])
+        self.assertEqual(len(document['contact_submissions']), 5)
+        self.assertEqual(document['project_inquiries'], [])
+
+    def test_chunks_join_into_the_same_output(self):
+        names = ['contact_submissions', 'newsletter_subscriptions']
+        chunks = list(stream_json(names, chunk_size=2))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), json.loads(''.join(stream_json(names))))
+        self.assertEqual(''.join(stream_ndjson(names, chunk_size=2)), ''.join(stream_ndjson(names)))
+
+    def test_rejects_unknown_output_and_collections(self):
+        self.assertEqual(self.client.get(f'{self.url}?output=xml').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?collections=users').status_code, 400)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,139 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import jobs
+from api.models import ContactSubmission, Job
+
+
+class WebhookStub(BaseHTTPRequestHandler):
+    """Records the JSON bodies posted to it and answers with ``status``"""
+    status = 204
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        type(self).received.append(json.loads(body))
+        self.send_response(type(self).status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    NOTIFICATION_EMAILS=['sales@example.com'],
+    NOTIFICATION_WEBHOOK_URL='',
+    JOB_MAX_ATTEMPTS=2,
+)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.contact = ContactSubmission.objects.create(
+            name='Ada', email='ada@example.com', message='Hello there',
+        )
+
+    def enqueue(self):
+        [job] = jobs.enqueue_notifications(ContactSubmission, [self.contact.pk])
+        return job
+
+    def test_enqueues_one_job_per_configured_channel(self):
+        with self.settings(NOTIFICATION_WEBHOOK_URL='http://127.0.0.1:9/'):
+            created = jobs.enqueue_notifications(ContactSubmission, [self.contact.pk])
+        self.assertEqual(sorted(job.kind for job in created), ['email_notification', 'webhook_notification'])
+        self.assertEqual(created[0].payload, {'submission': 'contact', 'id': self.contact.pk})
+
+    def test_claim_marks_the_job_running(self):
+        job = self.enqueue()
+        claimed = jobs.claim_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.locked_at)
+        self.assertIsNone(jobs.claim_job())
+
+    def test_claim_skips_jobs_that_are_not_due(self):
+        Job.objects.create(kind='email_notification', run_at=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(jobs.claim_job())
+
+    def test_email_notification_is_sent(self):
+        self.enqueue()
+        self.assertEqual(jobs.run_job(jobs.claim_job()), Job.DONE)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['sales@example.com'])
+        self.assertIn('Ada', mail.outbox[0].subject)
+        self.assertIn('message: Hello there', mail.outbox[0].body)
+
+    def test_failed_job_is_retried_with_backoff_then_dead(self):
+        job = self.enqueue()
+        self.contact.delete()
+
+        with self.settings(JOB_RETRY_BACKOFF=30), self.assertLogs('api.jobs', 'WARNING'):
+            before = timezone.now()
+            self.assertEqual(jobs.run_job(jobs.claim_job()), Job.PENDING)
+        job.refresh_from_db()
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=30))
+        self.assertIn('DoesNotExist', job.last_error)
+        self.assertIsNone(job.locked_at)
+        self.assertIsNone(jobs.claim_job())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('api.jobs', 'ERROR'):
+            self.assertEqual(jobs.run_job(jobs.claim_job()), Job.DEAD)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(jobs.claim_job())
+
+    def test_stale_running_jobs_are_released(self):
+        job = self.enqueue()
+        jobs.claim_job()
+        with self.settings(JOB_LOCK_TIMEOUT=60):
+            self.assertEqual(jobs.release_stale_jobs(), 0)
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=2))
+            self.assertEqual(jobs.release_stale_jobs(), 1)
+        self.assertEqual(jobs.claim_job().pk, job.pk)
+
+
+@override_settings(NOTIFICATION_EMAILS=[], JOB_MAX_ATTEMPTS=2, JOB_RETRY_BACKOFF=0)
+class WebhookNotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), WebhookStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/hook'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        WebhookStub.status = 204
+        WebhookStub.received = []
+        contact = ContactSubmission.objects.create(name='Ada', email='ada@example.com', message='Hello there')
+        with self.settings(NOTIFICATION_WEBHOOK_URL=self.url):
+            [self.job] = jobs.enqueue_notifications(ContactSubmission, [contact.pk])
+
+    def test_webhook_receives_the_submission(self):
+        with self.settings(NOTIFICATION_WEBHOOK_URL=self.url):
+            self.assertEqual(jobs.run_job(jobs.claim_job()), Job.DONE)
+        [event] = WebhookStub.received
+        self.assertEqual(event['event'], 'contact.created')
+        self.assertEqual(event['data']['email'], 'ada@example.com')
+
+    def test_webhook_errors_are_retried_until_dead(self):
+        WebhookStub.status = 500
+        with self.settings(NOTIFICATION_WEBHOOK_URL=self.url), self.assertLogs('api.jobs', 'WARNING'):
+            self.assertEqual(jobs.run_job(jobs.claim_job()), Job.PENDING)
+            self.assertEqual(jobs.run_job(jobs.claim_job()), Job.DEAD)
+        self.assertEqual(len(WebhookStub.received), 2)
+        self.job.refresh_from_db()
+        self.assertIn('HTTP Error 500', self.job.last_error)
@@ -0,0 +1,70 @@
+import re
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api.middleware import RequestMetricsMiddleware
+from api.models import PortfolioProject
+
+
+def count_projects(times):
+    def get_response(request):
+        for _ in range(times):
+            PortfolioProject.objects.count()
+        return HttpResponse('ok')
+    return get_response
+
+
+class RequestMetricsTests(TestCase):
+    def test_server_timing_counts_queries_and_serialization(self):
+        PortfolioProject.objects.create(title='Shop', description='Shop', technologies='Django', category='web')
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(FAST_SERIALIZATION=fast, RESPONSE_CACHE_TIMEOUT=0):
+                timing = self.client.get('/api/portfolio/', HTTP_ACCEPT='application/json')['Server-Timing']
+                queries = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+                serialize = float(re.search(r'serialize;dur=([\d.]+)', timing).group(1))
+                self.assertGreaterEqual(queries, 2)
+                self.assertGreater(serialize, 0)
+
+    def test_repeated_statements_are_logged_as_n_plus_one(self):
+        request = RequestFactory().get('/n-plus-one/')
+        with self.settings(REQUEST_METRICS_N_PLUS_ONE_THRESHOLD=5):
+            with self.assertLogs('api.metrics', 'WARNING') as logs:
+                RequestMetricsMiddleware(count_projects(5))(request)
+            self.assertIn('"n_plus_one"', logs.output[0])
+            with self.assertNoLogs('api.metrics', 'INFO'):
+                RequestMetricsMiddleware(count_projects(4))(request)
+
+    @override_settings(REQUEST_METRICS_LOG_SAMPLE_RATE=1)
+    def test_sampled_requests_are_logged(self):
+        with self.assertLogs('api.metrics', 'INFO') as logs:
+            RequestMetricsMiddleware(count_projects(1))(RequestFactory().get('/sampled/'))
+        self.assertIn('"db_queries": 1', logs.output[0])
+
+
+@override_settings(METRICS_TOKEN='s3cret-token')
+class MetricsEndpointTests(TestCase):
+    url = '/api/metrics/'
+
+    def test_anonymous_callers_are_refused(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="metrics"')
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    def test_bearer_token(self):
+        self.client.get('/api/stats/')
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer s3cret-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('view="stats"', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='')
+    def test_no_token_configured_accepts_no_bearer(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+
+    def test_staff_session(self):
+        self.client.force_login(User.objects.create_user('reader'))
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
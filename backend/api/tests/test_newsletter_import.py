@@ -0,0 +1,85 @@
+import io
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import NewsletterSubscription
+from api.newsletter_import import import_subscribers
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, SUBMISSION_SPOOL_ENABLED=False)
+class NewsletterImportTests(TestCase):
+    def test_csv_import_report(self):
+        NewsletterSubscription.objects.create(email='active@example.com')
+        NewsletterSubscription.objects.create(email='gone@example.com', is_active=False)
+        lines = [
+            b'name,email\n',
+            b'Ada,Ada@Example.com\n',
+            b'Ada again, ada@example.com \n',
+            b'Active,active@example.com\n',
+            b'Gone,GONE@example.com\n',
+            b'Nobody,not-an-address\n',
+        ]
+        report = import_subscribers(lines, chunk_size=2)
+        self.assertEqual(
+            {key: report[key] for key in ('rows', 'inserted', 'reactivated', 'skipped', 'invalid')},
+            {'rows': 5, 'inserted': 1, 'reactivated': 1, 'skipped': 2, 'invalid': 1},
+        )
+        self.assertEqual(
+            sorted(NewsletterSubscription.objects.filter(is_active=True).values_list('email', flat=True)),
+            ['active@example.com', 'ada@example.com', 'gone@example.com'],
+        )
+
+    def test_ndjson_import(self):
+        lines = ['"one@example.com"\n', '{"email": "two@example.com"}\n', '\n', '{"name": "no email"}\n', '[1]\n']
+        report = import_subscribers(lines, format='ndjson')
+        self.assertEqual((report['rows'], report['inserted'], report['invalid']), (4, 2, 2))
+
+    def test_import_and_api_agree_on_addresses(self):
+        client = APIClient()
+        response = client.post('/api/newsletter/subscribe/', {'email': ' Ada@Example.COM '}, format='json')
+        self.assertEqual(response.status_code, 201)
+        report = import_subscribers(['ada@example.com\n'])
+        self.assertEqual((report['inserted'], report['skipped']), (0, 1))
+        self.assertEqual(NewsletterSubscription.objects.get().email, 'ada@example.com')
+
+        response = client.post('/api/newsletter/unsubscribe/', {'email': 'ADA@example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(NewsletterSubscription.objects.get().is_active)
+        response = client.post('/api/newsletter/subscribe/', {'email': 'ada@EXAMPLE.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(NewsletterSubscription.objects.get().is_active)
+
+    def test_endpoint_requires_staff(self):
+        client = APIClient()
+        body = 'email\nada@example.com\n'
+        response = client.post('/api/newsletter/import/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+        client.force_authenticate(User.objects.create_user('staff', is_staff=True))
+        response = client.post('/api/newsletter/import/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['inserted'], 1)
+
+    def test_command_reads_stdin(self):
+        stdout = io.StringIO()
+        stdin = io.TextIOWrapper(io.BytesIO(b'one@example.com\ntwo@example.com\n'))
+        with mock.patch('sys.stdin', stdin):
+            call_command('import_subscribers', '-', stdout=stdout)
+        self.assertEqual(NewsletterSubscription.objects.count(), 2)
+
+    def test_migration_merges_addresses_differing_in_case(self):
+        NewsletterSubscription.objects.create(email='Ada@Example.com', is_active=False)
+        NewsletterSubscription.objects.create(email='ada@example.com', is_active=True)
+        NewsletterSubscription.objects.create(email='Grace@example.com')
+        migration = import_module('api.migrations.0014_normalize_subscription_emails')
+        migration.normalize_subscription_emails(apps, None)
+        self.assertEqual(
+            sorted(NewsletterSubscription.objects.values_list('email', 'is_active')),
+            [('ada@example.com', True), ('grace@example.com', True)],
+        )
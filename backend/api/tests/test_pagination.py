@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import ContactSubmission
+
+
+class KeysetPaginationTests(TestCase):
+    url = '/api/contact/list/'
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # Pairs sharing a timestamp, so the id tie-breaker matters.
+        cls.contacts = [
+            ContactSubmission.objects.create(
+                name=f'Sender {number}',
+                email=f'sender{number}@example.com',
+                message=f'Message {number}',
+                fingerprint=f'fingerprint-{number}',
+                submitted_at=now - timedelta(minutes=number // 2),
+            )
+            for number in range(7)
+        ]
+        cls.newest_first = [
+            contact.pk for contact in sorted(cls.contacts, key=lambda c: (c.submitted_at, c.pk), reverse=True)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_walks_forward_and_back_over_every_row(self):
+        page = self.get(f'{self.url}?page_size=3')
+        self.assertIsNone(page['previous'])
+        pages = [[row['id'] for row in page['results']]]
+        while page['next']:
+            page = self.get(page['next'])
+            pages.append([row['id'] for row in page['results']])
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.newest_first)
+
+        for expected in reversed(pages[:-1]):
+            page = self.get(page['previous'])
+            self.assertEqual([row['id'] for row in page['results']], expected)
+        self.assertIsNone(page['previous'])
+
+    def test_page_size_is_capped(self):
+        page = self.get(f'{self.url}?page_size=100000')
+        self.assertEqual(len(page['results']), 7)
+        self.assertIsNone(page['next'])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(f'{self.url}?cursor=not-a-cursor').status_code, 404)
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import ratelimit
+from api.ratelimit import LocalBuckets
+
+
+@override_settings(
+    RATE_LIMIT_ENABLED=True,
+    RATE_LIMIT_IP='3/m',
+    RATE_LIMIT_EMAIL='2/h',
+    RATE_LIMIT_BULK_IP='5/h',
+    RATE_LIMIT_BACKEND='local',
+)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit._buckets = None
+        self.addCleanup(setattr, ratelimit, '_buckets', None)
+        self.client = APIClient()
+
+    def post(self, url, data, ip='203.0.113.1'):
+        # Invalid bodies are enough: the limit is checked before validation.
+        return self.client.post(url, data, format='json', REMOTE_ADDR=ip)
+
+    def test_ip_limit_refuses_before_touching_the_database(self):
+        for _ in range(3):
+            self.assertEqual(self.post('/api/contact/submit/', {}).status_code, 400)
+        with self.assertNumQueries(0):
+            response = self.post('/api/contact/submit/', {})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        # Other clients and other endpoints have buckets of their own.
+        self.assertEqual(self.post('/api/contact/submit/', {}, ip='203.0.113.2').status_code, 400)
+        self.assertEqual(self.post('/api/project-inquiry/submit/', {}).status_code, 400)
+
+    def test_email_limit_applies_across_ips_and_spellings(self):
+        self.assertEqual(self.post('/api/newsletter/subscribe/', {'email': 'x'}, ip='203.0.113.1').status_code, 400)
+        self.assertEqual(self.post('/api/newsletter/subscribe/', {'email': 'x'}, ip='203.0.113.2').status_code, 400)
+        self.assertEqual(self.post('/api/newsletter/subscribe/', {'email': ' X '}, ip='203.0.113.3').status_code, 429)
+        self.assertEqual(self.post('/api/newsletter/subscribe/', {'email': 'y'}, ip='203.0.113.4').status_code, 400)
+
+    def test_unsubscribe_is_limited_per_ip_only(self):
+        # Otherwise anyone could use up someone else's unsubscribe bucket.
+        for number in range(3):
+            self.post('/api/newsletter/unsubscribe/', {'email': 'victim@example.com'}, ip=f'203.0.113.{number}')
+        response = self.post('/api/newsletter/unsubscribe/', {'email': 'victim@example.com'}, ip='203.0.113.9')
+        self.assertNotEqual(response.status_code, 429)
+
+    def test_bulk_endpoints_charge_per_item(self):
+        self.assertNotEqual(self.post('/api/contact/bulk/', {'items': [{}] * 4}).status_code, 429)
+        self.assertEqual(self.post('/api/contact/bulk/', {'items': [{}] * 2}).status_code, 429)
+        self.assertNotEqual(self.post('/api/contact/bulk/', [{}]).status_code, 429)
+        self.assertEqual(self.post('/api/contact/bulk/', [{}]).status_code, 429)
+
+    def test_disabled(self):
+        with override_settings(RATE_LIMIT_ENABLED=False):
+            for _ in range(5):
+                self.assertEqual(self.post('/api/contact/submit/', {}).status_code, 400)
+
+    @override_settings(RATE_LIMIT_BACKEND='cache', RATE_LIMIT_CACHE_ALIAS='default')
+    def test_cache_backend_shares_buckets_and_remembers_refusals(self):
+        caches['default'].clear()
+        for _ in range(3):
+            self.assertEqual(self.post('/api/contact/submit/', {}).status_code, 400)
+        # A second worker sees the same bucket.
+        ratelimit._buckets = None
+        self.assertEqual(self.post('/api/contact/submit/', {}).status_code, 429)
+        with mock.patch.object(caches['default'], 'get') as get:
+            self.assertEqual(self.post('/api/contact/submit/', {}).status_code, 429)
+        get.assert_not_called()
+
+
+class BucketTests(TestCase):
+    def test_tokens_refill_over_the_period(self):
+        buckets = LocalBuckets(evict_interval=60, max_keys=100)
+        for _ in range(2):
+            self.assertEqual(buckets.take('key', 2, 60, now=1000), 0)
+        self.assertAlmostEqual(buckets.take('key', 2, 60, now=1000), 30)
+        self.assertEqual(buckets.take('key', 2, 60, now=1030), 0)
+
+    def test_full_buckets_are_evicted(self):
+        buckets = LocalBuckets(evict_interval=60, max_keys=100)
+        buckets.next_eviction = 1060
+        buckets.take('key', 2, 60, now=1000)
+        buckets.take('other', 2, 60, now=1100)
+        self.assertEqual(list(buckets.full_at), ['other'])
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from api.models import PortfolioProject
+from api.response_cache import get_response_cache, invalidate_responses, response_key
+
+
+def portfolio_key(**params):
+    request = RequestFactory().get('/api/portfolio/', params)
+
+    def portfolio_projects():
+        pass
+    return response_key(portfolio_projects, request, {}, ('featured', 'category', 'technology'), 'application/json')
+
+
+class ResponseCacheTests(TestCase):
+    url = '/api/portfolio/'
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.project = PortfolioProject.objects.create(
+            title='Shop', description='An online shop', technologies='Django', category='web',
+        )
+
+    def get(self, url=url, **params):
+        response = self.client.get(url, params, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_miss_then_hit(self):
+        first = self.get()
+        self.assertEqual(first['X-Response-Cache'], 'MISS')
+        # Only the conditional GET version query: no rows are fetched.
+        with self.assertNumQueries(1):
+            second = self.get()
+        self.assertEqual(second['X-Response-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+    def test_query_values_are_part_of_the_key(self):
+        self.get(category='web')
+        self.assertEqual(self.get(category='WEB')['X-Response-Cache'], 'MISS')
+        self.assertEqual(self.get(category='WEB').json(), [])
+        self.assertEqual(len(self.get(category='web').json()), 1)
+        # Parameters the view does not read do not split the cache.
+        self.assertEqual(self.get(category='web', page='2')['X-Response-Cache'], 'HIT')
+
+    def test_writes_invalidate_entries(self):
+        self.get()
+        self.project.title = 'Online shop'
+        self.project.save()
+        response = self.get()
+        self.assertEqual(response['X-Response-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['title'], 'Online shop')
+
+    def test_stale_entry_is_served_while_another_request_rebuilds_it(self):
+        self.get()
+        invalidate_responses(PortfolioProject)
+        get_response_cache().add(f'{portfolio_key()}:lock', True)
+        self.assertEqual(self.get()['X-Response-Cache'], 'STALE')
+
+    @override_settings(RESPONSE_CACHE_MISS_WAIT=5)
+    def test_miss_waits_for_the_request_building_the_entry(self):
+        cache = get_response_cache()
+        key = portfolio_key()
+        self.get()
+        entry = cache.get(key)
+        cache.delete(key)
+        cache.add(f'{key}:lock', True)
+
+        timer = threading.Timer(0.1, cache.set, (key, entry))
+        timer.start()
+        with self.assertNumQueries(1):
+            response = self.get()
+        timer.join()
+        self.assertEqual(response['X-Response-Cache'], 'HIT')
+        self.assertEqual(response.content, entry['body'])
+
+    @override_settings(RESPONSE_CACHE_MISS_WAIT=0.2)
+    def test_miss_renders_itself_when_the_wait_times_out(self):
+        cache = get_response_cache()
+        cache.add(f'{portfolio_key()}:lock', True)
+        started = time.monotonic()
+        response = self.get()
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(response['X-Response-Cache'], 'MISS')
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import retention
+from api.models import ArchivedRecord, ContactSubmission, MetricRollup, ProjectInquiry
+from api.search import search_ids
+
+
+def contact(number, days_old, is_read=True):
+    return ContactSubmission.objects.create(
+        name=f'Sender {number}', email=f'sender{number}@example.com', message=f'Archived message {number}',
+        submitted_at=timezone.now() - timedelta(days=days_old, microseconds=123), is_read=is_read,
+    )
+
+
+@override_settings(
+    RETENTION_CONTACT_DAYS=30,
+    RETENTION_INQUIRY_DAYS=0,
+    RATE_LIMIT_ENABLED=False,
+    NOTIFICATION_EMAILS=[],
+    NOTIFICATION_WEBHOOK_URL='',
+)
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.old = [contact(number, days_old=40 + number) for number in range(3)]
+        self.unread = contact(10, days_old=40, is_read=False)
+        self.recent = contact(11, days_old=5)
+
+    def test_archive_moves_only_eligible_rows_in_batches(self):
+        self.assertEqual(retention.archive('contact_submissions', batch_size=2), 3)
+        self.assertEqual(
+            set(ContactSubmission.objects.values_list('pk', flat=True)),
+            {self.unread.pk, self.recent.pk},
+        )
+        self.assertEqual(
+            sorted(ArchivedRecord.objects.values_list('record_id', flat=True)),
+            sorted(obj.pk for obj in self.old),
+        )
+        # Nothing left to move: rerunning is a no-op.
+        self.assertEqual(retention.archive('contact_submissions'), 0)
+
+    def test_policy_off_archives_nothing(self):
+        ProjectInquiry.objects.create(
+            name='Ada', email='ada@example.com', project_type='web', description='Old', status='closed',
+            submitted_at=timezone.now() - timedelta(days=400),
+        )
+        self.assertEqual(retention.archive('project_inquiries'), 0)
+        self.assertEqual(retention.archive('project_inquiries', days=30), 1)
+
+    def test_archived_rows_keep_their_analytics_counts_but_leave_search(self):
+        before = dict(MetricRollup.objects.values_list('bucket', 'value').filter(metric='contacts', granularity='day'))
+        retention.archive('contact_submissions')
+        after = dict(MetricRollup.objects.values_list('bucket', 'value').filter(metric='contacts', granularity='day'))
+        self.assertEqual(after, before)
+        self.assertEqual(search_ids(ContactSubmission, 'archived message', 10), [self.recent.pk, self.unread.pk])
+
+    def test_get_record_reads_through_to_the_archive(self):
+        retention.archive('contact_submissions')
+        obj, archived = retention.get_record('contact_submissions', self.old[0].pk)
+        self.assertTrue(archived)
+        for field in ('name', 'email', 'message', 'submitted_at', 'is_read', 'fingerprint'):
+            self.assertEqual(getattr(obj, field), getattr(self.old[0], field))
+
+        self.assertEqual(retention.get_record('contact_submissions', self.recent.pk), (self.recent, False))
+        with self.assertRaises(ContactSubmission.DoesNotExist):
+            retention.get_record('contact_submissions', 999)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('archive', '--dry-run', stdout=out)
+        self.assertIn('contact_submissions: 3 row(s)', out.getvalue())
+        self.assertIn('project_inquiries: retention policy off', out.getvalue())
+        self.assertEqual(ArchivedRecord.objects.count(), 0)
+        call_command('archive', '--collection', 'contact_submissions', stdout=StringIO())
+        self.assertEqual(ArchivedRecord.objects.count(), 3)
+
+
+@override_settings(RETENTION_CONTACT_DAYS=30)
+class ArchivedReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.archived = contact(1, days_old=40)
+        cls.live = contact(2, days_old=5)
+        retention.archive('contact_submissions')
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_archived_lists_are_for_admins_only(self):
+        response = self.client.get('/api/contact/list/', {'archived': 'true'})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/contact/list/', {'archived': 'true', 'fields': 'id,email'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.archived.pk, 'email': self.archived.email}])
+
+    def test_admin_record(self):
+        url = f'/api/admin/records/contact_submissions/{self.archived.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['archived'])
+        self.assertEqual(response.data['email'], self.archived.email)
+        response = self.client.get(f'/api/admin/records/contact_submissions/{self.live.pk}/')
+        self.assertFalse(response.data['archived'])
+        self.assertEqual(self.client.get('/api/admin/records/contact_submissions/999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/admin/records/users/1/').status_code, 404)
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import rollups
+from api.models import ContactSubmission, MetricRollup, NewsletterSubscription, ProjectInquiry
+from api.transitions import transition
+
+JAN_1 = datetime(2026, 1, 1, 9, 30, tzinfo=dt_timezone.utc)
+
+
+def inquiry(when, project_type='web', **fields):
+    return ProjectInquiry.objects.create(
+        name='Ada', email='ada@example.com', project_type=project_type,
+        description=f'A {project_type} project from {when.isoformat()}', submitted_at=when, **fields,
+    )
+
+
+def stored_rollups():
+    return {
+        (row.metric, row.dimension, row.granularity, row.bucket): row.value
+        for row in MetricRollup.objects.filter(metric__in=rollups.ROLLUPS).exclude(value=0)
+    }
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='', TIME_ZONE='UTC')
+class RollupTests(TestCase):
+    def value(self, metric, granularity, bucket, dimension=''):
+        row = MetricRollup.objects.filter(
+            metric=metric, dimension=dimension, granularity=granularity, bucket=bucket,
+        ).first()
+        return row.value if row else 0
+
+    def test_saves_and_deletes_update_every_granularity(self):
+        contact = ContactSubmission.objects.create(name='Ada', email='ada@example.com', message='Hi', submitted_at=JAN_1)
+        ContactSubmission.objects.create(
+            name='Bob', email='bob@example.com', message='Hello', submitted_at=JAN_1 + timedelta(days=1),
+        )
+        self.assertEqual(self.value('contacts', MetricRollup.HOUR, JAN_1.replace(minute=0)), 1)
+        self.assertEqual(self.value('contacts', MetricRollup.DAY, JAN_1.replace(hour=0, minute=0)), 1)
+        self.assertEqual(self.value('contacts', MetricRollup.MONTH, JAN_1.replace(hour=0, minute=0)), 2)
+
+        contact.delete()
+        self.assertEqual(self.value('contacts', MetricRollup.MONTH, JAN_1.replace(hour=0, minute=0)), 1)
+
+    def test_dimension_changes_move_the_count(self):
+        obj = inquiry(JAN_1)
+        obj.status = 'contacted'
+        obj.save()
+        month = JAN_1.replace(hour=0, minute=0)
+        self.assertEqual(self.value('inquiries_by_status', MetricRollup.MONTH, month, 'new'), 0)
+        self.assertEqual(self.value('inquiries_by_status', MetricRollup.MONTH, month, 'contacted'), 1)
+        self.assertEqual(self.value('inquiries_by_type', MetricRollup.MONTH, month, 'web'), 1)
+
+    def test_bulk_transitions_move_the_count(self):
+        ids = [inquiry(JAN_1).pk, inquiry(JAN_1 + timedelta(hours=2)).pk]
+        transition('project_inquiries', ids, 'closed', 'staff')
+        day = JAN_1.replace(hour=0, minute=0)
+        self.assertEqual(self.value('inquiries_by_status', MetricRollup.DAY, day, 'new'), 0)
+        self.assertEqual(self.value('inquiries_by_status', MetricRollup.DAY, day, 'closed'), 2)
+
+    def test_incremental_rollups_match_a_backfill(self):
+        for hours, project_type in ((0, 'web'), (5, 'mobile'), (30, 'web'), (24 * 40, 'custom')):
+            inquiry(JAN_1 + timedelta(hours=hours), project_type)
+        ProjectInquiry.objects.bulk_create([
+            ProjectInquiry(name='Bo', email='bo@example.com', project_type='web', description='Bulk', submitted_at=JAN_1),
+        ])
+        rollups.record_created(ProjectInquiry, ProjectInquiry.objects.filter(name='Bo'))
+        first = ProjectInquiry.objects.order_by('pk').first()
+        first.status = 'quoted'
+        first.save(update_fields=['status'])
+        ProjectInquiry.objects.order_by('pk').last().delete()
+
+        incremental = stored_rollups()
+        rollups.backfill()
+        self.assertEqual(stored_rollups(), incremental)
+
+    def test_unsubscribing_counts_a_transition(self):
+        subscription = NewsletterSubscription.objects.create(email='reader@example.com')
+        subscription.is_active = False
+        subscription.save()
+        data = rollups.analytics(subscription.subscribed_at - timedelta(hours=1), subscription.subscribed_at + timedelta(hours=1))
+        self.assertEqual(data['metrics']['unsubscriptions']['totals'], {'count': 1})
+        self.assertEqual(data['metrics']['subscriptions']['totals'], {'count': 1})
+
+    def test_analytics_picks_the_finest_granularity_that_fits(self):
+        inquiry(JAN_1, 'mobile')
+        data = rollups.analytics(JAN_1.replace(hour=0, minute=0), JAN_1 + timedelta(days=2), metrics=['inquiries_by_type'])
+        self.assertEqual(data['granularity'], MetricRollup.HOUR)
+        self.assertEqual(len(data['metrics']['inquiries_by_type']['series']), 2 * 24 + 10)
+        self.assertEqual(data['metrics']['inquiries_by_type']['totals'], {'mobile': 1})
+
+        self.assertEqual(rollups.analytics(JAN_1, JAN_1 + timedelta(days=60))['granularity'], MetricRollup.DAY)
+        self.assertEqual(rollups.analytics(JAN_1, JAN_1 + timedelta(days=365))['granularity'], MetricRollup.MONTH)
+        with self.assertRaises(ValueError):
+            rollups.analytics(JAN_1, JAN_1 + timedelta(days=60), granularity=MetricRollup.HOUR)
+        with self.assertRaises(ValueError):
+            rollups.analytics(JAN_1, JAN_1 + timedelta(days=1), metrics=['visits'])
+
+
+@override_settings(TIME_ZONE='UTC')
+class AnalyticsEndpointTests(TestCase):
+    url = '/api/admin/analytics/'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_dates_cover_whole_days(self):
+        self.client.force_authenticate(User.objects.create_user('staff', is_staff=True))
+        response = self.client.get(self.url, {'start': '2026-01-01', 'end': '2026-01-31', 'metrics': 'contacts'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['granularity'], MetricRollup.DAY)
+        self.assertEqual(len(response.data['metrics']['contacts']['series']), 31)
+
+        response = self.client.get(self.url, {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import ContactSubmission, PortfolioProject
+from api.search import SEARCH_FIELDS, fts_table, search_ids
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='')
+class SearchTests(TestCase):
+    url = '/api/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.shop = PortfolioProject.objects.create(
+            title='Online shop', description='A shop built with Django and Stripe payments',
+            technologies='Django, Stripe', category='web',
+        )
+        cls.blog = PortfolioProject.objects.create(
+            title='Blog', description='A static blog that mentions a shop once', technologies='Hugo', category='web',
+        )
+        cls.app = PortfolioProject.objects.create(
+            title='Fitness app', description='Workout tracking', technologies='Flutter', category='mobile',
+        )
+        cls.contact = ContactSubmission.objects.create(
+            name='Ada', email='ada@example.com', message='Please quote a payments integration',
+        )
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_migrate_creates_the_index_and_triggers(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 tables are SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')")
+            objects = dict(cursor.fetchall())
+        for model in SEARCH_FIELDS:
+            fts = fts_table(model)
+            self.assertIn(fts, objects)
+            self.assertIn(f'{fts}_ai', objects)
+            self.assertIn(f'{fts}_ad', objects)
+            # Writes that leave the indexed columns alone do not reindex the row.
+            self.assertIn('AFTER UPDATE OF', objects[f'{fts}_au'])
+
+    def test_best_matches_come_first(self):
+        self.assertEqual(search_ids(PortfolioProject, 'shop', 10), [self.shop.pk, self.blog.pk])
+
+    def test_every_word_must_match_and_the_last_is_a_prefix(self):
+        self.assertEqual(search_ids(PortfolioProject, 'django stri', 10), [self.shop.pk])
+        self.assertEqual(search_ids(PortfolioProject, 'django flutter', 10), [])
+        self.assertEqual(search_ids(PortfolioProject, '!!!', 10), [])
+
+    def test_queryset_writes_stay_searchable(self):
+        PortfolioProject.objects.filter(pk=self.app.pk).update(description='Workout shop')
+        self.assertIn(self.app.pk, search_ids(PortfolioProject, 'shop', 10))
+        self.assertEqual(search_ids(PortfolioProject, 'workout tracking', 10), [])
+
+        PortfolioProject.objects.bulk_create([
+            PortfolioProject(title='Kiosk', description='Point of sale', technologies='Rust', category='desktop'),
+        ])
+        self.assertEqual(len(search_ids(PortfolioProject, 'kiosk', 10)), 1)
+
+        PortfolioProject.objects.filter(pk=self.blog.pk).delete()
+        self.assertEqual(search_ids(PortfolioProject, 'hugo', 10), [])
+
+    def test_status_updates_keep_the_row_indexed(self):
+        ContactSubmission.objects.filter(pk=self.contact.pk).update(is_read=True)
+        self.assertEqual(search_ids(ContactSubmission, 'payments', 10), [self.contact.pk])
+
+    def test_anonymous_callers_only_search_projects(self):
+        response = self.client.get(self.url, {'q': 'payments'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results']), ['portfolio_projects'])
+        self.assertEqual([p['id'] for p in response.data['results']['portfolio_projects']], [self.shop.pk])
+
+        response = self.client.get(self.url, {'q': 'payments', 'type': 'contact_submissions'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_search_submissions_too(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(self.url, {'q': 'payments', 'type': 'contact_submissions'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['id'] for c in response.data['results']['contact_submissions']], [self.contact.pk])
+
+    def test_rejects_bad_queries(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'shop', 'type': 'users'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'shop', 'limit': 'all'}).status_code, 400)
@@ -0,0 +1,113 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import dedup, spool
+from api.models import ContactSubmission, NewsletterSubscription, SpoolCheckpoint
+
+
+def contact(number):
+    return {
+        'name': f'Sender {number}',
+        'email': f'sender{number}@example.com',
+        'message': f'Message number {number} about a new website for a bakery with online ordering',
+    }
+
+
+@override_settings(
+    SUBMISSION_SPOOL_BATCH_SIZE=2,
+    RATE_LIMIT_ENABLED=False,
+    NOTIFICATION_EMAILS=[],
+    NOTIFICATION_WEBHOOK_URL='',
+)
+class SpoolTests(TestCase):
+    def setUp(self):
+        dedup._indexes.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'spool.sqlite3'
+        self.spool = spool.Spool(self.path)
+
+    def spy_on_writers(self):
+        calls = []
+
+        def record(writer):
+            def write(entries):
+                calls.append([data for data, _ in entries])
+                return writer(entries)
+            return write
+
+        patcher = mock.patch.dict(spool.WRITERS, {kind: record(writer) for kind, writer in spool.WRITERS.items()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    def test_flush_commits_entries_in_batches_and_empties_the_spool(self):
+        for number in range(3):
+            self.spool.append('contact', contact(number))
+        self.spool.append('newsletter', {'email': 'reader@example.com'})
+
+        self.assertEqual(self.spool.flush(), 4)
+        self.assertEqual(ContactSubmission.objects.count(), 3)
+        self.assertTrue(NewsletterSubscription.objects.filter(email='reader@example.com').exists())
+        self.assertEqual(self.spool.backlog(), (0, 0.0))
+        self.assertEqual(SpoolCheckpoint.objects.get(spool_id=self.spool.spool_id).last_entry_id, 4)
+
+    def test_crash_after_commit_does_not_write_entries_twice(self):
+        calls = self.spy_on_writers()
+        self.spool.append('contact', contact(1))
+        self.spool.append('contact', contact(2))
+
+        # The rows and the checkpoint are committed, then the process dies before discarding the entries.
+        with mock.patch.object(spool.Spool, 'discard', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self.spool.flush()
+        self.assertEqual(self.spool.backlog()[0], 2)
+
+        # A restarted process opens the same file and replays from the checkpoint.
+        restarted = spool.Spool(self.path)
+        self.assertEqual(restarted.spool_id, self.spool.spool_id)
+        self.assertEqual(restarted.flush(), 0)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(ContactSubmission.objects.count(), 2)
+        self.assertEqual(restarted.backlog()[0], 0)
+
+    def test_crash_before_commit_replays_the_whole_batch(self):
+        self.spool.append('contact', contact(1))
+        self.spool.append('newsletter', {'email': 'reader@example.com'})
+
+        with mock.patch.dict(spool.WRITERS, {'newsletter': mock.Mock(side_effect=RuntimeError('crash'))}):
+            with self.assertRaises(RuntimeError):
+                self.spool.flush()
+        self.assertEqual(ContactSubmission.objects.count(), 0)
+        self.assertFalse(SpoolCheckpoint.objects.filter(last_entry_id__gt=0).exists())
+
+        self.assertEqual(spool.Spool(self.path).flush(), 2)
+        self.assertEqual(ContactSubmission.objects.count(), 1)
+        self.assertEqual(NewsletterSubscription.objects.count(), 1)
+
+    def test_only_one_process_flushes_at_a_time(self):
+        self.spool.append('contact', contact(1))
+        lock = self.spool.flush_lock()
+        try:
+            self.assertEqual(spool.Spool(self.path).flush(), 0)
+        finally:
+            lock.close()
+        self.assertEqual(self.spool.flush(), 1)
+
+    def test_buffered_submit_answers_202_and_spools(self):
+        with override_settings(SUBMISSION_SPOOL_ENABLED=True), \
+                mock.patch.object(spool, 'get_spool', return_value=self.spool), \
+                mock.patch.object(spool, 'start_flusher') as start_flusher:
+            response = APIClient().post('/api/contact/submit/', contact(1), format='json')
+        self.assertEqual(response.status_code, 202)
+        start_flusher.return_value.notify.assert_called_once_with()
+        self.assertEqual(ContactSubmission.objects.count(), 0)
+        self.assertEqual(self.spool.backlog()[0], 1)
+
+        self.spool.flush()
+        self.assertEqual(ContactSubmission.objects.get().email, 'sender1@example.com')
@@ -0,0 +1,49 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from api.models import PortfolioProject, Technology, parse_technologies
+
+
+class ParseTechnologiesTests(TestCase):
+    def test_keeps_order_and_first_spelling(self):
+        self.assertEqual(parse_technologies('React, Django ,PostgreSQL'), ['React', 'Django', 'PostgreSQL'])
+        self.assertEqual(parse_technologies('React, , react,Django,REACT'), ['React', 'Django'])
+
+    def test_empty(self):
+        self.assertEqual(parse_technologies(''), [])
+        self.assertEqual(parse_technologies(None), [])
+        self.assertEqual(parse_technologies(' , '), [])
+
+
+class TechnologyFilterTests(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.shop = PortfolioProject.objects.create(
+            title='Shop', description='An online shop', technologies='React, , react,Django', category='web',
+        )
+        self.app = PortfolioProject.objects.create(
+            title='App', description='A mobile app', technologies='Flutter', category='mobile',
+        )
+
+    def titles(self, **params):
+        return [project['title'] for project in self.client.get('/api/portfolio/', params).json()]
+
+    def test_technologies_list(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), override_settings(FAST_SERIALIZATION=fast):
+                caches['responses'].clear()
+                project = self.client.get(f'/api/portfolio/{self.shop.pk}/').json()
+                self.assertEqual(project['technologies'], 'React, , react,Django')
+                self.assertEqual(project['technologies_list'], ['React', 'Django'])
+
+    def test_filter_is_case_insensitive(self):
+        self.assertEqual(self.titles(technology='REACT'), ['Shop'])
+        self.assertEqual(self.titles(technology='flutter'), ['App'])
+        self.assertEqual(self.titles(technology='vue'), [])
+
+    def test_relation_follows_edits(self):
+        self.shop.technologies = 'Vue'
+        self.shop.save()
+        self.assertEqual(self.titles(technology='vue'), ['Shop'])
+        self.assertEqual(self.titles(technology='react'), [])
+        self.assertEqual(Technology.objects.filter(slug='react').count(), 1)
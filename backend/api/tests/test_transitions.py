@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import ContactSubmission, ProjectInquiry, StatusChange, StatusTransition
+from api.transitions import transition
+
+
+def inquiry(number, status='new'):
+    return ProjectInquiry.objects.create(
+        name=f'Client {number}', email=f'client{number}@example.com', project_type='web',
+        description=f'Inquiry {number}', status=status,
+    )
+
+
+@override_settings(BULK_TRANSITION_CHUNK_SIZE=2, NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='')
+class TransitionTests(TestCase):
+    def test_only_allowed_transitions_are_applied(self):
+        new = [inquiry(number) for number in range(3)]
+        quoted = inquiry(3, 'quoted')
+        closed = inquiry(4, 'closed')
+        ids = [obj.pk for obj in new] + [quoted.pk, closed.pk, 999]
+
+        changed = transition('project_inquiries', ids, 'contacted', 'staff')
+        self.assertEqual(sorted(changed), [obj.pk for obj in new])
+        self.assertEqual(
+            dict(ProjectInquiry.objects.values_list('pk', 'status')),
+            {**{obj.pk: 'contacted' for obj in new}, quoted.pk: 'quoted', closed.pk: 'closed'},
+        )
+
+    def test_each_source_value_is_one_update_per_chunk(self):
+        ids = [inquiry(0).pk, inquiry(1, 'contacted').pk, inquiry(2, 'quoted').pk]
+        # 2 chunks x 3 source values, the rollups, the audit row and its changes, in a savepoint.
+        with self.assertNumQueries(2 * 3 + 3 + 2):
+            changed = transition('project_inquiries', ids, 'closed')
+        self.assertEqual(sorted(changed), ids)
+
+    def test_audit_trail_records_previous_values(self):
+        first, second = inquiry(0), inquiry(1, 'contacted')
+        transition('project_inquiries', [first.pk, second.pk, first.pk], 'closed', 'staff')
+        audit = StatusTransition.objects.get()
+        self.assertEqual(
+            (audit.collection, audit.field, audit.new_value, audit.count, audit.changed_by, audit.source),
+            ('project_inquiries', 'status', 'closed', 2, 'staff', StatusTransition.API),
+        )
+        self.assertEqual(
+            dict(StatusChange.objects.values_list('record_id', 'old_value')),
+            {first.pk: 'new', second.pk: 'contacted'},
+        )
+
+    def test_nothing_changed_writes_no_audit(self):
+        obj = inquiry(0, 'closed')
+        self.assertEqual(transition('project_inquiries', [obj.pk], 'closed'), [])
+        self.assertFalse(StatusTransition.objects.exists())
+
+    def test_contacts_are_marked_read_and_unread(self):
+        contact = ContactSubmission.objects.create(name='Ada', email='ada@example.com', message='Hi')
+        with mock.patch('api.transitions.invalidate_counters') as invalidate:
+            self.assertEqual(transition('contact_submissions', [contact.pk], True), [contact.pk])
+        invalidate.assert_called_once_with(ContactSubmission)
+        self.assertEqual(transition('contact_submissions', [contact.pk], True), [])
+        self.assertEqual(transition('contact_submissions', [contact.pk], False), [contact.pk])
+        self.assertEqual(
+            list(StatusChange.objects.order_by('pk').values_list('old_value', flat=True)), ['False', 'True'],
+        )
+
+
+@override_settings(NOTIFICATION_EMAILS=[], NOTIFICATION_WEBHOOK_URL='')
+class BulkTransitionEndpointTests(TestCase):
+    url = '/api/project-inquiry/bulk-status/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', is_staff=True)
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.post(self.url, {'ids': [1], 'status': 'closed'}, format='json').status_code, 403)
+
+    def test_reports_updated_and_skipped(self):
+        self.client.force_authenticate(self.staff)
+        new, closed = inquiry(0), inquiry(1, 'closed')
+        response = self.client.post(self.url, {'ids': [new.pk, closed.pk, 999], 'status': 'contacted'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 1, 'skipped': [closed.pk, 999]})
+        self.assertEqual(StatusTransition.objects.get().changed_by, 'staff')
+
+    def test_rejects_bad_bodies(self):
+        self.client.force_authenticate(self.staff)
+        for body in ({'ids': [], 'status': 'closed'}, {'ids': ['1'], 'status': 'closed'}, {'ids': [1], 'status': 'lost'}):
+            self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400)
+        response = self.client.post('/api/contact/bulk-read/', {'ids': [1], 'is_read': 1}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with override_settings(BULK_TRANSITION_MAX_IDS=2):
+            response = self.client.post(self.url, {'ids': [1, 2, 3], 'status': 'closed'}, format='json')
+        self.assertEqual(response.status_code, 400)
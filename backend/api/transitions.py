@@ -0,0 +1,147 @@
+"""
+Bulk status transitions for project inquiries and contact submissions.
+
+Triage moves hundreds of rows at a time, so ``transition`` changes a whole
+list of ids without loading a single model instance. Each chunk of
+``BULK_TRANSITION_CHUNK_SIZE`` ids takes one
+``UPDATE ... WHERE id IN (...) AND <field> = <source> RETURNING ...`` per
+value the field may move from (``STATUS_TRANSITIONS``): the database checks
+every row's transition itself, rows that may not move are left out, and the
+returned rows are exactly the ones that changed. Those feed the analytics
+rollups and the audit trail, in the same transaction as the updates: one
+``StatusTransition`` saying who changed what and when, and one narrow
+``StatusChange`` row per changed row with its previous value, written with
+``bulk_create``.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import rollups
+from .counters import invalidate_counters
+from .models import ContactSubmission, ProjectInquiry, StatusChange, StatusTransition
+
+# name -> (model, field, {new value: values it may be set from})
+STATUS_TRANSITIONS = {
+    'project_inquiries': (ProjectInquiry, 'status', {
+        'contacted': ('new',),
+        'quoted': ('contacted',),
+        'closed': ('new', 'contacted', 'quoted'),
+    }),
+    'contact_submissions': (ContactSubmission, 'is_read', {
+        True: (False,),
+        False: (True,),
+    }),
+}
+
+
+def db_converters(field):
+    # What the ORM applies to a column it reads, e.g. making SQLite's naive datetimes aware.
+    column = field.get_col(field.model._meta.db_table)
+    converters = connection.ops.get_db_converters(column) + field.get_db_converters(connection)
+    return column, converters
+
+
+def update_returning(model, field, value, source, ids, returned):
+    """Set ``field`` to ``value`` on the rows of ``ids`` where it is ``source``; return their ``returned`` fields"""
+    qn = connection.ops.quote_name
+    pk = model._meta.pk
+    returned = [pk] + [model._meta.get_field(name) for name in returned]
+    placeholders = ', '.join(['%s'] * len(ids))
+    sql = (
+        f'UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = %s '
+        f'WHERE {qn(pk.column)} IN ({placeholders}) AND {qn(field.column)} = %s '
+        f'RETURNING {", ".join(qn(column.column) for column in returned)}'
+    )
+    params = [field.get_db_prep_value(value, connection), *ids, field.get_db_prep_value(source, connection)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    converters = [db_converters(column) for column in returned]
+    results = []
+    for row in rows:
+        result = {}
+        for column, (expression, column_converters), item in zip(returned, converters, row):
+            for converter in column_converters:
+                item = converter(item, expression, connection)
+            result[column.attname] = item
+        results.append(result)
+    return results
+
+
+def transition(name, ids, value, changed_by='', source=StatusTransition.API):
+    """
+    Move the rows of ``ids`` in collection ``name`` to ``value``, where allowed.
+
+    Returns the ids that changed; the others do not exist, already have
+    ``value`` or may not move to it from their current value.
+    """
+    model, field_name, allowed = STATUS_TRANSITIONS[name]
+    field = model._meta.get_field(field_name)
+    tracked = [attname for attname in rollups.TRACKED_FIELDS.get(model, ()) if attname != field_name]
+    ids = list(dict.fromkeys(ids))
+    chunk_size = settings.BULK_TRANSITION_CHUNK_SIZE
+    states = []
+    with transaction.atomic():
+        for start in range(0, len(ids), chunk_size):
+            for old in allowed[value]:
+                for row in update_returning(model, field, value, old, ids[start:start + chunk_size], tracked):
+                    states.append({**row, field_name: old})
+        if states:
+            rollups.record_updated(model, states, {field_name: value})
+            audit = StatusTransition.objects.create(
+                collection=name,
+                field=field_name,
+                new_value=str(value),
+                count=len(states),
+                changed_by=changed_by,
+                source=source,
+            )
+            # Positional arguments (id, transition, record_id, old_value) take Model.__init__'s fast path.
+            StatusChange.objects.bulk_create([
+                StatusChange(None, audit.pk, state['id'], str(state[field_name]))
+                for state in states
+            ], batch_size=settings.BULK_CREATE_BATCH_SIZE)
+    if states:
+        # The UPDATE sends no post_save, so drop the cached counters here.
+        invalidate_counters(model)
+    return [state['id'] for state in states]
+
+
+def bulk_transition(request, name):
+    """
+    Apply a ``{"ids": [...], "<field>": <value>}`` request body to collection ``name``.
+
+    Reports the ids that changed and those skipped because they do not exist
+    or may not make that transition.
+    """
+    _, field_name, allowed = STATUS_TRANSITIONS[name]
+    data = request.data if isinstance(request.data, dict) else {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(type(pk) is int for pk in ids):
+        return Response(
+            {'error': 'Expected a non-empty list of integer ids'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(ids) > settings.BULK_TRANSITION_MAX_IDS:
+        return Response(
+            {'error': f'At most {settings.BULK_TRANSITION_MAX_IDS} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    value = data.get(field_name)
+    # Compare types too: 1 == True, but 1 is not a valid is_read.
+    if not any(type(value) is type(target) and value == target for target in allowed):
+        choices = ', '.join(str(target).lower() if isinstance(target, bool) else target for target in allowed)
+        return Response(
+            {'error': f"'{field_name}' must be one of: {choices}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    user = getattr(request, 'user', None)
+    changed_by = user.get_username() if user is not None and user.is_authenticated else ''
+    changed = transition(name, ids, value, changed_by)
+    updated = set(changed)
+    return Response({
+        'updated': len(changed),
+        'skipped': [pk for pk in dict.fromkeys(ids) if pk not in updated],
+    })
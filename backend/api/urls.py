@@ -1,18 +1,23 @@
 from django.urls import path
-from . import views
+from . import metrics, views
 
 urlpatterns = [
     # Contact form endpoints
     path('contact/submit/', views.contact_submit, name='contact_submit'),
+    path('contact/bulk/', views.contact_bulk_submit, name='contact_bulk_submit'),
+    path('contact/bulk-read/', views.contact_bulk_read, name='contact_bulk_read'),
     path('contact/list/', views.contact_list, name='contact_list'),
 
     # Newsletter endpoints
     path('newsletter/subscribe/', views.newsletter_subscribe, name='newsletter_subscribe'),
     path('newsletter/unsubscribe/', views.newsletter_unsubscribe, name='newsletter_unsubscribe'),
+    path('newsletter/import/', views.newsletter_import, name='newsletter_import'),
     path('newsletter/list/', views.newsletter_list, name='newsletter_list'),
 
     # Project inquiry endpoints
     path('project-inquiry/submit/', views.project_inquiry_submit, name='project_inquiry_submit'),
+    path('project-inquiry/bulk/', views.project_inquiry_bulk_submit, name='project_inquiry_bulk_submit'),
+    path('project-inquiry/bulk-status/', views.project_inquiry_bulk_status, name='project_inquiry_bulk_status'),
     path('project-inquiry/list/', views.project_inquiry_list, name='project_inquiry_list'),
 
     # Portfolio endpoints
@@ -22,9 +27,18 @@ urlpatterns = [
     # Testimonials endpoints
     path('testimonials/', views.testimonials, name='testimonials'),
 
+    # Full-text search
+    path('search/', views.search_view, name='search'),
+
     # Stats endpoint
     path('stats/', views.stats, name='stats'),
     
     # Admin dashboard (view all data)
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin/export/', views.admin_export, name='admin_export'),
+    path('admin/analytics/', views.admin_analytics, name='admin_analytics'),
+    path('admin/records/<str:collection>/<int:pk>/', views.admin_record, name='admin_record'),
+
+    # Prometheus metrics for this worker process
+    path('metrics/', metrics.metrics, name='metrics'),
 ]
@@ -1,13 +1,23 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, action
+from rest_framework.decorators import api_view, action, parser_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.views.decorators.http import condition
 from .models import (
     ContactSubmission,
     NewsletterSubscription,
     ProjectInquiry,
     PortfolioProject,
     Testimonial,
+    normalize_email,
 )
 from .serializers import (
     ContactSubmissionSerializer,
@@ -18,15 +28,92 @@ from .serializers import (
     ProjectInquiryCreateSerializer,
     PortfolioProjectSerializer,
     TestimonialSerializer,
+    projected_fields,
+)
+from .bulk import bulk_submit
+from .newsletter_import import IMPORT_FORMATS, import_subscribers
+from .pagination import KeysetPagination
+from .parsers import StreamParser
+from .ratelimit import rate_limited
+from .response_cache import cache_response
+from .conditional import (
+    portfolio_etag,
+    portfolio_last_modified,
+    portfolio_project_etag,
+    portfolio_project_last_modified,
+    public_cache_control,
+    testimonials_etag,
+    testimonials_last_modified,
 )
+from .counters import get_dashboard_stats, get_site_stats
+from .exports import EXPORT_COLLECTIONS, EXPORT_FORMATS, stream_json, stream_ndjson
+from .search import PUBLIC_SEARCH_COLLECTIONS, SEARCH_COLLECTIONS, search
+from .transitions import bulk_transition
+from . import dedup, retention, rollups, spool
+from .fast_serializers import NativeDict, enabled as fast_serialization, serialize_many, serialize_one, serialize_page
+
 
+# name -> (model, serializer, ordering field, list view name, fields listed in summary mode)
+DASHBOARD_COLLECTIONS = {
+    'contact_submissions': (
+        ContactSubmission, ContactSubmissionSerializer, 'submitted_at', 'contact_list',
+        ('id', 'name', 'email', 'phone', 'submitted_at'),
+    ),
+    'project_inquiries': (
+        ProjectInquiry, ProjectInquirySerializer, 'submitted_at', 'project_inquiry_list',
+        ('id', 'name', 'email', 'company', 'phone', 'project_type', 'budget_range', 'timeline', 'submitted_at', 'status'),
+    ),
+    'newsletter_subscriptions': (
+        NewsletterSubscription, NewsletterSubscriptionSerializer, 'subscribed_at', 'newsletter_list', None,
+    ),
+}
 
+
+def projected_page(request, name):
+    """
+    One KeysetPagination page of collection ``name``, limited to the ``?fields=`` requested.
+
+    ``?archived=true`` pages through the rows its retention policy archived
+    instead; only admins may read the archive.
+    """
+    model, serializer_class, ordering_field, _, _ = DASHBOARD_COLLECTIONS[name]
+    try:
+        fields = projected_fields(serializer_class, request.query_params.get('fields'))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if request.query_params.get('archived', '').lower() == 'true':
+        if not IsAdminUser().has_permission(request, None):
+            return Response(
+                {'error': 'Only admins can read archived records'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        paginator = KeysetPagination(ordering_field='timestamp')
+        records = paginator.paginate_queryset(retention.archived_queryset(name), request)
+        instances = retention.archived_instances(name, records)
+        return paginator.get_paginated_response(serializer_class(instances, many=True, fields=fields).data)
+    paginator = KeysetPagination(ordering_field=ordering_field)
+    return serialize_page(paginator, serializer_class, model.objects.all(), request, fields)
+
+
+@rate_limited('contact_submit')
 @api_view(['POST'])
 def contact_submit(request):
     """Submit a contact form"""
     serializer = ContactSubmissionCreateSerializer(data=request.data)
     if serializer.is_valid():
-        contact = ContactSubmission.objects.create(**serializer.validated_data)
+        if spool.enabled():
+            spool.spool_unique('contact', ContactSubmission, serializer.validated_data)
+            return Response(
+                {'message': 'Thank you for your message! We will get back to you soon.'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        contact = dedup.create_unique(ContactSubmission, serializer.validated_data)
+        if contact is None:
+            # A repeat: answer as if it were stored, without storing it twice.
+            return Response(
+                {'message': 'Thank you for your message! We will get back to you soon.'},
+                status=status.HTTP_200_OK
+            )
         return Response(
             {
                 'message': 'Thank you for your message! We will get back to you soon.',
@@ -37,20 +124,39 @@ def contact_submit(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@rate_limited('contact_bulk_submit', per_item=True)
+@api_view(['POST'])
+def contact_bulk_submit(request):
+    """Submit a batch of contact forms, reporting the result of each one"""
+    return bulk_submit(request, ContactSubmission, ContactSubmissionCreateSerializer)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def contact_bulk_read(request):
+    """Mark a list of contact submissions read or unread (for admin)"""
+    return bulk_transition(request, 'contact_submissions')
+
+
 @api_view(['GET'])
 def contact_list(request):
-    """Get all contact submissions (for admin)"""
-    contacts = ContactSubmission.objects.all()
-    serializer = ContactSubmissionSerializer(contacts, many=True)
-    return Response(serializer.data)
+    """Get contact submissions, newest first, one cursor page at a time (for admin)"""
+    return projected_page(request, 'contact_submissions')
 
 
+@rate_limited('newsletter_subscribe')
 @api_view(['POST'])
 def newsletter_subscribe(request):
     """Subscribe to newsletter"""
     serializer = NewsletterSubscriptionCreateSerializer(data=request.data)
     if serializer.is_valid():
         email = serializer.validated_data['email']
+        if spool.enabled():
+            spool.spool_submission('newsletter', {'email': email})
+            return Response(
+                {'message': 'Successfully subscribed to newsletter!'},
+                status=status.HTTP_202_ACCEPTED
+            )
         subscription, created = NewsletterSubscription.objects.get_or_create(
             email=email,
             defaults={'is_active': True}
@@ -70,6 +176,7 @@ def newsletter_subscribe(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@rate_limited('newsletter_unsubscribe', by_email=False)
 @api_view(['POST'])
 def newsletter_unsubscribe(request):
     """Unsubscribe from newsletter"""
@@ -80,7 +187,7 @@ def newsletter_unsubscribe(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     try:
-        subscription = NewsletterSubscription.objects.get(email=email)
+        subscription = NewsletterSubscription.objects.get(email=normalize_email(str(email)))
         subscription.is_active = False
         subscription.save()
         return Response(
@@ -94,12 +201,45 @@ def newsletter_unsubscribe(request):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@parser_classes([StreamParser])
+def newsletter_import(request):
+    """Import newsletter subscribers from a CSV or NDJSON request body (for admin)"""
+    content_type = request.content_type.split(';')[0].strip().lower()
+    format = request.query_params.get('type') or {
+        'text/csv': 'csv',
+        'application/x-ndjson': 'ndjson',
+        'application/jsonl': 'ndjson',
+    }.get(content_type)
+    if format not in IMPORT_FORMATS:
+        return Response(
+            {'error': 'Send the file as text/csv or application/x-ndjson, or pass ?type=csv|ndjson'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    report = import_subscribers(request.stream or [], format=format)
+    return Response(report, status=status.HTTP_200_OK)
+
+
+@rate_limited('project_inquiry_submit')
 @api_view(['POST'])
 def project_inquiry_submit(request):
     """Submit a project inquiry/quote request"""
     serializer = ProjectInquiryCreateSerializer(data=request.data)
     if serializer.is_valid():
-        inquiry = ProjectInquiry.objects.create(**serializer.validated_data)
+        if spool.enabled():
+            spool.spool_unique('inquiry', ProjectInquiry, serializer.validated_data)
+            return Response(
+                {'message': 'Thank you for your inquiry! We will review it and get back to you soon.'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        inquiry = dedup.create_unique(ProjectInquiry, serializer.validated_data)
+        if inquiry is None:
+            # A repeat: answer as if it were stored, without storing it twice.
+            return Response(
+                {'message': 'Thank you for your inquiry! We will review it and get back to you soon.'},
+                status=status.HTTP_200_OK
+            )
         return Response(
             {
                 'message': 'Thank you for your inquiry! We will review it and get back to you soon.',
@@ -110,19 +250,35 @@ def project_inquiry_submit(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@rate_limited('project_inquiry_bulk_submit', per_item=True)
+@api_view(['POST'])
+def project_inquiry_bulk_submit(request):
+    """Submit a batch of project inquiries, reporting the result of each one"""
+    return bulk_submit(request, ProjectInquiry, ProjectInquiryCreateSerializer)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def project_inquiry_bulk_status(request):
+    """Move a list of project inquiries to a new status, where the transition is allowed (for admin)"""
+    return bulk_transition(request, 'project_inquiries')
+
+
 @api_view(['GET'])
 def project_inquiry_list(request):
-    """Get all project inquiries (for admin)"""
-    inquiries = ProjectInquiry.objects.all()
-    serializer = ProjectInquirySerializer(inquiries, many=True)
-    return Response(serializer.data)
+    """Get project inquiries, newest first, one cursor page at a time (for admin)"""
+    return projected_page(request, 'project_inquiries')
 
 
-@api_view(['GET'])
+@public_cache_control
+@condition(etag_func=portfolio_etag, last_modified_func=portfolio_last_modified)
+@api_view(['GET', 'HEAD'])
+@cache_response(PortfolioProject, vary_on=('featured', 'category', 'technology'))
 def portfolio_projects(request):
     """Get all portfolio projects"""
     featured_only = request.query_params.get('featured', '').lower() == 'true'
     category = request.query_params.get('category', None)
+    technology = request.query_params.get('technology', '').strip().lower()
 
     projects = PortfolioProject.objects.all()
 
@@ -130,26 +286,34 @@ def portfolio_projects(request):
         projects = projects.filter(featured=True)
     if category:
         projects = projects.filter(category=category)
+    if technology:
+        projects = projects.filter(project_technologies__technology__slug=technology)
 
-    serializer = PortfolioProjectSerializer(projects, many=True)
-    return Response(serializer.data)
+    return Response(serialize_many(PortfolioProjectSerializer, projects, prefetch=['project_technologies']))
 
 
-@api_view(['GET'])
+@public_cache_control
+@condition(etag_func=portfolio_project_etag, last_modified_func=portfolio_project_last_modified)
+@api_view(['GET', 'HEAD'])
 def portfolio_project_detail(request, pk):
     """Get a specific portfolio project"""
-    try:
-        project = PortfolioProject.objects.get(pk=pk)
-        serializer = PortfolioProjectSerializer(project)
-        return Response(serializer.data)
-    except PortfolioProject.DoesNotExist:
+    project = serialize_one(
+        PortfolioProjectSerializer,
+        PortfolioProject.objects.filter(pk=pk),
+        prefetch=['project_technologies'],
+    )
+    if project is None:
         return Response(
             {'error': 'Project not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    return Response(project)
 
 
-@api_view(['GET'])
+@public_cache_control
+@condition(etag_func=testimonials_etag, last_modified_func=testimonials_last_modified)
+@api_view(['GET', 'HEAD'])
+@cache_response(Testimonial, vary_on=('featured',))
 def testimonials(request):
     """Get all testimonials"""
     featured_only = request.query_params.get('featured', '').lower() == 'true'
@@ -158,52 +322,177 @@ def testimonials(request):
     if featured_only:
         testimonials = testimonials.filter(featured=True)
 
-    serializer = TestimonialSerializer(testimonials, many=True)
-    return Response(serializer.data)
+    return Response(serialize_many(TestimonialSerializer, testimonials))
 
 
 @api_view(['GET'])
 def newsletter_list(request):
-    """Get all newsletter subscriptions (for admin)"""
-    subscriptions = NewsletterSubscription.objects.all().order_by('-subscribed_at')
-    serializer = NewsletterSubscriptionSerializer(subscriptions, many=True)
-    return Response(serializer.data)
+    """Get newsletter subscriptions, newest first, one cursor page at a time (for admin)"""
+    return projected_page(request, 'newsletter_subscriptions')
 
 
 @api_view(['GET'])
 def admin_dashboard(request):
-    """Get all submitted data in one place (for admin viewing)"""
-    dashboard_data = {
-        'contact_submissions': ContactSubmissionSerializer(
-            ContactSubmission.objects.all().order_by('-submitted_at'), 
-            many=True
-        ).data,
-        'project_inquiries': ProjectInquirySerializer(
-            ProjectInquiry.objects.all().order_by('-submitted_at'), 
-            many=True
-        ).data,
-        'newsletter_subscriptions': NewsletterSubscriptionSerializer(
-            NewsletterSubscription.objects.all().order_by('-subscribed_at'), 
-            many=True
-        ).data,
-        'stats': {
-            'total_contacts': ContactSubmission.objects.count(),
-            'total_inquiries': ProjectInquiry.objects.count(),
-            'total_subscriptions': NewsletterSubscription.objects.count(),
-            'active_subscriptions': NewsletterSubscription.objects.filter(is_active=True).count(),
+    """
+    Get all submitted data in one place (for admin viewing).
+
+    ``?mode=summary`` returns the stats and only the ``?recent=N`` newest items
+    of each collection, without their long text fields, plus a link to the
+    collection's paginated list. ``?fields=`` picks the fields of every
+    collection that has them, in either mode.
+    """
+    mode = request.query_params.get('mode', 'full')
+    if mode not in ('full', 'summary'):
+        return Response(
+            {'error': "Unsupported mode. Use 'full' or 'summary'"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    requested = {name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()}
+    available = set()
+    for _, serializer_class, _, _, _ in DASHBOARD_COLLECTIONS.values():
+        available.update(serializer_class().fields)
+    unknown = sorted(requested - available)
+    if unknown:
+        return Response(
+            {'error': f"Unknown fields: {', '.join(unknown)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        recent = int(request.query_params.get('recent', settings.ADMIN_DASHBOARD_RECENT))
+    except ValueError:
+        return Response({'error': "'recent' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    recent = max(1, min(recent, settings.ADMIN_DASHBOARD_RECENT_MAX))
+
+    dashboard_data = {}
+    for name, (model, serializer_class, ordering_field, list_view, summary_fields) in DASHBOARD_COLLECTIONS.items():
+        if requested:
+            fields = tuple(field for field in serializer_class().fields if field in requested) or ('id',)
+        else:
+            fields = summary_fields if mode == 'summary' else None
+        queryset = model.objects.order_by(f'-{ordering_field}', '-id')
+        if mode == 'full':
+            dashboard_data[name] = serialize_many(serializer_class, queryset, fields=fields)
+            continue
+        url = request.build_absolute_uri(reverse(list_view))
+        if fields is not None:
+            url = f"{url}?{urlencode({'fields': ','.join(fields)})}"
+        dashboard_data[name] = {
+            'recent': serialize_many(serializer_class, queryset[:recent], fields=fields),
+            'list': url,
         }
-    }
-    return Response(dashboard_data)
+    dashboard_data['stats'] = get_dashboard_stats()
+    # The stats are plain integer counts, so the whole payload stays JSON-native.
+    return Response(NativeDict(dashboard_data) if fast_serialization() else dashboard_data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_export(request):
+    """Stream all submitted data as NDJSON or a chunked JSON document (for admin)"""
+    output = request.query_params.get('output', 'ndjson').lower()
+    if output not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"Unsupported output '{output}'. Use one of: {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    requested = request.query_params.get('collections')
+    if requested:
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in EXPORT_COLLECTIONS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown collections: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        names = list(EXPORT_COLLECTIONS)
+
+    stream = stream_ndjson(names) if output == 'ndjson' else stream_json(names)
+    response = StreamingHttpResponse(stream, content_type=EXPORT_FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="export.{output}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_record(request, collection, pk):
+    """Get one contact submission, inquiry or subscription by id, live or archived (for admin)"""
+    if collection not in retention.RETENTION_POLICIES:
+        return Response(
+            {'error': f"Unknown collection '{collection}'. Use one of: {', '.join(retention.RETENTION_POLICIES)}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    try:
+        obj, archived = retention.get_record(collection, pk)
+    except ObjectDoesNotExist:
+        return Response(
+            {'error': 'Record not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    serializer_class = DASHBOARD_COLLECTIONS[collection][1]
+    return Response({**serializer_class(obj).data, 'archived': archived})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_analytics(request):
+    """Submission, inquiry and subscription counts over time, from the rollups (for admin)"""
+    params = request.query_params
+    try:
+        end = rollups.parse_bound(params['end'], 'end', end=True) if 'end' in params else timezone.now()
+        if 'start' in params:
+            start = rollups.parse_bound(params['start'], 'start')
+        else:
+            start = end - timedelta(days=settings.ANALYTICS_DEFAULT_DAYS)
+        metrics = [name.strip() for name in params.get('metrics', '').split(',') if name.strip()]
+        data = rollups.analytics(start, end, params.get('granularity') or None, metrics or None)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(data)
+
+
+@api_view(['GET'])
+def search_view(request):
+    """Full-text search across portfolio projects, and submissions for admins, best matches first"""
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response({'error': "Query parameter 'q' is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed = list(SEARCH_COLLECTIONS) if IsAdminUser().has_permission(request, None) else PUBLIC_SEARCH_COLLECTIONS
+    requested = request.query_params.get('type')
+    if requested:
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in SEARCH_COLLECTIONS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown types: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        forbidden = [name for name in names if name not in allowed]
+        if forbidden:
+            return Response(
+                {'error': f"Only admins can search: {', '.join(forbidden)}"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+    else:
+        names = list(allowed)
+
+    try:
+        limit = int(request.query_params.get('limit', settings.SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, settings.SEARCH_MAX_LIMIT))
+
+    results = {}
+    for name in names:
+        model, serializer_class, prefetch = SEARCH_COLLECTIONS[name]
+        results[name] = serializer_class(search(model, term, limit, prefetch), many=True).data
+    return Response({'query': term, 'results': results})
+
+
+@api_view(['GET', 'HEAD'])
 def stats(request):
     """Get website statistics"""
-    stats_data = {
-        'total_projects': PortfolioProject.objects.count(),
-        'featured_projects': PortfolioProject.objects.filter(featured=True).count(),
-        'total_testimonials': Testimonial.objects.count(),
-        'featured_testimonials': Testimonial.objects.filter(featured=True).count(),
-        'total_subscriptions': NewsletterSubscription.objects.filter(is_active=True).count(),
-    }
-    return Response(stats_data)
+    return Response(get_site_stats())
@@ -0,0 +1,41 @@
+"""
+Compare sync (gunicorn WSGI) and async (gunicorn + uvicorn worker, ASYNC_API)
+throughput for the public read endpoints under concurrent load.
+
+    python -m benchmarks.async_vs_sync --concurrency 64 --duration 10
+
+Both servers use the database configured by DATABASE_URL (SQLite by default)
+and a single worker process, which is the free-tier instance size. The
+portfolio and testimonial views of both modes serve from the response cache,
+so those paths compare the request handling around it.
+"""
+import argparse
+import json
+
+from .load import Server, run_load
+
+PATHS = ['/api/portfolio/', '/api/testimonials/', '/api/stats/']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1, help='Threads per sync worker')
+    parser.add_argument('--path', action='append', help='Endpoint to load (repeatable)')
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ('wsgi', 'asgi'):
+        with Server(mode, workers=args.workers, threads=args.threads) as server:
+            for path in args.path or PATHS:
+                stats = run_load('127.0.0.1', server.port, path, args.concurrency, args.duration)
+                results.setdefault(path, {})[mode] = stats
+                print(f'{mode:5} {path:22} {stats["rps"]:>9} req/s  '
+                      f'p50 {stats["p50_ms"]}ms  p99 {stats["p99_ms"]}ms  errors {stats["errors"]}')
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
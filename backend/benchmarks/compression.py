@@ -0,0 +1,106 @@
+"""
+Weigh the CPU cost of compressing API responses against the bytes it saves.
+
+    python -m benchmarks.compression --repeat 5
+
+Uses the same seeded database as ``benchmarks.run``. Renders large list
+responses uncompressed, then reports for gzip and Brotli at several levels
+how much smaller each gets and how long compressing it takes (best of
+``--repeat``). Finally it times a cached endpoint through the whole stack
+uncompressed and compressed from the copy stored with the cache entry,
+against what compressing it on every request would add.
+"""
+import argparse
+import gzip
+import time
+
+from .fixtures import SCALES
+from .run import DEFAULT_DATABASE, ensure_seeded, setup_django
+from .serialization import best_of
+
+PAYLOADS = [
+    ('contacts page', '/api/contact/list/?page_size=500'),
+    ('inquiries page', '/api/project-inquiry/list/?page_size=500'),
+    ('subscriptions page', '/api/newsletter/list/?page_size=500'),
+    ('portfolio', '/api/portfolio/'),
+    ('dashboard summary', '/api/admin/dashboard/?mode=summary'),
+]
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 5, 6, 9, 11)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--database-url', default=f'sqlite:///{DEFAULT_DATABASE}')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per cached-endpoint case (default: 200)')
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+    ensure_seeded(SCALES[args.scale], reseed=False)
+
+    from django.core.cache import cache
+    from django.test import Client
+    from api import compression
+
+    client = Client(HTTP_ACCEPT='application/json')
+    codecs = [(f'gzip-{level}', lambda data, level=level: gzip.compress(data, level, mtime=0)) for level in GZIP_LEVELS]
+    if compression.brotli is not None:
+        codecs += [
+            (f'br-{quality}', lambda data, quality=quality: compression.brotli.compress(
+                data, mode=compression.brotli.MODE_TEXT, quality=quality,
+            ))
+            for quality in BROTLI_QUALITIES
+        ]
+    else:
+        print('Brotli is not installed: gzip only')
+
+    print(f'{"":20} {"bytes":>9}' + ''.join(f'{name:>16}' for name, _ in codecs))
+    print(f'{"":30}' + ''.join(f'{"ratio   ms":>16}' for _ in codecs))
+    totals = {name: [0, 0.0] for name, _ in codecs}
+    total_size = 0
+    for label, path in PAYLOADS:
+        response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+        if response.status_code != 200:
+            raise SystemExit(f'{path}: {response.status_code}')
+        body = response.content
+        total_size += len(body)
+        cells = []
+        for name, codec in codecs:
+            seconds, compressed = best_of(args.repeat, lambda: codec(body))
+            totals[name][0] += len(compressed)
+            totals[name][1] += seconds
+            cells.append(f'{len(body) / len(compressed):>7.1f}x{seconds * 1000:>7.2f}')
+        print(f'{label:20} {len(body):>9}' + ''.join(f'{cell:>16}' for cell in cells))
+    print(f'{"all":20} {total_size:>9}' + ''.join(
+        f'{total_size / size:>7.1f}x{seconds * 1000:>7.2f}' for size, seconds in totals.values()
+    ))
+    print(f'{"MB/s":30}' + ''.join(
+        f'{total_size / seconds / 1e6:>16.0f}' for _, seconds in totals.values()
+    ))
+
+    encoding = compression.ENCODINGS[0]
+    path = '/api/portfolio/'
+
+    def run(accept_encoding):
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            response = client.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return (time.perf_counter() - started) / args.requests, response
+
+    cache.clear()
+    client.get(path)
+    print(f'\n{path} from the response cache, {args.requests} requests, ms per request:')
+    identity, response = run('identity')
+    identity_body = response.content
+    print(f'  {"uncompressed":34}{identity * 1000:>8.3f}  {len(response.content)} bytes')
+    reused, response = run(encoding)
+    print(f'  {f"{encoding}, cached compressed copy":34}{reused * 1000:>8.3f}  {len(response.content)} bytes')
+
+    compress_time, _ = best_of(args.repeat, lambda: compression.compress(identity_body, encoding))
+    print(f'  {f"{encoding}, recompressed each time":34}{(identity + compress_time) * 1000:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
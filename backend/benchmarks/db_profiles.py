@@ -0,0 +1,72 @@
+"""
+Compare DATABASE_PROFILE settings under concurrent writes.
+
+    python -m benchmarks.db_profiles --concurrency 32 --duration 10
+
+Each profile gets a freshly migrated SQLite database (WAL mode sticks to the
+file, so they cannot share one) and a gunicorn server with several sync
+workers and threads, which is where SQLite's write lock is contended. Every
+client POSTs contact submissions; errors are mostly "database is locked".
+Pass ``--database-url`` to run the PostgreSQL profiles against a real server
+instead; the database is then shared and migrated once.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .load import BACKEND_DIR, Server, run_load
+
+PROFILES = ['default', 'tuned']
+POSTGRES_PROFILES = ['default', 'pgbouncer', 'pooled']
+BODY = json.dumps({'name': 'Bench', 'email': 'bench@example.com', 'message': 'Benchmark message'})
+
+
+def migrate(env):
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+        cwd=BACKEND_DIR, env={**os.environ, **env}, check=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='Threads per sync worker')
+    parser.add_argument('--database-url', help='Shared database to use instead of one SQLite file per profile')
+    parser.add_argument('--profile', action='append', help='Profile to run (repeatable)')
+    args = parser.parse_args()
+
+    profiles = args.profile or (POSTGRES_PROFILES if args.database_url else PROFILES)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url:
+            migrate({'DATABASE_URL': args.database_url})
+        for profile in profiles:
+            env = {
+                'DATABASE_PROFILE': profile,
+                'DATABASE_URL': args.database_url or f'sqlite:///{Path(tmp) / profile}.sqlite3',
+                'ALLOWED_HOSTS': 'localhost,127.0.0.1',
+                'SUBMISSION_SPOOL_ENABLED': 'False',
+                'RATE_LIMIT_ENABLED': 'False',
+            }
+            if not args.database_url:
+                migrate(env)
+            with Server('wsgi', workers=args.workers, threads=args.threads, env=env) as server:
+                stats = run_load(
+                    '127.0.0.1', server.port, '/api/contact/submit/',
+                    args.concurrency, args.duration, method='POST', body=BODY,
+                )
+            results[profile] = stats
+            print(f'{profile:10} {stats["rps"]:>9} writes/s  p50 {stats["p50_ms"]}ms  '
+                  f'p95 {stats["p95_ms"]}ms  p99 {stats["p99_ms"]}ms  errors {stats["errors"]}')
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Deterministic fixture generator for benchmarks.
+
+Inserts synthetic rows with ``bulk_create`` in batches so even a million
+contacts can be seeded in a reasonable time. Must be called after
+``django.setup()``.
+"""
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+SCALES = {
+    'small': {'contacts': 10_000, 'inquiries': 2_000, 'subscriptions': 10_000, 'projects': 1_000, 'testimonials': 200},
+    'medium': {'contacts': 100_000, 'inquiries': 20_000, 'subscriptions': 100_000, 'projects': 1_000, 'testimonials': 500},
+    'large': {'contacts': 1_000_000, 'inquiries': 200_000, 'subscriptions': 1_000_000, 'projects': 1_000, 'testimonials': 1_000},
+}
+
+TECHNOLOGIES = [
+    'React', 'Vue', 'Django', 'PostgreSQL', 'TypeScript', 'Node.js', 'Flutter',
+    'Swift', 'Kotlin', 'AWS', 'Docker', 'Redis', 'GraphQL', 'Tailwind CSS',
+]
+WORDS = (
+    'we need a fast reliable platform for our growing team with modern design '
+    'mobile support analytics payments integrations and a secure admin area'
+).split()
+BATCH_SIZE = 5_000
+
+
+def sentence(rng, words=30):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def insert(model, rows, batch_size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def seed(contacts=0, inquiries=0, subscriptions=0, projects=0, testimonials=0, seed=0):
+    """Insert the requested number of synthetic rows for each model"""
+    from api.models import (
+        ContactSubmission,
+        NewsletterSubscription,
+        ProjectInquiry,
+        PortfolioProject,
+        Testimonial,
+    )
+
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    def timestamp(i, total):
+        # Spread rows over the last year, oldest first.
+        return now - timedelta(seconds=365 * 86400 * (total - i) / max(total, 1))
+
+    with transaction.atomic():
+        insert(ContactSubmission, (
+            ContactSubmission(
+                name=f'Contact {i}',
+                email=f'contact{i}@example.com',
+                phone='+1555000' + str(i % 10000).zfill(4),
+                message=sentence(rng, 60),
+                submitted_at=timestamp(i, contacts),
+                is_read=rng.random() < 0.7,
+            )
+            for i in range(contacts)
+        ))
+        insert(ProjectInquiry, (
+            ProjectInquiry(
+                name=f'Client {i}',
+                email=f'client{i}@example.com',
+                company=f'Company {i % 500}',
+                project_type=rng.choice(['web', 'mobile', 'custom', 'cloud', 'other']),
+                budget_range=rng.choice(['< $10,000', '$10,000 - $50,000', '> $50,000']),
+                description=sentence(rng, 80),
+                timeline=rng.choice(['1-3 months', '3-6 months', '6+ months']),
+                submitted_at=timestamp(i, inquiries),
+                status=rng.choice(['new', 'contacted', 'quoted', 'closed']),
+            )
+            for i in range(inquiries)
+        ))
+        insert(NewsletterSubscription, (
+            NewsletterSubscription(
+                email=f'subscriber{i}@example.com',
+                subscribed_at=timestamp(i, subscriptions),
+                is_active=rng.random() < 0.9,
+            )
+            for i in range(subscriptions)
+        ))
+        insert(Testimonial, (
+            Testimonial(
+                client_name=f'Client {i}',
+                client_position='CTO',
+                company=f'Company {i}',
+                testimonial=sentence(rng, 40),
+                rating=rng.randint(3, 5),
+                featured=rng.random() < 0.2,
+                created_at=timestamp(i, testimonials),
+            )
+            for i in range(testimonials)
+        ))
+
+        # Projects go through save() so the technology relation is populated.
+        for i in range(projects):
+            PortfolioProject.objects.create(
+                title=f'Project {i}',
+                description=sentence(rng, 50),
+                image_url=f'https://example.com/images/{i}.png',
+                technologies=', '.join(rng.sample(TECHNOLOGIES, rng.randint(2, 5))),
+                project_url=f'https://example.com/projects/{i}',
+                category=rng.choice(['web', 'mobile', 'fullstack', 'other']),
+                featured=rng.random() < 0.2,
+                created_at=timestamp(i, projects),
+            )
@@ -0,0 +1,137 @@
+"""
+Small HTTP load generator and server launcher shared by the benchmark scripts.
+
+Uses only the standard library: each simulated client is a thread with its
+own keep-alive connection.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None  # noqa: E731
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+    }
+
+
+def run_load(host, port, path, concurrency=16, duration=10.0, method='GET', body=None, headers=None):
+    """Hit ``path`` from ``concurrency`` clients for ``duration`` seconds and summarize latency"""
+    headers = {'Accept': 'application/json', **(headers or {})}
+    if body is not None:
+        headers.setdefault('Content-Type', 'application/json')
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                else:
+                    local.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on port {port} did not start within {timeout}s')
+
+
+class Server:
+    """Run gunicorn with sync (WSGI) or uvicorn (ASGI) workers in a subprocess"""
+
+    def __init__(self, mode='wsgi', workers=1, threads=1, env=None):
+        self.mode = mode
+        self.workers = workers
+        self.threads = threads
+        self.env = env or {}
+        self.port = free_port()
+        self.process = None
+
+    def command(self):
+        bind = f'127.0.0.1:{self.port}'
+        if self.mode == 'asgi':
+            return [
+                sys.executable, '-m', 'gunicorn', 'devsolutions.asgi:application',
+                '-k', 'uvicorn.workers.UvicornWorker',
+                '--workers', str(self.workers), '--bind', bind, '--log-level', 'warning',
+            ]
+        return [
+            sys.executable, '-m', 'gunicorn', 'devsolutions.wsgi:application',
+            '--workers', str(self.workers), '--threads', str(self.threads),
+            '--bind', bind, '--log-level', 'warning',
+        ]
+
+    def __enter__(self):
+        env = {**os.environ, **self.env}
+        if self.mode == 'asgi':
+            env['ASYNC_API'] = 'True'
+        self.process = subprocess.Popen(self.command(), cwd=BACKEND_DIR, env=env)
+        wait_for_port(self.port)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
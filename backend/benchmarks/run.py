@@ -0,0 +1,344 @@
+"""
+Benchmark every endpoint in api/urls.py.
+
+Seeds a dedicated database with synthetic data, then measures each endpoint
+two ways:
+
+* in-process through Django's test client: latency percentiles, requests per
+  second, SQL queries per request and peak RSS of the benchmark process;
+* over HTTP against real gunicorn (sync) and/or uvicorn (async) servers with
+  concurrent clients: latency percentiles, requests per second and peak RSS
+  of the server processes.
+
+Results are written as JSON. Pass a previous run as ``--baseline`` to flag
+regressions; the exit status is 1 when any are found.
+
+    python -m benchmarks.run --scale small --output bench.json
+    python -m benchmarks.run --scale small --baseline bench.json --output new.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .fixtures import SCALES
+from .load import BACKEND_DIR, Server, run_load, summarize
+
+DEFAULT_DATABASE = Path(tempfile.gettempdir()) / 'devsolutions-benchmark.sqlite3'
+
+
+def setup_django(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['ALLOWED_HOSTS'] = 'testserver,localhost,127.0.0.1'
+    # Every benchmark request comes from one address, far above the public rate limits.
+    os.environ['RATE_LIMIT_ENABLED'] = 'False'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'devsolutions.settings')
+    sys.path.insert(0, str(BACKEND_DIR))
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    call_command('createcachetable', verbosity=0)
+
+
+def ensure_seeded(counts, reseed):
+    from api.models import ContactSubmission, PortfolioProject
+    from .fixtures import seed
+
+    if not reseed and (ContactSubmission.objects.exists() or PortfolioProject.objects.exists()):
+        print('Database already seeded, reusing it (pass --reseed to start over)')
+        return
+    if reseed:
+        from django.core.management import call_command
+        call_command('flush', interactive=False, verbosity=0)
+    started = time.perf_counter()
+    seed(**counts)
+    print(f'Seeded {counts} in {time.perf_counter() - started:.1f}s')
+
+
+def endpoint_specs():
+    """
+    How to call each URL name: method, URL kwargs, a body factory and content type.
+
+    Bodies are factories so submissions do not collide with each other.
+    """
+    from api.models import PortfolioProject
+
+    counter = itertools.count()
+    project_id = PortfolioProject.objects.order_by('pk').values_list('pk', flat=True).first() or 1
+
+    def contact():
+        return {'name': 'Bench', 'email': f'bench{next(counter)}@example.com', 'message': 'Benchmark message'}
+
+    def inquiry():
+        return {
+            'name': 'Bench', 'email': f'bench{next(counter)}@example.com',
+            'project_type': 'web', 'description': 'Benchmark inquiry',
+        }
+
+    def as_json(factory):
+        return lambda: json.dumps(factory())
+
+    return {
+        'contact_submit': ('POST', {}, as_json(contact), 'application/json'),
+        'contact_bulk_submit': ('POST', {}, lambda: json.dumps([contact() for _ in range(100)]), 'application/json'),
+        'contact_list': ('GET', {}, None, None),
+        'newsletter_subscribe': ('POST', {}, lambda: json.dumps({'email': f'bench{next(counter)}@example.com'}), 'application/json'),
+        'newsletter_unsubscribe': ('POST', {}, lambda: json.dumps({'email': 'subscriber1@example.com'}), 'application/json'),
+        'newsletter_import': ('POST', {}, lambda: '\n'.join(f'bulk{next(counter)}@example.com' for _ in range(100)), 'text/csv'),
+        'newsletter_list': ('GET', {}, None, None),
+        'project_inquiry_submit': ('POST', {}, as_json(inquiry), 'application/json'),
+        'project_inquiry_bulk_submit': ('POST', {}, lambda: json.dumps([inquiry() for _ in range(100)]), 'application/json'),
+        'project_inquiry_list': ('GET', {}, None, None),
+        'portfolio_projects': ('GET', {}, None, None),
+        'portfolio_project_detail': ('GET', {'pk': project_id}, None, None),
+        'testimonials': ('GET', {}, None, None),
+        'stats': ('GET', {}, None, None),
+        'admin_dashboard': ('GET', {}, None, None),
+        'admin_export': ('GET', {}, None, None),
+        'search': ('GET', {}, None, None),
+    }
+
+
+# Query strings appended to the reversed URL of endpoints that need one.
+QUERY_STRINGS = {
+    'search': 'q=reliable+platform',
+}
+
+
+def staff_headers():
+    """
+    Request headers of a signed-in staff session, for the endpoints behind ``IsAdminUser``.
+
+    The session is stored in the benchmark database, so the servers accept it
+    too; the CSRF token lets it ``POST``.
+    """
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+    from django.test import Client
+    from django.utils.crypto import get_random_string
+
+    user, _ = get_user_model().objects.get_or_create(
+        username='benchmark-staff', defaults={'is_staff': True},
+    )
+    client = Client()
+    client.force_login(user)
+    token = get_random_string(CSRF_SECRET_LENGTH, CSRF_ALLOWED_CHARS)
+    return {
+        'Cookie': f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; '
+                  f'{settings.CSRF_COOKIE_NAME}={token}',
+        'X-CSRFToken': token,
+    }
+
+
+def requires_staff(view):
+    from rest_framework.permissions import IsAdminUser
+
+    return IsAdminUser in getattr(getattr(view, 'cls', None), 'permission_classes', ())
+
+
+def select_endpoints(only, skip):
+    from django.urls import reverse
+    from api.urls import urlpatterns
+
+    specs = endpoint_specs()
+    staff = None
+    endpoints = []
+    for pattern in urlpatterns:
+        name = pattern.name
+        if (only and name not in only) or name in skip:
+            continue
+        if name not in specs:
+            print(f'warning: no benchmark spec for URL {name!r}, skipping it')
+            continue
+        method, kwargs, body, content_type = specs[name]
+        path = reverse(name, kwargs=kwargs)
+        if name in QUERY_STRINGS:
+            path = f'{path}?{QUERY_STRINGS[name]}'
+        headers = {}
+        if requires_staff(pattern.callback):
+            staff = staff or staff_headers()
+            headers = staff
+        endpoints.append((name, method, path, body, content_type, headers))
+    return endpoints
+
+
+def peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if platform.system() == 'Darwin' else peak
+
+
+def bench_in_process(endpoints, iterations, warmup):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client(HTTP_ACCEPT='application/json')
+    results = {}
+    for name, method, path, body, content_type, headers in endpoints:
+        latencies = []
+        queries = []
+        errors = 0
+        # As WSGI environ keys: Cookie -> HTTP_COOKIE, X-CSRFToken -> HTTP_X_CSRFTOKEN.
+        extra = {f'HTTP_{header.upper().replace("-", "_")}': value for header, value in headers.items()}
+        for i in range(warmup + iterations):
+            kwargs = {'content_type': content_type, 'data': body()} if body else {}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.generic(method, path, **kwargs, **extra) if body else client.get(path, **extra)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(elapsed)
+            queries.append(len(captured.captured_queries))
+        stats = summarize(latencies, errors, sum(latencies))
+        stats['queries_per_request'] = max(queries) if queries else 0
+        stats['peak_rss_kb'] = peak_rss_kb()
+        results[name] = stats
+        print(f'  {name:30} p50 {stats["p50_ms"]:>9}ms  p95 {stats["p95_ms"]:>9}ms  '
+              f'{stats["rps"]:>8} req/s  {stats["queries_per_request"]:>3} queries')
+    return results
+
+
+def process_tree_peak_rss_kb(pid):
+    """Sum VmHWM of a process and its children (Linux only, None elsewhere)"""
+    try:
+        pids = [pid]
+        children = Path(f'/proc/{pid}/task/{pid}/children').read_text().split()
+        pids.extend(int(child) for child in children)
+        total = 0
+        for p in pids:
+            for line in Path(f'/proc/{p}/status').read_text().splitlines():
+                if line.startswith('VmHWM:'):
+                    total += int(line.split()[1])
+        return total
+    except OSError:
+        return None
+
+
+def bench_servers(endpoints, modes, concurrency, duration, database_url):
+    results = {}
+    env = {'DATABASE_URL': database_url, 'ALLOWED_HOSTS': '127.0.0.1,localhost'}
+    for mode in modes:
+        results[mode] = {}
+        with Server(mode, env=env) as server:
+            for name, method, path, body, content_type, headers in endpoints:
+                headers = {**headers, 'Content-Type': content_type} if content_type else headers
+                stats = run_load(
+                    '127.0.0.1', server.port, path, concurrency, duration,
+                    method=method, body=body() if body else None, headers=headers,
+                )
+                stats['peak_rss_kb'] = process_tree_peak_rss_kb(server.process.pid)
+                results[mode][name] = stats
+                print(f'  {mode:4} {name:30} p50 {stats["p50_ms"]}ms  p95 {stats["p95_ms"]}ms  '
+                      f'{stats["rps"]} req/s  errors {stats["errors"]}')
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Return human-readable regressions of ``current`` against ``baseline``"""
+    regressions = []
+
+    def check(label, now, before):
+        if not now or not before:
+            return
+        if now.get('p95_ms') and before.get('p95_ms') and now['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f'{label}: p95 {before["p95_ms"]}ms -> {now["p95_ms"]}ms')
+        if now.get('rps') and before.get('rps') and now['rps'] < before['rps'] * (1 - threshold):
+            regressions.append(f'{label}: throughput {before["rps"]} -> {now["rps"]} req/s')
+        if now.get('queries_per_request', 0) > before.get('queries_per_request', 0):
+            regressions.append(
+                f'{label}: queries {before.get("queries_per_request")} -> {now["queries_per_request"]}'
+            )
+
+    for name, stats in current.get('in_process', {}).items():
+        check(f'in_process {name}', stats, baseline.get('in_process', {}).get(name))
+    for mode, endpoints in current.get('servers', {}).items():
+        for name, stats in endpoints.items():
+            check(f'{mode} {name}', stats, baseline.get('servers', {}).get(mode, {}).get(name))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small', help='Preset data volume (default: small)')
+    for model in ('contacts', 'inquiries', 'subscriptions', 'projects', 'testimonials'):
+        parser.add_argument(f'--{model}', type=int, help=f'Override the number of {model} to seed')
+    parser.add_argument('--database-url', default=f'sqlite:///{DEFAULT_DATABASE}')
+    parser.add_argument('--reseed', action='store_true', help='Flush and reseed the benchmark database')
+    parser.add_argument('--iterations', type=int, default=50, help='In-process requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', default='', help='Comma-separated URL names to benchmark')
+    parser.add_argument('--skip', default='', help='Comma-separated URL names to leave out')
+    parser.add_argument('--servers', default='wsgi', help='Comma-separated server modes: wsgi, asgi, or none')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds of load per endpoint and server')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a previous results file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before flagging (default: 0.2)')
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for model in counts:
+        if getattr(args, model) is not None:
+            counts[model] = getattr(args, model)
+
+    setup_django(args.database_url)
+    ensure_seeded(counts, args.reseed)
+
+    only = {name for name in args.only.split(',') if name}
+    skip = {name for name in args.skip.split(',') if name}
+    endpoints = select_endpoints(only, skip)
+
+    print('In-process (Django test client):')
+    results = {
+        'meta': {
+            'scale': args.scale,
+            'counts': counts,
+            'database': args.database_url.split('://')[0],
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'python': platform.python_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'in_process': bench_in_process(endpoints, args.iterations, args.warmup),
+    }
+
+    modes = [mode for mode in args.servers.split(',') if mode and mode != 'none']
+    if modes:
+        print('HTTP servers:')
+        from django.db import connections
+        connections.close_all()
+        results['servers'] = bench_servers(endpoints, modes, args.concurrency, args.duration, args.database_url)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f'Wrote {args.output}')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) against {args.baseline}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
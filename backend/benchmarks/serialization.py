@@ -0,0 +1,87 @@
+"""
+Compare DRF serializers + JSONRenderer with the fast path (``.values()`` rows,
+precompiled serializers and FastJSONRenderer) on large read-only lists.
+
+    python -m benchmarks.serialization --rows 5000 --repeat 5
+
+Uses the same seeded database as ``benchmarks.run``. Reports the best of
+``--repeat`` runs for fetching the rows, turning them into primitives and
+rendering JSON, and fails if the two paths render different bytes.
+"""
+import argparse
+import time
+
+from .fixtures import SCALES
+from .run import DEFAULT_DATABASE, ensure_seeded, setup_django
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--database-url', default=f'sqlite:///{DEFAULT_DATABASE}')
+    parser.add_argument('--rows', type=int, default=5000, help='Rows per list (default: 5000)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+    ensure_seeded(SCALES[args.scale], reseed=False)
+
+    from rest_framework.renderers import JSONRenderer
+    from api import fast_serializers, renderers
+    from api.models import ContactSubmission, PortfolioProject, ProjectInquiry, Testimonial
+    from api.serializers import (
+        ContactSubmissionSerializer,
+        PortfolioProjectSerializer,
+        ProjectInquirySerializer,
+        TestimonialSerializer,
+    )
+
+    cases = [
+        ('contacts', ContactSubmissionSerializer, ContactSubmission.objects.order_by('-submitted_at', '-id'), ()),
+        ('inquiries', ProjectInquirySerializer, ProjectInquiry.objects.order_by('-submitted_at', '-id'), ()),
+        ('projects', PortfolioProjectSerializer, PortfolioProject.objects.all(), ('project_technologies',)),
+        ('testimonials', TestimonialSerializer, Testimonial.objects.all(), ()),
+    ]
+    drf_renderer = JSONRenderer()
+    fast_renderer = renderers.FastJSONRenderer()
+    print(f'Fast renderer encoder: {"orjson" if renderers.orjson else "stdlib json"}')
+    print(f'{"":24} {"fetch ms":>10} {"serialize ms":>13} {"render ms":>10} {"total ms":>10}')
+
+    for name, serializer_class, queryset, prefetch in cases:
+        queryset = queryset[:args.rows]
+        compiled = fast_serializers.compile_serializer(serializer_class)
+
+        drf = [
+            best_of(args.repeat, lambda: list(queryset.prefetch_related(*prefetch))),
+        ]
+        drf.append(best_of(args.repeat, lambda: serializer_class(drf[0][1], many=True).data))
+        drf.append(best_of(args.repeat, lambda: drf_renderer.render(drf[1][1])))
+
+        fast = [
+            best_of(args.repeat, lambda: list(fast_serializers.values_for(serializer_class, queryset))),
+        ]
+        fast.append(best_of(args.repeat, lambda: compiled.serialize(fast[0][1])))
+        fast.append(best_of(args.repeat, lambda: fast_renderer.render(fast[1][1])))
+
+        if drf[2][1] != fast[2][1]:
+            raise SystemExit(f'{name}: fast path output differs from DRF')
+
+        rows = len(drf[1][1])
+        for label, timings in ((f'{name} ({rows}) drf', drf), (f'{name} ({rows}) fast', fast)):
+            fetch, serialize, render = (timing * 1000 for timing, _ in timings)
+            print(f'{label:24} {fetch:>10.1f} {serialize:>13.1f} {render:>10.1f} {fetch + serialize + render:>10.1f}')
+        speedups = [before / after for (before, _), (after, _) in zip(drf, fast)]
+        total = sum(timing for timing, _ in drf) / sum(timing for timing, _ in fast)
+        print(f'{"speedup":24} {speedups[0]:>9.1f}x {speedups[1]:>12.1f}x {speedups[2]:>9.1f}x {total:>9.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,11 @@ set -o errexit
 # Install dependencies
 pip install -r requirements.txt
 
-# Run migrations
-python manage.py migrate --noinput
+# Run migrations, and stamp the database so a FAST_STARTUP boot can skip them
+python manage.py migrate_if_changed
+
+# Create the cache table (no-op unless a DatabaseCache is configured)
+python manage.py createcachetable
 
 # Collect static files
 python manage.py collectstatic --noinput
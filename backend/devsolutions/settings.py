@@ -4,6 +4,7 @@ Django settings for devsolutions project.
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,10 +24,17 @@ ALLOWED_HOSTS_ENV = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1,0.0.0.0
 ALLOWED_HOSTS = [host.strip() for host in ALLOWED_HOSTS_ENV.split(',') if host.strip()]
 
 
+# Startup-optimized mode for cold starts (see gunicorn.conf.py and start.sh): the gunicorn
+# master loads the app once and only runs `migrate` when the migration files changed, and
+# the admin's admin.py modules and the static file index are loaded on first use.
+FAST_STARTUP = os.environ.get('FAST_STARTUP', 'False') == 'True'
+
+
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # SimpleAdminConfig does not autodiscover admin.py modules; devsolutions/urls.py does on first use.
+    'django.contrib.admin.apps.SimpleAdminConfig' if FAST_STARTUP else 'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -38,9 +46,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.middleware.LazyWhiteNoiseMiddleware' if FAST_STARTUP else 'api.middleware.WhiteNoiseMiddleware',
+    # Below WhiteNoise, which serves its own precompressed static files.
+    'api.compression.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,14 +86,218 @@ WSGI_APPLICATION = 'devsolutions.wsgi.application'
 
 import dj_database_url
 
+# Serve the async-native views (api.async_views) instead of the sync ones. Only
+# useful under an ASGI server, e.g. `SERVER_MODE=asgi ./start.sh`.
+ASYNC_API = os.environ.get('ASYNC_API', 'False') == 'True'
+
 DATABASES = {
     'default': dj_database_url.config(
         default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
-        conn_max_age=600,
+        # Persistent connections are not reused across async requests, so close them instead.
+        conn_max_age=0 if ASYNC_API else 600,
         conn_health_checks=True,
     )
 }
 
+# Database performance profile (see api.db):
+#   default   - as configured above
+#   tuned     - SQLite: WAL journal, synchronous=NORMAL, mmap and a busy timeout (SQLITE_PRAGMAS)
+#   pgbouncer - PostgreSQL behind pgbouncer in transaction pooling mode, which
+#               cannot hold the server-side cursors used by .iterator()
+#   pooled    - PostgreSQL through an in-process connection pool per worker
+#               (DATABASE_POOL_MAX_SIZE connections, DATABASE_POOL_TIMEOUT seconds to wait for one)
+# The SQLite pragmas apply to every profile except 'default'.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'default')
+if DATABASE_PROFILE not in ('default', 'tuned', 'pgbouncer', 'pooled'):
+    raise ImproperlyConfigured(f'Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}')
+
+SQLITE_PRAGMAS = {} if DATABASE_PROFILE == 'default' else {
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+    'journal_mode': 'WAL',
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+
+if DATABASE_PROFILE == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DATABASE_PROFILE == 'pooled' and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].update({
+        'ENGINE': 'api.db.postgresql_pool',
+        # The pool keeps connections open; Django hands them back after every request.
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+        },
+    })
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Defaults to a per-process in-memory cache. Point CACHE_BACKEND/CACHE_LOCATION at
+# e.g. django.core.cache.backends.db.DatabaseCache / a table name to share it between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'devsolutions'),
+    },
+    # Rendered JSON of the public portfolio/testimonial listings. Works with
+    # locmem, django.core.cache.backends.filebased.FileBasedCache (LOCATION is a
+    # directory) or django.core.cache.backends.db.DatabaseCache (LOCATION is a
+    # table created with `python manage.py createcachetable`).
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'devsolutions-responses'),
+    },
+}
+
+# Cache alias and TTL (seconds) for the precomputed stats counters
+COUNTERS_CACHE_ALIAS = 'default'
+COUNTERS_CACHE_TIMEOUT = int(os.environ.get('COUNTERS_CACHE_TIMEOUT', '300'))
+
+# Response cache: entries are fresh for RESPONSE_CACHE_TIMEOUT seconds, then served
+# stale for up to RESPONSE_CACHE_STALE_TIMEOUT more while one worker rebuilds them.
+# On a miss, other requests wait up to RESPONSE_CACHE_MISS_WAIT seconds for that worker.
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '60'))
+RESPONSE_CACHE_STALE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_STALE_TIMEOUT', '300'))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_LOCK_TIMEOUT', '30'))
+RESPONSE_CACHE_MISS_WAIT = float(os.environ.get('RESPONSE_CACHE_MISS_WAIT', '1.0'))
+
+# Cache-Control for the public catalog endpoints (portfolio, testimonials).
+# Clients revalidate with If-None-Match / If-Modified-Since once max-age expires.
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', '60'))
+PUBLIC_CACHE_S_MAXAGE = int(os.environ.get('PUBLIC_CACHE_S_MAXAGE', '300'))
+PUBLIC_CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', '600'))
+
+# Bulk submission endpoints
+BULK_SUBMIT_MAX_ITEMS = int(os.environ.get('BULK_SUBMIT_MAX_ITEMS', '5000'))
+BULK_CREATE_BATCH_SIZE = int(os.environ.get('BULK_CREATE_BATCH_SIZE', '500'))
+
+# Bulk status transitions (see api/transitions.py): ids per request, and ids per UPDATE statement
+BULK_TRANSITION_MAX_IDS = int(os.environ.get('BULK_TRANSITION_MAX_IDS', '20000'))
+BULK_TRANSITION_CHUNK_SIZE = int(os.environ.get('BULK_TRANSITION_CHUNK_SIZE', '1000'))
+
+# Email
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+
+# Submission notifications, delivered by `python manage.py run_workers`.
+# Jobs are only queued for the channels configured here.
+NOTIFICATION_EMAILS = [e.strip() for e in os.environ.get('NOTIFICATION_EMAILS', '').split(',') if e.strip()]
+NOTIFICATION_WEBHOOK_URL = os.environ.get('NOTIFICATION_WEBHOOK_URL', '')
+NOTIFICATION_WEBHOOK_TIMEOUT = int(os.environ.get('NOTIFICATION_WEBHOOK_TIMEOUT', '10'))
+
+# Job queue: a failed job is retried after JOB_RETRY_BACKOFF * 2^(attempt - 1) seconds and
+# marked dead after JOB_MAX_ATTEMPTS; running jobs older than JOB_LOCK_TIMEOUT are requeued.
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BACKOFF = int(os.environ.get('JOB_RETRY_BACKOFF', '30'))
+JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', '300'))
+
+# Per-request SQL/serializer timing (Server-Timing header, api.metrics log lines, /api/metrics/).
+# A request that runs the same SQL statement this many times is flagged as a likely N+1
+# and logged; of the others, the REQUEST_METRICS_LOG_SAMPLE_RATE share (0.0-1.0) is logged.
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', '5'))
+REQUEST_METRICS_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_METRICS_LOG_SAMPLE_RATE', '0'))
+# /api/metrics/ answers staff users and requests with `Authorization: Bearer <METRICS_TOKEN>`.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Buffered write mode: submissions are appended to a local durable spool, answered with
+# 202 Accepted and committed in batches by a flusher thread at most
+# SUBMISSION_SPOOL_MAX_DELAY seconds later (see api/spool.py).
+SUBMISSION_SPOOL_ENABLED = os.environ.get('SUBMISSION_SPOOL_ENABLED', 'False') == 'True'
+SUBMISSION_SPOOL_PATH = os.environ.get('SUBMISSION_SPOOL_PATH', str(BASE_DIR / 'submission-spool.sqlite3'))
+SUBMISSION_SPOOL_MAX_DELAY = float(os.environ.get('SUBMISSION_SPOOL_MAX_DELAY', '1.0'))
+SUBMISSION_SPOOL_BATCH_SIZE = int(os.environ.get('SUBMISSION_SPOOL_BATCH_SIZE', '500'))
+
+# Serve read-only endpoints from .values() rows through precompiled serializers
+# (api/fast_serializers.py), rendered with orjson when it is installed.
+# The JSON is identical either way; set to False to go through DRF serializers.
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'True') == 'True'
+
+# Full-text search (/api/search/ and the admin search box). SEARCH_CONFIG is the
+# PostgreSQL text search configuration; SQLite uses FTS5's porter tokenizer.
+SEARCH_CONFIG = os.environ.get('SEARCH_CONFIG', 'english')
+SEARCH_DEFAULT_LIMIT = int(os.environ.get('SEARCH_DEFAULT_LIMIT', '20'))
+SEARCH_MAX_LIMIT = int(os.environ.get('SEARCH_MAX_LIMIT', '100'))
+SEARCH_ADMIN_MAX_RESULTS = int(os.environ.get('SEARCH_ADMIN_MAX_RESULTS', '1000'))
+
+# The analytics endpoint reads hourly, daily or monthly rollups, whichever is the
+# finest with at most this many buckets in the requested range.
+ANALYTICS_MAX_BUCKETS = int(os.environ.get('ANALYTICS_MAX_BUCKETS', '100'))
+ANALYTICS_DEFAULT_DAYS = int(os.environ.get('ANALYTICS_DEFAULT_DAYS', '30'))
+
+# Items per collection in the admin dashboard's summary mode (?mode=summary&recent=N)
+ADMIN_DASHBOARD_RECENT = int(os.environ.get('ADMIN_DASHBOARD_RECENT', '5'))
+ADMIN_DASHBOARD_RECENT_MAX = int(os.environ.get('ADMIN_DASHBOARD_RECENT_MAX', '100'))
+
+# Token bucket limits for the public submit endpoints (see api/ratelimit.py), per
+# endpoint, as 'N/period' with period s/m/h/d; an empty value disables that limit.
+# RATE_LIMIT_BULK_IP counts submitted items, not requests, on the bulk endpoints.
+# RATE_LIMIT_BACKEND=cache shares the buckets between workers through the cache
+# RATE_LIMIT_CACHE_ALIAS (e.g. with CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache).
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True'
+RATE_LIMIT_IP = os.environ.get('RATE_LIMIT_IP', '30/m')
+RATE_LIMIT_EMAIL = os.environ.get('RATE_LIMIT_EMAIL', '5/h')
+RATE_LIMIT_BULK_IP = os.environ.get('RATE_LIMIT_BULK_IP', f'{BULK_SUBMIT_MAX_ITEMS}/h')
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'local')
+RATE_LIMIT_CACHE_ALIAS = os.environ.get('RATE_LIMIT_CACHE_ALIAS', 'default')
+RATE_LIMIT_EVICT_INTERVAL = int(os.environ.get('RATE_LIMIT_EVICT_INTERVAL', '60'))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+
+# Retention policies (see api/retention.py): `python manage.py archive` moves read
+# contacts, closed inquiries and unsubscribed addresses older than this many days
+# into the compressed archive table, ARCHIVE_BATCH_SIZE rows per transaction.
+# 0 keeps a collection's rows in place.
+RETENTION_CONTACT_DAYS = int(os.environ.get('RETENTION_CONTACT_DAYS', '365'))
+RETENTION_INQUIRY_DAYS = int(os.environ.get('RETENTION_INQUIRY_DAYS', '365'))
+RETENTION_NEWSLETTER_DAYS = int(os.environ.get('RETENTION_NEWSLETTER_DAYS', '0'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '1000'))
+
+# Contact submissions and inquiries of DEDUP_MIN_WORDS words or more whose word
+# 3-grams are at least DEDUP_SIMILARITY similar (estimated Jaccard) to one the same
+# email sent in the last DEDUP_WINDOW seconds are not stored (see api/dedup.py).
+# Exact repeats of one stored in the last DEDUP_EXACT_WINDOW seconds are caught by
+# their fingerprint.
+DEDUP_EXACT_WINDOW = int(os.environ.get('DEDUP_EXACT_WINDOW', '86400'))
+DEDUP_NEAR_DUPLICATES = os.environ.get('DEDUP_NEAR_DUPLICATES', 'True') == 'True'
+DEDUP_WINDOW = int(os.environ.get('DEDUP_WINDOW', '3600'))
+DEDUP_SIMILARITY = float(os.environ.get('DEDUP_SIMILARITY', '0.7'))
+DEDUP_MIN_WORDS = int(os.environ.get('DEDUP_MIN_WORDS', '12'))
+DEDUP_MAX_ENTRIES = int(os.environ.get('DEDUP_MAX_ENTRIES', '50000'))
+
+# JSON, NDJSON and CSV responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are
+# compressed with Brotli (quality 0-11, with the Brotli package) or gzip (level 1-9),
+# as the client accepts (see api/compression.py).
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True') == 'True'
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.environ.get('API_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -120,7 +335,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise's storage, writing .br (with the Brotli package) and .gz copies at these levels
+STATICFILES_STORAGE = 'api.compression.CompressedManifestStaticFilesStorage'
+STATIC_BROTLI_QUALITY = int(os.environ.get('STATIC_BROTLI_QUALITY', '11'))
+STATIC_GZIP_LEVEL = int(os.environ.get('STATIC_GZIP_LEVEL', '9'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -129,12 +347,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
+    # Reverse proxies in front of the app, so rate limits key on the real client address
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None,
 }
 
 # CORS settings - Allow frontend to make requests
@@ -1,10 +1,29 @@
 """
 URL configuration for devsolutions project.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from django.utils.functional import cached_property
+
+
+class AdminURLConf:
+    """
+    The admin's URL patterns, built on the first request under /admin/.
+
+    Under ``FAST_STARTUP`` no admin.py module is imported at startup (see
+    ``INSTALLED_APPS``); they are discovered here. Otherwise autodiscover() has
+    already run and does nothing.
+    """
+
+    @cached_property
+    def urlpatterns(self):
+        admin.autodiscover()
+        return admin.site.get_urls()
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/', include('api.urls')),
+    # The (urlconf, app_name, namespace) form of admin.site.urls; include() would build the patterns right away.
+    path('admin/', (AdminURLConf(), 'admin', admin.site.name)),
+    path('api/', include('api.async_urls' if settings.ASYNC_API else 'api.urls')),
 ]
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings, read by ``gunicorn -c gunicorn.conf.py`` (start.sh, render.yaml).
+
+With FAST_STARTUP=True the master loads the app once (``preload_app``) and
+forks workers that are ready to answer, instead of each worker importing
+Django, DRF and the API on its own. The master also checks the migrations
+itself (``migrate_if_changed``, see api/startup.py) before it starts
+listening, rather than start.sh paying for a separate ``manage.py migrate``
+process. Database connections are never shared with the workers: the master
+closes its own before forking, and each worker opens its connections on
+first use.
+"""
+import os
+
+FAST_STARTUP = os.environ.get('FAST_STARTUP', 'False') == 'True'
+
+preload_app = FAST_STARTUP
+
+
+def on_starting(server):
+    if not FAST_STARTUP:
+        return
+    # The app is already loaded here, before the master binds its port.
+    from django.core.management import call_command
+    from django.urls import get_resolver
+
+    call_command('migrate_if_changed')
+    # Import the URLconf, and with it every view, once for all workers.
+    get_resolver().url_patterns
+
+
+def pre_fork(server, worker):
+    if FAST_STARTUP:
+        from django.db import connections
+
+        connections.close_all()
@@ -2,8 +2,17 @@
 # Exit on error
 set -o errexit
 
-# Run migrations
-python manage.py migrate --noinput
+# Run migrations. With FAST_STARTUP=True the gunicorn master does it instead, and only
+# when the migration files changed (see gunicorn.conf.py).
+if [ "$FAST_STARTUP" != "True" ]; then
+    python manage.py migrate --noinput
+fi
 
 # Start Gunicorn
-gunicorn devsolutions.wsgi:application --bind 0.0.0.0:$PORT
+# SERVER_MODE=asgi runs uvicorn workers with the async API views; the default is sync WSGI workers.
+if [ "$SERVER_MODE" = "asgi" ]; then
+    export ASYNC_API=True
+    gunicorn devsolutions.asgi:application -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
+else
+    gunicorn devsolutions.wsgi:application -c gunicorn.conf.py --bind 0.0.0.0:$PORT
+fi